@@ -0,0 +1,83 @@
+"""
+Import-time regression check: every statement gets executed in a fresh interpreter, which has to stay within the time budget
+and must not load the heavy dependencies that the statement does not need (pandas, torch, binance, pyarrow, matplotlib).
+Importing the environments is only checked for the loaded modules, its time is dominated by torch.
+
+Usage: python -m benchmarks.import_time [--budget 0.5] [--repeats 3] [--output results.json]
+(exits with status 1 if a check fails, so it can run in CI)
+"""
+#standard libraries imports
+import argparse
+import json
+import subprocess
+import sys
+
+#package imports
+from project_proteus import REPO_PATH
+
+
+#heavy dependencies that are only loaded by the code paths that use them
+HEAVY_MODULES = ["pandas", "torch", "binance", "pyarrow", "matplotlib"]
+
+#statement -> (modules it must not load, whether it has to stay within the time budget)
+CHECKS = {
+    "import project_proteus": (HEAVY_MODULES, True),
+    "import project_proteus.utils": (HEAVY_MODULES, True),
+    "from project_proteus.database import DbId": (HEAVY_MODULES, True),
+    "from project_proteus.database import DataBase": (HEAVY_MODULES, True),
+    "from project_proteus.env.simple import SimpleConfig": (HEAVY_MODULES, True),
+    #the environments need torch, so only the other heavy modules are checked (matplotlib only gets imported by the renderer process)
+    "from project_proteus.env.simple import SimpleEnv": (["pandas", "binance", "pyarrow", "matplotlib"], False)
+}
+
+#measures the import in the child process and reports the time and the loaded heavy modules
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [module for module in {forbidden} if module in sys.modules]}}))
+"""
+
+
+def measure(statement, forbidden, repeats) -> dict:
+    """
+    Description:
+        Executes statement repeats times in a fresh interpreter and returns the fastest time and the loaded forbidden modules
+    """
+    results = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", CHILD.format(statement=statement, forbidden=forbidden)], cwd=REPO_PATH, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    return {"seconds": min(result["seconds"] for result in results), "loaded": results[0]["loaded"]}
+
+
+def main(args=None) -> int:
+    #parse the arguments
+    parser = argparse.ArgumentParser(description="Import-time regression check")
+    parser.add_argument("--budget", type=float, default=0.5, help="Time budget of every statement in seconds")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of fresh interpreters per statement (the fastest counts)")
+    parser.add_argument("--output", default=None, help="Path of the JSON file the results get written to")
+    args = parser.parse_args(args)
+
+    #run the checks
+    results, failed = {}, False
+    for statement, (forbidden, budgeted) in CHECKS.items():
+        result = measure(statement, forbidden, repeats=args.repeats)
+        result["budget"] = args.budget if budgeted else None
+        result["ok"] = (not budgeted or result["seconds"] <= args.budget) and not result["loaded"]
+        results[statement] = result
+        failed = failed or not result["ok"]
+        print(f"{'ok  ' if result['ok'] else 'FAIL'} {result['seconds']*1000:8.1f}ms  {statement}" + (f"  (loaded: {', '.join(result['loaded'])})" if result["loaded"] else ""))
+
+    #save the results
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=4)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Benchmark of the cost of watching an agent: the step throughput of SimpleEnv with headless=True against headless=False.
+
+With headless=False a step only counts down, when a frame is due the env sends the prices and actions of the steps since the last frame
+to the renderer (see project_proteus.env.base.renderer), which draws in another process (or thread) at the capped frame rate,
+frames that do not fit into the queue get dropped.
+Besides the wall time the cpu time of the env process (all its threads, not the renderer process) gets measured: it is the overhead
+when the renderer has a core of its own, the wall time also holds the time the renderer takes from the env on a machine with one core.
+The headless and rendered runs alternate, the overheads are reported as median with the min and max over the runs (the spread is the noise
+of the machine, a median within it can not be told apart from no overhead).
+If most frames got dropped, the renderer did not keep up and the overhead is not representative: the result gets flagged and the exit status is 1.
+
+Usage: python -m benchmarks.render_overhead [--path DATABASE] [--interval 5m] [--steps 200000] [--repeats 5] [--backend process] [--max-fps 30]
+(without --path a synthetic database gets created, no network needed; the frames get saved to an image, so no display is needed)
+"""
+#standard libraries imports
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.env.simple import SimpleConfig, SimpleEnv
+from benchmarks.synthetic import create_synthetic_database
+
+
+def time_steps(env, actions) -> tuple:
+    """
+    Description:
+        Returns the wall and cpu seconds per step of one run over the actions (the env gets reset whenever an episode is done)
+    """
+    env.reset()
+    start, start_cpu = time.perf_counter(), time.process_time()
+    for action in actions:
+        if env.step(action)[2]:
+            env.reset()
+    return (time.perf_counter() - start) / len(actions), (time.process_time() - start_cpu) / len(actions)
+
+
+def summarize(values) -> dict:
+    """
+    Description:
+        Returns the median and the spread (min, max) of the values
+    """
+    return {"median": float(np.median(values)), "min": float(np.min(values)), "max": float(np.max(values))}
+
+
+def main(args=None) -> dict:
+    #parse the arguments
+    parser = argparse.ArgumentParser(description="Benchmark of the step throughput of SimpleEnv with and without rendering")
+    parser.add_argument("--path", default=None, help="Path of the DataBase, if none is given a synthetic one gets created")
+    parser.add_argument("--interval", default="5m", help="Candlestick interval of the env")
+    parser.add_argument("--steps", type=int, default=200000, help="Number of timed steps per run")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of headless and rendered runs")
+    parser.add_argument("--backend", default="process", choices=["process", "thread"], help="Where the renderer draws")
+    parser.add_argument("--max-fps", type=float, default=30, help="Maximum number of frames per second")
+    parser.add_argument("--output", default=None, help="Path of the JSON file the results get written to")
+    args = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.path or create_synthetic_database(os.path.join(tmp_dir, "db"), candlestick_intervals=[args.interval], rows=100000)
+
+        class Config(SimpleConfig):
+            class database(SimpleConfig.database):
+                pass
+            class env(SimpleConfig.env):
+                num_steps = 1000
+            class render(SimpleConfig.render):
+                pass
+        Config.database.path = path
+        Config.database.candlestick_interval = args.interval
+        Config.render.backend = args.backend
+        Config.render.max_fps = args.max_fps
+        Config.render.save_path = os.path.join(tmp_dir, "frame.png")
+
+        actions = np.random.default_rng(0).integers(0, 3, size=args.steps).tolist()
+
+        headless_env = SimpleEnv(config=Config(), headless=True, device="cpu", seed=0)
+        rendered_env = SimpleEnv(config=Config(), headless=False, device="cpu", seed=0)
+
+        #the first run starts the renderer, its startup does not count
+        time_steps(rendered_env, actions[:1000])
+        rendered_env.renderer.wait_ready(timeout=120)
+        sent_frames, dropped_frames = rendered_env.renderer.sent_frames, rendered_env.renderer.dropped_frames
+
+        #alternate the runs, so a slow phase of the machine hits both
+        headless, rendered = [], []
+        for _ in range(args.repeats):
+            headless.append(time_steps(headless_env, actions))
+            rendered.append(time_steps(rendered_env, actions))
+        sent_frames = rendered_env.renderer.sent_frames - sent_frames
+        dropped_frames = rendered_env.renderer.dropped_frames - dropped_frames
+        rendered_env.close_renderer()
+
+    headless, rendered = np.array(headless), np.array(rendered)
+    results = {
+        "backend": args.backend,
+        "max_fps": args.max_fps,
+        "cpu_count": os.cpu_count(),
+        "repeats": args.repeats,
+        "headless_steps_per_second": summarize(1 / headless[:, 0]),
+        "rendered_steps_per_second": summarize(1 / rendered[:, 0]),
+        "overhead_percent": summarize((rendered[:, 0] / headless[:, 0] - 1) * 100),
+        "cpu_overhead_percent": summarize((rendered[:, 1] / headless[:, 1] - 1) * 100),
+        "sent_frames": sent_frames,
+        "dropped_frames": dropped_frames,
+        #most frames dropped means the renderer barely ran, so the overhead would look smaller than it is
+        "ok": dropped_frames <= sent_frames
+    }
+    print(json.dumps(results, indent=4))
+    if not results["ok"]:
+        print(f"FAIL the renderer dropped {dropped_frames} of {sent_frames + dropped_frames} frames, the overhead is not representative")
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=4)
+
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main()["ok"] else 1)
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark of the per-step latency of the SimpleEnv hot path.
+
+Compares the price/time lookups the portfolio does on every step (3 price lookups, 1 time lookup) on
+    -the object-dtype time_close array the env used to keep (datetimes and floats mixed, every access unboxes python objects)
+    -the typed store the env keeps now (contiguous int64 nanosecond times, close prices as a float64 view into the observation store)
+and measures the complete SimpleEnv.step.
+
+Usage: python -m benchmarks.step_latency [--path DATABASE] [--interval 5m] [--steps 100000]
+(without --path a synthetic database gets created, no network needed)
+"""
+#standard libraries imports
+import argparse
+import json
+import os
+import tempfile
+import time
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.env.simple import SimpleConfig, SimpleEnv
+from benchmarks.synthetic import create_synthetic_database
+
+
+def time_lookups(close, close_time, indices) -> float:
+    """
+    Description:
+        Returns the seconds per step of the lookups the portfolio does on every step with the given representation
+    """
+    start = time.perf_counter()
+    for index in indices:
+        price = close(index)
+        price = close(index) * price
+        price = close(index) + price
+        close_time(index)
+    return (time.perf_counter() - start) / len(indices)
+
+
+def main(args=None) -> dict:
+    #parse the arguments
+    parser = argparse.ArgumentParser(description="Micro-benchmark of the per-step latency of the SimpleEnv hot path")
+    parser.add_argument("--path", default=None, help="Path of the DataBase, if none is given a synthetic one gets created")
+    parser.add_argument("--interval", default="5m", help="Candlestick interval of the env")
+    parser.add_argument("--steps", type=int, default=100000, help="Number of timed steps")
+    parser.add_argument("--output", default=None, help="Path of the JSON file the results get written to")
+    args = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.path or create_synthetic_database(os.path.join(tmp_dir, "db"), candlestick_intervals=[args.interval], rows=max(args.steps, 10000) + 100)
+
+        class Config(SimpleConfig):
+            class database(SimpleConfig.database):
+                pass
+            class env(SimpleConfig.env):
+                num_steps = args.steps
+        Config.database.path = path
+        Config.database.candlestick_interval = args.interval
+
+        env = SimpleEnv(config=Config(), headless=True, device="cpu", seed=0)
+        indices = np.random.default_rng(0).integers(0, env.data_length, size=args.steps).tolist()
+
+        #legacy representation: one object-dtype array of close_time and close
+        time_close = env.db[args.interval, ["close_time", "close"]].to_numpy()
+        legacy = time_lookups(lambda index: time_close[index][1], lambda index: time_close[index][0], indices)
+
+        #typed store
+        typed = time_lookups(lambda index: env.close.item(index), lambda index: env.close_time[index], indices)
+
+        #complete steps
+        env.num_steps = min(args.steps, env.data_length - env.first_index - 1)
+        env.reset(start_index=env.first_index)
+        actions = np.random.default_rng(1).integers(0, 3, size=env.num_steps).tolist()
+        start = time.perf_counter()
+        for action in actions:
+            env.step(action)
+        step = (time.perf_counter() - start) / len(actions)
+
+    results = {
+        "time_close_dtype": str(time_close.dtype),
+        "lookups_object_dtype_us": legacy * 1e6,
+        "lookups_typed_store_us": typed * 1e6,
+        "lookups_speedup": legacy / typed,
+        "step_us": step * 1e6,
+        "steps": len(actions)
+    }
+    print(json.dumps(results, indent=4))
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=4)
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
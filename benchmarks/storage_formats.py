@@ -0,0 +1,123 @@
+"""
+Benchmark of the on-disk size and the decode throughput of the storage formats (csv, npy, parquet and compressed with every available codec).
+
+Measures per storage configuration:
+    -size on disk (and the ratio to the raw in-memory size of the klines)
+    -write time
+    -full read throughput (rows/s and raw MB/s of all columns)
+    -random access: reads of short row slices at random positions (only the overlapping blocks get decoded)
+and writes the results as JSON.
+
+Usage: python -m benchmarks.storage_formats [--rows 1000000] [--tick 0.1] [--repeats 3] [--output results.json]
+"""
+#standard libraries imports
+import argparse
+import importlib.util
+import json
+import os
+import tempfile
+import time
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.database.storage import get_storage
+from benchmarks.synthetic import synthetic_klines
+
+
+def storage_configurations(codecs) -> dict:
+    """
+    Description:
+        Returns the storage entries that get benchmarked (parquet only if pyarrow is installed)
+    """
+    configurations = {"csv": {"format": "csv"}, "npy": {"format": "npy"}}
+    if importlib.util.find_spec("pyarrow") is not None:
+        configurations["parquet"] = {"format": "parquet"}
+    for codec in codecs:
+        for float_encoding in ("shuffle", "xor"):
+            configurations[f"compressed-{codec}-{float_encoding}"] = {"format": "compressed", "codec": codec, "float_encoding": float_encoding}
+    return configurations
+
+
+def available_codecs() -> list:
+    codecs = ["zlib"]
+    if importlib.util.find_spec("lz4") is not None:
+        codecs.append("lz4")
+    if importlib.util.find_spec("zstandard") is not None:
+        codecs.append("zstd")
+    return codecs
+
+
+def directory_size(path) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main(args=None) -> dict:
+    #parse the arguments
+    parser = argparse.ArgumentParser(description="Benchmark of the on-disk size and the decode throughput of the storage formats")
+    parser.add_argument("--rows", type=int, default=1000000, help="Number of candles")
+    parser.add_argument("--interval", default="1m", help="Interval of the candles")
+    parser.add_argument("--tick", type=float, default=0.1, help="Tick size the prices get rounded to like on an exchange (0 keeps the full precision)")
+    parser.add_argument("--float-dtype", default="float64", choices=["float64", "float32"], help="Dtype of the price/volume columns on disk")
+    parser.add_argument("--slice-rows", type=int, default=1000, help="Number of rows of every random access read")
+    parser.add_argument("--slices", type=int, default=200, help="Number of random access reads")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeats of the full read (the fastest counts)")
+    parser.add_argument("--output", default=None, help="Path of the JSON file the results get written to")
+    args = parser.parse_args(args)
+
+    #create the klines (exchange prices are multiples of the tick size, volumes of the lot size)
+    klines = synthetic_klines(args.rows, candlestick_interval=args.interval)
+    if args.tick > 0:
+        for column in ["open", "high", "low", "close"]:
+            klines[column] = (klines[column] / args.tick).round() * args.tick
+        klines["volume"] = klines["volume"].round(3)
+    raw_bytes = args.rows * (2*8 + 5*np.dtype(args.float_dtype).itemsize)
+
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, args.rows - args.slice_rows, size=args.slices)
+    results = {"meta": {"raw_bytes": raw_bytes, "codecs": available_codecs(), "args": vars(args)}, "storages": {}}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, entry in storage_configurations(available_codecs()).items():
+            storage = get_storage(entry, float_dtype=args.float_dtype)
+            path = os.path.join(tmp_dir, name)
+            os.mkdir(path)
+
+            #write
+            start = time.perf_counter()
+            storage.write(path, args.interval, klines)
+            result = {"storage": storage.to_dict(), "write_s": time.perf_counter() - start}
+            result["size_bytes"] = directory_size(path)
+            result["compression_ratio"] = raw_bytes / result["size_bytes"]
+
+            #full read
+            times = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                storage.read(path, args.interval)
+                times.append(time.perf_counter() - start)
+            result["read_s"] = min(times)
+            result["read_rows_per_s"] = args.rows / result["read_s"]
+            result["read_raw_mb_per_s"] = raw_bytes / 1024**2 / result["read_s"]
+
+            #random access
+            start = time.perf_counter()
+            for row in starts.tolist():
+                storage.read(path, args.interval, columns=["close"], rows=slice(row, row + args.slice_rows))
+            result["slice_read_ms"] = (time.perf_counter() - start) / args.slices * 1000
+
+            results["storages"][name] = result
+            print(f"{name:28s} {result['size_bytes']/1024**2:9.2f}MB  ratio {result['compression_ratio']:6.2f}  read {result['read_raw_mb_per_s']:9.1f}MB/s  slice {result['slice_read_ms']:8.3f}ms")
+
+    #save the results
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=4)
+        print(f"Results have been written to {args.output}")
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
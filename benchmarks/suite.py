@@ -0,0 +1,210 @@
+"""
+Benchmark suite of the DataBase and the SimpleEnv on synthetic databases (no network needed).
+
+Measures per storage format:
+    -DataBase.__getitem__ load time per access pattern
+    -SimpleEnv construction time (cold: the packed matrix gets created, warm: it gets reused)
+    -reset/step throughput of the SimpleEnv and the VectorSimpleEnv
+    -peak RSS of the process after every section
+and writes the results as JSON, so regressions can be compared between commits.
+
+Usage: python -m benchmarks.suite [--rows 200000] [--formats csv npy parquet] [--steps 20000] [--output results.json]
+"""
+#standard libraries imports
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+#external libraries imports
+import numpy as np
+import pandas as pd
+import torch
+
+#package imports
+from project_proteus import REPO_PATH
+from project_proteus.database import DataBase
+from project_proteus.env.simple import SimpleConfig, SimpleEnv, VectorSimpleEnv
+from benchmarks.synthetic import create_synthetic_database
+
+
+def peak_rss_mb() -> float:
+    """
+    Description:
+        Returns the peak resident set size of the process in MB
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #linux reports kilobytes, macOS bytes
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def measure(function, repeats) -> dict:
+    """
+    Description:
+        Calls function repeats times and returns the min and median seconds of the calls
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": float(np.median(times)), "repeats": repeats}
+
+
+def make_config(path, candlestick_interval, num_steps, window_length):
+    """
+    Description:
+        Creates a SimpleConfig for a database
+    """
+    class Config(SimpleConfig):
+        class database(SimpleConfig.database):
+            pass
+        class env(SimpleConfig.env):
+            pass
+    Config.database.path = path
+    Config.database.candlestick_interval = candlestick_interval
+    Config.env.num_steps = num_steps
+    Config.env.window_length = window_length
+    return Config()
+
+
+def benchmark_getitem(db, candlestick_interval, repeats) -> dict:
+    """
+    Description:
+        Measures DataBase.__getitem__ for the common access patterns
+    """
+    open_time = db[candlestick_interval, "open_time"]["open_time"]
+    day_start = open_time.iloc[len(open_time) // 2]
+    tail_start = open_time.iloc[int(len(open_time) * 0.9)]
+    patterns = {
+        "frame": lambda: db[candlestick_interval],
+        "column": lambda: db[candlestick_interval, "close"],
+        "columns": lambda: db[candlestick_interval, ["open", "high", "low", "close", "volume"]],
+        "slice_day": lambda: db[candlestick_interval, ["close"], day_start:day_start + pd.Timedelta(days=1)],
+        "slice_tail_10%": lambda: db[candlestick_interval, None, tail_start:]
+    }
+    return {name: measure(function, repeats) for name, function in patterns.items()}
+
+
+def benchmark_env(config, steps, num_envs, repeats) -> dict:
+    """
+    Description:
+        Measures the construction and the reset/step throughput of the SimpleEnv and the VectorSimpleEnv
+    """
+    results = {}
+
+    #construction (the first one creates the packed matrix)
+    start = time.perf_counter()
+    env = SimpleEnv(config=config, headless=True, device="cpu", seed=0)
+    results["construct_cold_s"] = time.perf_counter() - start
+    results["construct_warm"] = measure(lambda: SimpleEnv(config=config, headless=True, device="cpu", seed=0), repeats)
+
+    #resets
+    resets = max(steps // 10, 1)
+    start = time.perf_counter()
+    for _ in range(resets):
+        env.reset()
+    results["reset_per_s"] = resets / (time.perf_counter() - start)
+
+    #steps (an episode gets reset when it is done)
+    actions = np.random.default_rng(0).integers(0, 3, size=steps).tolist()
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done = env.step(action)
+        if done:
+            env.reset()
+    results["step_per_s"] = steps / (time.perf_counter() - start)
+
+    #batched steps
+    vector_env = VectorSimpleEnv(config=config, num_envs=num_envs, headless=True, device="cpu", seed=0)
+    vector_steps = max(steps // num_envs, 1)
+    actions = torch.randint(0, 3, (vector_steps, num_envs), generator=torch.Generator().manual_seed(0))
+    vector_env.reset()
+    start = time.perf_counter()
+    for step in range(vector_steps):
+        _, _, done = vector_env.step(actions[step])
+        if done[0]:
+            vector_env.reset()
+    results["vector_env_steps_per_s"] = vector_steps * num_envs / (time.perf_counter() - start)
+    results["vector_num_envs"] = num_envs
+
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_PATH, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(args=None) -> dict:
+    #parse the arguments
+    parser = argparse.ArgumentParser(description="Benchmark suite of the DataBase and the SimpleEnv on synthetic databases")
+    parser.add_argument("--rows", type=int, default=200000, help="Number of candles of the finest interval")
+    parser.add_argument("--intervals", nargs="+", default=["5m", "15m", "1h"], help="Intervals of the synthetic databases, the first one is benchmarked")
+    parser.add_argument("--formats", nargs="+", default=["csv", "npy", "parquet"], choices=["csv", "npy", "parquet", "compressed"], help="Storage formats to benchmark")
+    parser.add_argument("--steps", type=int, default=20000, help="Number of timed env steps")
+    parser.add_argument("--num-steps", type=int, default=100, help="num_steps of the env config (episode length)")
+    parser.add_argument("--window-length", type=int, default=10, help="window_length of the env config")
+    parser.add_argument("--num-envs", type=int, default=256, help="Number of episodes of the VectorSimpleEnv")
+    parser.add_argument("--repeats", type=int, default=5, help="Repeats of every timed access")
+    parser.add_argument("--dir", default=None, help="Directory of the synthetic databases, defaults to a temporary directory")
+    parser.add_argument("--output", default=None, help="Path of the JSON file the results get written to")
+    args = parser.parse_args(args)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "time": pd.Timestamp.now(tz="UTC").isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "torch": torch.__version__,
+            "args": vars(args)
+        },
+        "formats": {}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for storage_format in args.formats:
+            #create the database
+            path = os.path.join(args.dir or tmp_dir, f"synthetic_{storage_format}_{args.rows}")
+            start = time.perf_counter()
+            if not os.path.isdir(path):
+                create_synthetic_database(path, candlestick_intervals=args.intervals, rows=args.rows, storage_format=storage_format)
+            result = {"create_s": time.perf_counter() - start}
+
+            #benchmark the database
+            db = DataBase(path=path)
+            result["getitem"] = benchmark_getitem(db, args.intervals[0], repeats=args.repeats)
+            result["peak_rss_mb_after_getitem"] = peak_rss_mb()
+
+            #benchmark the env
+            config = make_config(path, args.intervals[0], num_steps=args.num_steps, window_length=args.window_length)
+            result["env"] = benchmark_env(config, steps=args.steps, num_envs=args.num_envs, repeats=args.repeats)
+            result["peak_rss_mb_after_env"] = peak_rss_mb()
+
+            results["formats"][storage_format] = result
+            print(f"{storage_format}: {json.dumps(result)}")
+
+    results["peak_rss_mb"] = peak_rss_mb()
+
+    #save the results
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=4)
+        print(f"Results have been written to {args.output}")
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
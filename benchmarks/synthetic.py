@@ -0,0 +1,135 @@
+"""
+Generator of synthetic DataBase directories of configurable size, no network access needed.
+
+Usage: python -m benchmarks.synthetic PATH [--intervals 5m 15m 1h] [--rows 100000] [--format npy] [--float-dtype float64] [--seed 0]
+"""
+#standard libraries imports
+import argparse
+import json
+import os
+
+#external libraries imports
+import numpy as np
+import pandas as pd
+
+#package imports
+from project_proteus.database import get_storage
+from project_proteus.database.resample import INTERVAL_ORIGINS, find_resample_source, resample_klines
+from project_proteus.utils import interval_to_milliseconds
+
+
+def synthetic_klines(rows, candlestick_interval="5m", start="2022-01-03", seed=0, price=100.0) -> pd.DataFrame:
+    """
+    Description:
+        Creates klines of a geometric random walk with vectorized numpy operations
+    Arguments:
+        -rows[int]:                             Number of candles
+        -candlestick_interval[string]:          Interval of the candles
+        -start[string]:                         Open time of the first candle (gets aligned to the interval)
+        -seed[int]:                             Seed of the random walk
+        -price[float]:                          Start price
+    Return:
+        -data[pd.DataFrame]:                    The klines with the columns of the DataBase
+    """
+    #get the open times
+    interval_ns = interval_to_milliseconds(candlestick_interval) * 1000000
+    origin_ns = INTERVAL_ORIGINS.get(candlestick_interval[-1], 0) * 1000000
+    start_ns = -(-(pd.Timestamp(start).value - origin_ns) // interval_ns) * interval_ns + origin_ns
+    open_time = start_ns + np.arange(rows, dtype=np.int64) * interval_ns
+
+    #create the random walk
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.002, rows)))
+    open_ = np.r_[price, close[:-1]]
+    spread = np.abs(rng.normal(0, 0.001, (2, rows)))
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+    volume = rng.gamma(2.0, 50.0, rows)
+
+    #the close_time is stored like klines_to_dataframe stores it: the open_time of the next candle
+    return pd.DataFrame({
+        "open_time": open_time.view("datetime64[ns]"),
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+        "close_time": (open_time + interval_ns).view("datetime64[ns]")
+    })
+
+
+def create_synthetic_database(path, candlestick_intervals=("5m",), rows=100000, storage_format="npy", float_dtype="float64", symbol="BTCUSDT", seed=0) -> str:
+    """
+    Description:
+        Creates a synthetic DataBase directory with a valid dbid.json. The finest interval gets rows candles of a random walk,
+        every coarser interval that the finest one evenly divides gets resampled from it (so all intervals are consistent),
+        the other intervals get their own random walk over the same time span.
+    Arguments:
+        -path[string]:                          Location of the DataBase-Folder (must not exist)
+        -candlestick_intervals[list[string]]:   The intervals of the DataBase
+        -rows[int]:                             Number of candles of the finest interval
+        -storage_format[string, dict]:          How the klines get saved on disk, either: "csv", "npy", "parquet" or "compressed"
+                                                    (or a storage entry with options e.g. {"format": "compressed", "codec": "zstd"}, see get_storage)
+        -float_dtype[string]:                   Dtype of the price/volume columns on disk, either: "float64" or "float32"
+        -symbol[string]:                        Symbol of the DataBase, has to end with USDT
+        -seed[int]:                             Seed of the random walk
+    Return:
+        -path[string]:                          The path of the DataBase
+    """
+    #check if the path is possible
+    if os.path.exists(path):
+        raise Exception("Please choose a directory, that does not already exist")
+
+    #create the klines of the finest interval
+    storage = get_storage(storage_format=storage_format, float_dtype=float_dtype)
+    candlestick_intervals = sorted(candlestick_intervals, key=interval_to_milliseconds)
+    finest = candlestick_intervals[0]
+    klines = {finest: synthetic_klines(rows, candlestick_interval=finest, seed=seed)}
+
+    #create the other intervals
+    span_ms = rows * interval_to_milliseconds(finest)
+    for candlestick_interval in candlestick_intervals[1:]:
+        if find_resample_source(candlestick_interval, [finest]) is not None:
+            klines[candlestick_interval] = resample_klines(klines[finest], source_interval=finest, candlestick_interval=candlestick_interval)
+        else:
+            klines[candlestick_interval] = synthetic_klines(max(span_ms // interval_to_milliseconds(candlestick_interval), 1), candlestick_interval=candlestick_interval, seed=seed+1)
+
+    #save the intervals
+    os.makedirs(path)
+    for candlestick_interval, data in klines.items():
+        os.mkdir(os.path.join(path, candlestick_interval))
+        storage.write(os.path.join(path, candlestick_interval), candlestick_interval, data)
+
+    #save the dbid
+    start, end = klines[finest]["open_time"].iloc[0], klines[finest]["close_time"].iloc[-1]
+    dbid = {
+        "symbol": symbol,
+        "base_asset": symbol[:-len("USDT")],
+        "quote_asset": "USDT",
+        "market_endpoint": "futures",
+        "date_range": (start.strftime("%d %b, %Y"), end.strftime("%d %b, %Y")),
+        "candlestick_intervals": list(klines),
+        "storage": storage.to_dict()
+    }
+    with open(os.path.join(path, "dbid.json"), 'w') as fp:
+        json.dump(dbid, fp, indent=4)
+
+    return path
+
+
+def main(args=None) -> None:
+    parser = argparse.ArgumentParser(description="Creates a synthetic DataBase directory")
+    parser.add_argument("path", help="Location of the DataBase-Folder")
+    parser.add_argument("--intervals", nargs="+", default=["5m"], help="The candlestick intervals")
+    parser.add_argument("--rows", type=int, default=100000, help="Number of candles of the finest interval")
+    parser.add_argument("--format", default="npy", choices=["csv", "npy", "parquet", "compressed"], help="The storage format")
+    parser.add_argument("--float-dtype", default="float64", choices=["float64", "float32"], help="Dtype of the price/volume columns on disk")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random walk")
+    args = parser.parse_args(args)
+
+    create_synthetic_database(args.path, candlestick_intervals=args.intervals, rows=args.rows, storage_format=args.format, float_dtype=args.float_dtype, seed=args.seed)
+    print(f"Synthetic DataBase has been created at {args.path}")
+
+
+if __name__ == "__main__":
+    main()
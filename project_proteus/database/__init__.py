@@ -1,2 +1,19 @@
 from .dbid import DbId
-from .database import DataBase
\ No newline at end of file
+
+from project_proteus.utils.lazy_import import lazy_exports
+
+#the exports get imported on first access, so importing the package does not load pandas (e.g. to inspect a dbid)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "Storage": ".storage",
+    "CsvStorage": ".storage",
+    "NpyStorage": ".storage",
+    "ParquetStorage": ".storage",
+    "CompressedStorage": ".storage",
+    "get_storage": ".storage",
+    "BulkDownloader": ".downloader",
+    "RateLimiter": ".downloader",
+    "StubClient": ".stub_client",
+    "ReadCache": ".cache",
+    "MarketStore": ".market_store",
+    "DataBase": ".database"
+})
@@ -0,0 +1,120 @@
+#standard libraries imports
+import threading
+from collections import OrderedDict
+
+#external libraries imports
+import numpy as np
+
+
+class ReadCache():
+    """
+    Description:
+        In-process LRU cache for the column arrays a DataBase reads from disk. Every entry is one column of an interval for a row range,
+        so requests with overlapping column sets share the same arrays instead of duplicating them. Row ranges that lie inside a cached
+        whole column are served as views of it. The cached arrays are read-only, the least recently used entries get evicted once the
+        byte budget is exceeded.
+    Arguments:
+        -max_bytes[int]:        Byte budget of the cache, arrays that are larger than the whole budget are not cached
+    """
+
+    def __init__(self, max_bytes=512*1024**2):
+        #save the params
+        self.max_bytes = int(max_bytes)
+
+        #entries (candlestick_interval, column, start, stop) -> array, ordered from least to most recently used
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        #statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    @staticmethod
+    def _key(candlestick_interval, column, rows) -> tuple:
+        return (candlestick_interval, column, None, None) if rows is None else (candlestick_interval, column, rows.start, rows.stop)
+
+    def get(self, candlestick_interval, column, rows=None) -> np.ndarray:
+        """
+        Description:
+            Returns the cached column for the row range (a slice with start and stop) or None if it is not cached
+        """
+        with self._lock:
+            #look for the exact row range
+            key = self._key(candlestick_interval, column, rows)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            #look for the whole column
+            whole_key = self._key(candlestick_interval, column, None)
+            if rows is not None and whole_key in self._entries:
+                self._entries.move_to_end(whole_key)
+                self.hits += 1
+                return self._entries[whole_key][rows]
+
+            self.misses += 1
+            return None
+
+    def put(self, candlestick_interval, column, rows, values) -> np.ndarray:
+        """
+        Description:
+            Caches a column for a row range, evicts the least recently used entries if the byte budget is exceeded
+        Return:
+            -values[np.ndarray]:    The cached (read-only) array
+        """
+        #the cached arrays are shared between requests, so they must not be changed
+        values = np.asarray(values)
+        values.flags.writeable = False
+
+        #do not cache arrays that do not fit into the budget
+        if values.nbytes > self.max_bytes:
+            return values
+
+        with self._lock:
+            #replace an existing entry
+            key = self._key(candlestick_interval, column, rows)
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key).nbytes
+
+            #add the entry
+            self._entries[key] = values
+            self.bytes += values.nbytes
+
+            #evict the least recently used entries
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.nbytes
+                self.evictions += 1
+
+        return values
+
+    def invalidate(self, candlestick_interval=None, column=None) -> None:
+        """
+        Description:
+            Drops the cached entries of an interval (or of one column of an interval), if no interval is given the whole cache gets cleared
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if (candlestick_interval is None or key[0] == candlestick_interval) and (column is None or key[1] == column):
+                    self.bytes -= self._entries.pop(key).nbytes
+
+    @property
+    def stats(self) -> dict:
+        """
+        Description:
+            Returns the statistics of the cache: hits, misses, hit_rate, evictions, entries, bytes and max_bytes
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -1,17 +1,27 @@
+from __future__ import annotations
+
 #standard libraries imports
 import os
 import shutil
 import json
+import hashlib
+import datetime
 
 #package imports
 from project_proteus import REPO_PATH
-from project_proteus.database import DbId
-from project_proteus.utils import read_config
+from project_proteus.database import DbId, ReadCache, get_storage
+from project_proteus.database.storage import KLINE_COLUMNS
+from project_proteus.database.downloader import BulkDownloader, klines_to_dataframe
+from project_proteus.database.resample import find_resample_source, resample_klines
+from project_proteus.database.features import FEATURE_DIGEST_ROWS, is_feature, feature_columns, feature_hash, kline_digest, compute_feature
+from project_proteus.database.segments import find_segments, update_segments, segment_index
+from project_proteus.utils import date_to_milliseconds, get_instrumentation, atomic_write
+from project_proteus.utils.lazy_import import lazy_import
 
 #external libraries imports
-from binance.client import Client
-from binance.enums import HistoricalKlinesType
-import pandas as pd
+import numpy as np
+
+pd = lazy_import("pandas")
 
 
 class DataBase():
@@ -19,12 +29,17 @@ class DataBase():
     Description:
         This is the base Database class, on which every other Database Objects builds upon.
     Arguments:
-        -path[string]:  Path of the Database
+        -path[string]:          Path of the Database
+        -cache_bytes[int]:      Byte budget of the in-process read cache (see ReadCache), if none is given every read goes to the disk.
+                                With the cache the returned DataFrames share the cached column arrays and are read-only (use .copy() before modifying them)
+        -instrumentation[Instrumentation]: Where the reads get recorded (e.g. the instrumentation of an env), if none is given the instrumentation of the process
+        -packed_path[string]:   Opt-in cache directory for the packed matrices of memmap_matrix, see there
     """
     
-    def __init__(self, path):
+    def __init__(self, path, cache_bytes=None, instrumentation=None, packed_path=None):
         #save the params
         self.path = path
+        self.packed_path = packed_path
 
         #check if the path exists and is a database
         if not os.path.isdir(path):
@@ -34,92 +49,415 @@ class DataBase():
         
         #setup dbid
         self.dbid = DbId(path=self.path)
+
+        #setup storage (databases without a storage entry are csv databases)
+        self.storage = get_storage(self.dbid.get("storage", "csv"))
+
+        #open_time indices of the intervals that are not memory mappable
+        self._open_time_indices = {}
+
+        #hashes of the features of the current version of every interval (see _feature_keys)
+        self._feature_keys_cache = {}
+
+        #setup the instrumentation
+        self.instrumentation = instrumentation or get_instrumentation()
+
+        #setup the read cache (opt-in)
+        self.cache = None if cache_bytes is None else ReadCache(max_bytes=cache_bytes)
     
     def __getitem__(self, index):
         """
         Description:
             Method for accessing data of the database. The access is direct from the harddrive (slower but more memory efficient)
         Arguments:
-            -index[string, list]:   Generally: [candlestick_interval, list of features]. To access the whole dataframe only specify the candlestick_interval you want e.g. db["5m"].
+            -index[string, list]:   Generally: [candlestick_interval, list of features, time slice]. To access the whole dataframe only specify the candlestick_interval you want e.g. db["5m"].
                                     To access only one feature specify the candlestick_interval and the feature you want e.g. db["5m", "close"]
                                     To access multiple features specify the datatype and a list of features you want e.g. db["5m", ["close", "open"]]
+                                    To access only the candles with start <= open_time < end add a slice of datetimes e.g. db["5m", ["close"], start:end]
+                                    (the start or the end can be left open e.g. db["5m", "close", start:], use None as features to get all features)
+                                    Computed features (see add_features) are accessed like every other feature e.g. db["5m", ["close", "rsi_14"]]
         Return:
             -data[pd.DataFrame]:    Returns always a DataFrame in the shape (rows, number of specified features) 
         """
-        
-        #set the path
-        if type(index) == tuple:
-            path = os.path.join(self.path, index[0])
-        elif type(index) == str:
-            path = os.path.join(self.path, index)
+        #access the data without instrumentation
+        if not self.instrumentation.enabled:
+            return self._getitem(index)
+
+        #time the access and count the bytes that got read
+        with self.instrumentation.span("database.getitem", index=repr(index)):
+            data = self._getitem(index)
+        nbytes = int(data.memory_usage(index=False).sum())
+        self.instrumentation.count("database.getitem.calls")
+        self.instrumentation.count("database.getitem.bytes", nbytes)
+        self.instrumentation.observe("database.getitem.bytes", nbytes)
+
+        return data
+
+    def _getitem(self, index) -> pd.DataFrame:
+        """
+        Description:
+            Helper method of __getitem__ that accesses the data
+        """
+        #unpack the index
+        if type(index) == str:
+            candlestick_interval, features, time_slice = index, None, None
+        elif type(index) == tuple and len(index) == 2 and type(index[0]) == str and type(index[1]) in (str, list):
+            candlestick_interval, features, time_slice = index[0], index[1], None
+        elif type(index) == tuple and len(index) == 3 and type(index[0]) == str and type(index[1]) in (str, list, type(None)) and type(index[2]) == slice:
+            candlestick_interval, features, time_slice = index
+        elif type(index) == tuple:
+            raise Exception("Your index is not possible, please check your index and the documentation on the DataBase object")
         else:
             raise Exception("Your chosen index is not valid")
 
+        #set the path
+        path = os.path.join(self.path, candlestick_interval)
+
         #check if path is available
         if not os.path.isdir(path):
             raise Exception("Your chosen kline-interval is not available")
 
+        #resolve the time slice to rows
+        rows = None if time_slice is None else self.time_slice_to_rows(candlestick_interval, time_slice)
+
         #access whole dataframe of certain kline-interval
-        if type(index) == str:
-            #load in the data and return
+        if features is None:
             try:
-                #get path
-                csv_path = os.path.join(path, f"{index}.csv")
-                #load data
-                data = pd.read_csv(filepath_or_buffer=csv_path, index_col="index")
-                #convert the date columns
-                data["close_time"]= pd.to_datetime(data["close_time"])
-                data["open_time"]= pd.to_datetime(data["open_time"])
-                
-                return data
-
-            except:
+                if self.cache is not None:
+                    return self._read_columns(candlestick_interval, KLINE_COLUMNS, rows=rows)
+                return self.storage.read(path, candlestick_interval, rows=rows)
+            except Exception:
                 raise Exception("Your chosen kline-interval is not available in this DataBase")
 
         #access one feature of a kline-interval
-        elif type(index) == tuple and len(index) == 2 and type(index[0]) == str and type(index[1]) == str:
+        elif type(features) == str:
             try:
-                #get path
-                csv_path = os.path.join(path, f"{index[0]}.csv")
-                #load data
-                data = pd.read_csv(filepath_or_buffer=csv_path, usecols=[index[1]])
-                
-                #convert the date columns
-                if "close_time" in data.columns:
-                    data["close_time"]= pd.to_datetime(data["close_time"])
-                if "open_time" in data.columns:
-                    data["open_time"]= pd.to_datetime(data["open_time"])
-
-                return data
-            
-            except:
+                return self._read_columns(candlestick_interval, [features], rows=rows)
+            except Exception:
                 raise Exception("Your chosen feature is not available in this DataBase")
-            
+
         #access list of features of a kline-interval
-        elif type(index) == tuple and len(index) == 2 and type(index[0]) == str and type(index[1]) == list:
+        else:
             try:
-                #get path
-                csv_path = os.path.join(path, f"{index[0]}.csv")
-                #load data
-                data = pd.read_csv(filepath_or_buffer=csv_path, usecols=index[1])
-                
-                #convert the date columns
-                if "close_time" in data.columns:
-                    data["close_time"]= pd.to_datetime(data["close_time"])
-                if "open_time" in data.columns:
-                    data["open_time"]= pd.to_datetime(data["open_time"])
-
-                return data[index[1]]
-            
-            except:
+                return self._read_columns(candlestick_interval, features, rows=rows)
+            except Exception:
                 raise Exception("One/multiple of your chosen feature/s is/are not available in this DataBase")
-        
-        #throw error on all other accesses
+
+    def _read_columns(self, candlestick_interval, columns, rows=None) -> pd.DataFrame:
+        """
+        Description:
+            Reads kline columns from the storage and computed features from the feature store and merges them in the requested order.
+            If the read cache is enabled, cached columns are reused and the newly read columns get cached.
+        """
+        registered = self.features(candlestick_interval)
+
+        #get the cached columns
+        data = {}
+        if self.cache is not None:
+            for column in columns:
+                values = self.cache.get(candlestick_interval, column, rows)
+                if values is not None:
+                    data[column] = values
+        cached = set(data)
+
+        #read the missing kline columns
+        kline_columns = [column for column in dict.fromkeys(columns) if column not in registered and column not in data]
+        if kline_columns:
+            with self.instrumentation.span("database.storage_read", format=self.storage.name):
+                read = self.storage.read(os.path.join(self.path, candlestick_interval), candlestick_interval, columns=kline_columns, rows=rows)
+            for column in kline_columns:
+                data[column] = read[column].to_numpy()
+
+        #read the missing computed features
+        for column in columns:
+            if column in registered and column not in data:
+                values = np.load(self._feature_path(candlestick_interval, column), mmap_mode="r")
+                data[column] = np.array(values if rows is None else values[rows])
+
+        #cache the newly read columns
+        if self.cache is not None:
+            for column in data:
+                if column not in cached:
+                    data[column] = self.cache.put(candlestick_interval, column, rows, data[column])
+
+        #keep the row numbers of the interval as index, like the storages do
+        length = len(next(iter(data.values()))) if data else 0
+        index = pd.RangeIndex(length) if rows is None else pd.RangeIndex(rows.start, rows.start+length)
+
+        return pd.DataFrame(data, index=index, copy=False)[columns]
+
+    def time_slice_to_rows(self, candlestick_interval, time_slice) -> slice:
+        """
+        Description:
+            Method for converting a slice of datetimes into the slice of rows with start <= open_time < end.
+            The rows get found with a binary search on the sorted open_time index of the interval.
+        Arguments:
+            -candlestick_interval[string]:          The candlestick_interval of the slice
+            -time_slice[slice]:                     Slice of datetimes (datetime, pd.Timestamp, np.datetime64 or string), start and end can be None
+        Return:
+            -rows[slice]:                           The slice of rows
+        """
+        #check if slice is possible
+        if time_slice.step is not None:
+            raise Exception("A step is not possible in a time slice")
+
+        #get the open_time index
+        open_time = self._open_time_index(candlestick_interval)
+
+        #binary search the start and the end
+        start = 0 if time_slice.start is None else int(np.searchsorted(open_time, self._to_nanoseconds(time_slice.start), side="left"))
+        stop = len(open_time) if time_slice.stop is None else int(np.searchsorted(open_time, self._to_nanoseconds(time_slice.stop), side="left"))
+
+        return slice(start, max(start, stop))
+
+    def _open_time_index(self, candlestick_interval) -> np.ndarray:
+        """
+        Description:
+            Returns the sorted open_times of an interval as int64 nanoseconds.
+            For the npy storage format the column gets memory mapped, for all other formats it gets read once and kept in ram.
+        """
+        #memory map the index
+        if self.storage.name == "npy":
+            return self.memmap(candlestick_interval, "open_time")
+
+        #read in the index once
+        if candlestick_interval not in self._open_time_indices:
+            open_time = self.storage.read(os.path.join(self.path, candlestick_interval), candlestick_interval, columns=["open_time"])["open_time"]
+            self._open_time_indices[candlestick_interval] = open_time.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+        return self._open_time_indices[candlestick_interval]
+
+    @staticmethod
+    def _to_nanoseconds(time) -> int:
+        """
+        Description:
+            Converts a datetime (datetime, pd.Timestamp, np.datetime64 or string) into int64 nanoseconds (UTC)
+        """
+        time = pd.Timestamp(time)
+        if time.tzinfo is not None:
+            time = time.tz_convert("UTC").tz_localize(None)
+        return time.as_unit("ns").value
+
+    def memmap(self, candlestick_interval, feature) -> np.ndarray:
+        """
+        Description:
+            Method for accessing one feature of a kline-interval as a read-only memory map (only available for the npy storage format).
+            Nothing gets copied into ram, all processes that map the same feature share the pages of the OS page cache.
+            Timestamps are returned as int64 nanoseconds.
+        Arguments:
+            -candlestick_interval[string]:          The candlestick_interval of the feature
+            -feature[string]:                       The feature that should be mapped e.g. "close" (computed features can be mapped with every storage format)
+        Return:
+            -data[np.memmap]:                       Read-only array in the shape (rows,)
+        """
+        #check if interval is available
+        if not self.check_candlestick_interval(candlestick_interval):
+            raise Exception("Your chosen kline-interval is not available")
+
+        #map a computed feature
+        if feature in self.features(candlestick_interval):
+            return np.load(self._feature_path(candlestick_interval, feature), mmap_mode="r")
+
+        try:
+            return self.storage.memmap(os.path.join(self.path, candlestick_interval), feature)
+        except FileNotFoundError:
+            raise Exception("Your chosen feature is not available in this DataBase")
+
+    def memmap_matrix(self, candlestick_interval, features, dtype="float64") -> np.ndarray:
+        """
+        Description:
+            Method for accessing multiple features of a kline-interval as one read-only, row-major memory map in the shape (rows, features).
+            The matrix gets packed into a file the first time it is requested and is reused afterwards, so all processes that use the same features
+            share one copy of the data in the OS page cache. The packed matrix is an uncompressed copy of the data, so it only gets written where it is cheap
+            or wanted: npy databases pack into <interval>/packed/, the other storage formats only pack if the DataBase got a packed_path
+            (an opt-in cache directory, e.g. for read-only or compressed databases). Otherwise the matrix gets read into ram (not shared between processes).
+        Arguments:
+            -candlestick_interval[string]:          The candlestick_interval of the features
+            -features[list[string]]:                The features that should be mapped e.g. ["open", "close"]
+            -dtype[string]:                         Dtype of the matrix, either: "float64" or "float32"
+        Return:
+            -data[np.memmap]:                       Read-only array in the shape (rows, features), a np.ndarray if the matrix does not get packed
+        """
+        #check if interval is available
+        if not self.check_candlestick_interval(candlestick_interval):
+            raise Exception("Your chosen kline-interval is not available")
+
+        #read the matrix into ram if it does not get packed
+        packed_dir = self._packed_dir(candlestick_interval)
+        if packed_dir is None:
+            data = np.ascontiguousarray(self[candlestick_interval, list(features)].to_numpy(dtype=dtype))
+            data.flags.writeable = False
+            return data
+
+        #get the path of the packed matrix
+        key = hashlib.sha1(json.dumps([list(features), dtype]).encode()).hexdigest()[:16]
+        packed_path = os.path.join(packed_dir, f"{key}.npy")
+
+        #pack the matrix if it does not exist yet
+        if not os.path.isfile(packed_path):
+            with self.instrumentation.span("database.pack_matrix", interval=candlestick_interval):
+                data = self[candlestick_interval, list(features)].to_numpy(dtype=dtype)
+                os.makedirs(os.path.dirname(packed_path), exist_ok=True)
+                with atomic_write(packed_path, "wb") as fp:
+                    np.save(fp, np.ascontiguousarray(data))
+
+        return np.load(packed_path, mmap_mode="r")
+
+    def _packed_dir(self, candlestick_interval) -> str:
+        """
+        Description:
+            Returns the directory of the packed matrices of an interval or None if they do not get packed (see memmap_matrix)
+        """
+        if self.packed_path is not None:
+            #the databases that share a packed_path get a directory each
+            return os.path.join(self.packed_path, hashlib.sha1(os.path.abspath(self.path).encode()).hexdigest()[:16], candlestick_interval)
+        if self.storage.name == "npy":
+            return os.path.join(self.path, candlestick_interval, "packed")
+        return None
+
+    def features(self, candlestick_interval) -> list:
+        """
+        Description:
+            Returns the computed features that are registered on a kline-interval
+        """
+        return list(self.dbid.get("features", {}).get(candlestick_interval, {}))
+
+    def segments(self, candlestick_interval) -> dict:
+        """
+        Description:
+            Returns the gap and integrity index of a kline-interval: the contiguous segments of candles (no missing, duplicated or unsorted candles in between).
+            The index gets computed at ingest, update and resample time and is saved in the dbid, outdated or missing indices (e.g. of older databases) get computed here.
+        Arguments:
+            -candlestick_interval[string]:          The candlestick_interval
+        Return:
+            -index[dict]:                           {"rows": rows, "segments": [[start_row, stop_row), ...], "missing_candles": candles missing in the gaps,
+                                                    "irregular": breaks that are no gaps (duplicated, unsorted or misaligned candles)}
+        """
+        #check if interval is available
+        if not self.check_candlestick_interval(candlestick_interval):
+            raise Exception("Your chosen kline-interval is not available")
+
+        #index the interval if the index is missing or outdated
+        index = self.dbid.get("segments", {}).get(candlestick_interval)
+        if index is None or index["rows"] != len(self._open_time_index(candlestick_interval)):
+            self._index_segments(candlestick_interval)
+            self.dbid.dump()
+
+        return self.dbid["segments"][candlestick_interval]
+
+    def _index_segments(self, candlestick_interval, from_row=None) -> None:
+        """
+        Description:
+            Finds the segments of an interval with vectorized diffs of the open_times and saves them in the dbid (the caller dumps the dbid).
+            With from_row only the tail from the segment that holds from_row on gets scanned again (e.g. after appending candles).
+        """
+        open_time = self._open_time_index(candlestick_interval)
+        index = self.dbid.get("segments", {}).get(candlestick_interval)
+        if from_row is None or index is None:
+            segments = find_segments(open_time, candlestick_interval)
         else:
-            raise Exception("Your index is not possible, please check your index and the documentation on the DataBase object")
-    
+            segments = update_segments(index["segments"], open_time, candlestick_interval, from_row)
+        self.dbid.setdefault("segments", {})[candlestick_interval] = segment_index(segments, open_time, candlestick_interval)
+
+    def add_features(self, candlestick_interval, features) -> None:
+        """
+        Description:
+            Method for registering computed features (indicators) on a kline-interval. Every feature gets computed once with a vectorized kernel
+            and saved next to the klines in <interval>/features/<feature>-<hash>.npy, the hash covers the feature spec and the klines it was computed from.
+            Afterwards the features can be accessed like every other feature e.g. db["5m", ["close", "rsi_14"]].
+            When the klines change (e.g. after update) a feature gets recomputed the next time it is accessed, up to date features are never recomputed.
+        Arguments:
+            -candlestick_interval[string]:          The candlestick_interval of the features
+            -features[list[string]]:                The features e.g. ["return", "log_return", "sma_20", "ema_20", "rsi_14", "atr_14", "volatility_20"]
+        """
+        #check if interval is available
+        if not self.check_candlestick_interval(candlestick_interval):
+            raise Exception("Your chosen kline-interval is not available")
+
+        #check if the features are possible
+        for feature in features:
+            if not is_feature(feature):
+                raise Exception(f"The chosen feature: {feature} is not available")
+
+        #compute the missing and outdated features
+        registered = self.dbid.get("features", {}).get(candlestick_interval, {})
+        keys = self._feature_keys(candlestick_interval, features)
+        outdated = [feature for feature in features if registered.get(feature) != keys[feature]]
+        if not outdated:
+            return
+        self._compute_features(candlestick_interval, outdated)
+
+    def _feature_path(self, candlestick_interval, feature) -> str:
+        """
+        Description:
+            Returns the path of an up to date registered feature, the feature gets recomputed if the klines have changed since it was computed
+        """
+        key = self._feature_keys(candlestick_interval, [feature])[feature]
+        if self.dbid["features"][candlestick_interval][feature] != key:
+            self._compute_features(candlestick_interval, [feature])
+
+        return os.path.join(self.path, candlestick_interval, "features", f"{feature}-{key}.npy")
+
+    def _feature_keys(self, candlestick_interval, features) -> dict:
+        """
+        Description:
+            Returns the hashes of features (see feature_hash), only the last FEATURE_DIGEST_ROWS klines of their columns get read for the digests.
+            The hashes are kept until the interval changes (see _invalidate), so reading an up to date feature does not touch the klines.
+        """
+        keys = self._feature_keys_cache.setdefault(candlestick_interval, {})
+        missing = [feature for feature in features if feature not in keys]
+        if missing:
+            open_time = self._open_time_index(candlestick_interval)
+            rows = len(open_time)
+            columns = sorted({column for feature in missing for column in feature_columns(feature)})
+            tail = self.storage.read(os.path.join(self.path, candlestick_interval), candlestick_interval, columns=columns, rows=slice(max(rows-FEATURE_DIGEST_ROWS, 0), rows))
+            tail = {column: tail[column].to_numpy(dtype=np.float64) for column in columns}
+            for feature in missing:
+                keys[feature] = feature_hash(feature, open_time, self.storage.float_dtype, kline_digest(feature, tail))
+
+        return {feature: keys[feature] for feature in features}
+
+    def _compute_features(self, candlestick_interval, features) -> None:
+        """
+        Description:
+            Computes features, saves them into the feature store and registers them in the dbid
+        """
+        #read the needed kline columns once
+        columns = sorted({column for feature in features for column in feature_columns(feature)})
+        data = self.storage.read(os.path.join(self.path, candlestick_interval), candlestick_interval, columns=columns)
+        data = {column: data[column].to_numpy(dtype=np.float64) for column in columns}
+        tail = {column: values[-FEATURE_DIGEST_ROWS:] for column, values in data.items()}
+        open_time = self._open_time_index(candlestick_interval)
+
+        #compute and save the features
+        features_path = os.path.join(self.path, candlestick_interval, "features")
+        os.makedirs(features_path, exist_ok=True)
+        registered = self.dbid.setdefault("features", {}).setdefault(candlestick_interval, {})
+        keys = self._feature_keys_cache.setdefault(candlestick_interval, {})
+        for feature in features:
+            key = keys[feature] = feature_hash(feature, open_time, self.storage.float_dtype, kline_digest(feature, tail))
+            path = os.path.join(features_path, f"{feature}-{key}.npy")
+            with self.instrumentation.span("database.compute_feature", feature=feature), atomic_write(path, "wb") as fp:
+                np.save(fp, compute_feature(feature, data).astype(self.storage.float_dtype))
+
+            #remove the outdated version of the feature
+            if registered.get(feature) not in (None, key):
+                old_path = os.path.join(features_path, f"{feature}-{registered[feature]}.npy")
+                if os.path.isfile(old_path):
+                    os.remove(old_path)
+            registered[feature] = key
+
+        #packed matrices and cached reads might contain the outdated features
+        if self._packed_dir(candlestick_interval) is not None:
+            shutil.rmtree(self._packed_dir(candlestick_interval), ignore_errors=True)
+        if self.cache is not None:
+            for feature in features:
+                self.cache.invalidate(candlestick_interval, column=feature)
+
+        self.dbid.dump()
+
     @staticmethod
-    def _download_kline_interval(symbol, market_endpoint, start_date, end_date, candlestick_interval, config_path) -> pd.DataFrame:   
+    def _download_kline_interval(symbol, market_endpoint, start_date, end_date, candlestick_interval, config_path, downloader=None) -> pd.DataFrame:   
         """
         Description:
             Helper method for downloading all the kline data.           
@@ -130,72 +468,205 @@ class DataBase():
             -end_date[string]:                      The date of the end of your data
             -candlestick_interval[string]:          On what interval the candlestick data should be downloaded
             -config_path[string]:                   Path to the config file, if none is given, it is assumed that the config-file is in the same folder as the file this method gets called from
+            -downloader[BulkDownloader]:            Downloader whose pooled client and rate limit should be used, if none is given a new one gets created
         Return:
             -data[pd.DataFrame]:                    Returns the created DataBase object
         """
-        #read in the config
-        config = read_config(path=config_path)
-
-        #create the client
-        client = Client(api_key=config["binance"]["key"], api_secret=config["binance"]["secret"])
+        #create the downloader
+        if downloader is None:
+            downloader = BulkDownloader(config_path=config_path, max_workers=1, progress=False)
 
-        #download the data and safe it in a dataframe
+        #download the data
         print(f"Downloading {candlestick_interval} klines from endpoint: {market_endpoint}")
-        if market_endpoint == "spot":
-            raw_data = client.get_historical_klines(symbol=symbol, interval=candlestick_interval, start_str=start_date, end_str=end_date, klines_type=HistoricalKlinesType.SPOT)
-        elif market_endpoint == "futures":
-            raw_data = client.get_historical_klines(symbol=symbol, interval=candlestick_interval, start_str=start_date, end_str=end_date, klines_type=HistoricalKlinesType.FUTURES)
-        else:
-            raise Exception(f"Your chosen market_endpoint: {market_endpoint} is not available")
-        
-        data = pd.DataFrame(raw_data)
-
-        #clean the dataframe
-        data = data.astype(float)
-        data.drop(data.columns[[7,8,9,10,11]], axis=1, inplace=True)
-        data.rename(columns = {0:'open_time', 1:'open', 2:'high', 3:'low', 4:'close', 5:'volume', 6:'close_time'}, inplace=True)
-
-        #set the correct times
-        data['close_time'] += 1
-        data['close_time'] = pd.to_datetime(data['close_time'], unit='ms')
-        data['open_time'] = pd.to_datetime(data['open_time'], unit='ms')
-
-        #check for nan values
-        if data.isna().values.any():
-            raise Exception("Nan values in data, please discard this object and try again")
-
-        #reset the index
-        data.reset_index(inplace=True, drop=True)
-
-        return data
+        return downloader.download_kline_interval(symbol=symbol, market_endpoint=market_endpoint, start_date=start_date, end_date=end_date, candlestick_interval=candlestick_interval)
 
-    def add_candlestick_interval(self, candlestick_interval, config_path=None) -> None:
+    def add_candlestick_interval(self, candlestick_interval, config_path=None, downloader=None, resample=True) -> None:
         """
         Description:
             Method for adding a candlestick interval to the database
         Arguments:
             -candlestick_interval[string]:          On what interval the candlestick data should be downloaded
             -config_path[string]:                   Path to the config file, if none is given, it is assumed that the config-file is in the same folder as the file this method gets called from
+            -downloader[BulkDownloader]:            Downloader that should be used, if none is given a new one gets created
+            -resample[bool]:                        If true and the database holds a finer interval that evenly divides candlestick_interval, the interval gets resampled locally instead of downloaded
         """
         #check if interval already exists
         if self.check_candlestick_interval(candlestick_interval):
             raise Exception("Your chosen candlestick_interval already exists")
 
-        #download interval
-        data = self._download_kline_interval(symbol=self.dbid["symbol"], market_endpoint=self.dbid["market_endpoint"] ,start_date=self.dbid["date_range"][0], end_date=self.dbid["date_range"][1], candlestick_interval=candlestick_interval, config_path=config_path)
+        #resample the interval if possible
+        if resample and find_resample_source(candlestick_interval, self.dbid["candlestick_intervals"]) is not None:
+            return self.resample_candlestick_interval(candlestick_interval)
 
-        #create the directory
-        os.mkdir(os.path.join(self.path, candlestick_interval))
+        #create the downloader
+        if downloader is None:
+            downloader = BulkDownloader(config_path=config_path, max_workers=1, progress=False)
 
-        #save the data to csv's
-        data.to_csv(path_or_buf=os.path.join(self.path, candlestick_interval, f"{candlestick_interval}.csv"), index_label="index")
+        #stream the interval to disk (an interrupted download resumes when this method gets called again)
+        print(f"Downloading {candlestick_interval} klines from endpoint: {self.dbid['market_endpoint']}")
+        downloader.ingest_kline_interval(path=os.path.join(self.path, candlestick_interval), storage=self.storage, symbol=self.dbid["symbol"], market_endpoint=self.dbid["market_endpoint"],
+                                         start_date=self.dbid["date_range"][0], end_date=self.dbid["date_range"][1], candlestick_interval=candlestick_interval)
 
         #add candlestick_interval to dbid
+        self._invalidate(candlestick_interval)
+        self._index_segments(candlestick_interval)
         self.dbid["candlestick_intervals"].append(candlestick_interval)
         self.dbid.dump()
 
         print(f"{candlestick_interval} klines have been succesfully added!")
 
+    def resample_candlestick_interval(self, candlestick_interval, source_interval=None) -> None:
+        """
+        Description:
+            Method for adding a candlestick interval to the database by resampling a finer interval locally (no network needed)
+        Arguments:
+            -candlestick_interval[string]:          The interval that should be created e.g. "1h"
+            -source_interval[string]:               The interval that gets resampled, if none is given the coarsest interval that evenly divides candlestick_interval is used
+        """
+        #check if interval already exists
+        if self.check_candlestick_interval(candlestick_interval):
+            raise Exception("Your chosen candlestick_interval already exists")
+
+        #get the source interval
+        if source_interval is None:
+            source_interval = find_resample_source(candlestick_interval, self.dbid["candlestick_intervals"])
+            if source_interval is None:
+                raise Exception(f"There is no interval in this DataBase from which {candlestick_interval} can be resampled")
+        elif find_resample_source(candlestick_interval, [source_interval]) is None:
+            raise Exception(f"{candlestick_interval} can not be resampled from {source_interval}")
+
+        #resample the data
+        data = resample_klines(self[source_interval], source_interval=source_interval, candlestick_interval=candlestick_interval)
+        if len(data) == 0:
+            raise Exception(f"There are not enough {source_interval} klines for a complete {candlestick_interval} candle")
+
+        #save the data into a temporary directory and move it into place
+        path = os.path.join(self.path, candlestick_interval)
+        shutil.rmtree(f"{path}.tmp", ignore_errors=True)
+        os.mkdir(f"{path}.tmp")
+        self.storage.write(f"{path}.tmp", candlestick_interval, data)
+        os.rename(f"{path}.tmp", path)
+
+        #add candlestick_interval to dbid
+        self._invalidate(candlestick_interval)
+        self._index_segments(candlestick_interval)
+        self.dbid["candlestick_intervals"].append(candlestick_interval)
+        self.dbid.dump()
+
+        print(f"{candlestick_interval} klines have been succesfully resampled from {source_interval}!")
+
+    def update(self, end_date=None, config_path=None, downloader=None) -> None:
+        """
+        Description:
+            Method for extending the date_range of the database without downloading the whole history again.
+            For every interval only the klines after the last saved candle get downloaded and appended to the existing storage
+            (the last saved candle gets downloaded again and replaced, because it might not have been closed yet).
+            The new date_range gets saved only after all intervals are updated, an interrupted update can simply be run again.
+        Arguments:
+            -end_date[datetime.date, datetime.datetime]:    The new end of the date_range, if none is given the current time (UTC) is used
+            -config_path[string]:                           Path to the config file, if none is given, it is assumed that the config-file is in the same folder as the file this method gets called from
+            -downloader[BulkDownloader]:                    Downloader that should be used, if none is given a new one gets created
+        """
+        #get the new end date
+        if end_date is None:
+            enddate = datetime.datetime.now(datetime.timezone.utc).strftime("%d %b, %Y %H:%M:%S")
+        elif type(end_date) == datetime.date:
+            enddate = end_date.strftime("%d %b, %Y")
+        else:
+            enddate = end_date.strftime("%d %b, %Y %H:%M:%S")
+
+        #create the downloader
+        if downloader is None:
+            downloader = BulkDownloader(config_path=config_path, max_workers=1, progress=False)
+
+        for candlestick_interval in self.dbid["candlestick_intervals"]:
+            #get the last saved candles
+            open_time = self._open_time_index(candlestick_interval)
+            rows = len(open_time)
+            after = int(open_time[-2]) if rows > 1 else None
+            start_time = int(open_time[-1]) // 1000000
+
+            #stream the missing klines to the end of the interval
+            path = os.path.join(self.path, candlestick_interval)
+            new_rows = 0
+            for page in downloader.iter_kline_pages(symbol=self.dbid["symbol"], market_endpoint=self.dbid["market_endpoint"], start_date=start_time, end_date=date_to_milliseconds(enddate), candlestick_interval=candlestick_interval):
+                #convert the page and drop the overlap with the saved candles
+                data = klines_to_dataframe(page, after=after)
+                if len(data) == 0:
+                    continue
+
+                #append the page (the first page overwrites the last saved candle)
+                self.storage.append(path, candlestick_interval, data, start_row=rows-1+new_rows)
+                self._invalidate(candlestick_interval)
+                new_rows += len(data)
+                after = int(data["open_time"].iloc[-1].value)
+
+            #index the gaps of the new candles
+            if new_rows > 0:
+                self._index_segments(candlestick_interval, from_row=rows-1)
+
+            print(f"{candlestick_interval} klines have been updated ({max(new_rows-1, 0)} new candles)")
+
+        #save the new date_range
+        self.dbid["date_range"] = (self.dbid["date_range"][0], enddate)
+        self.dbid.dump()
+
+    def convert_storage(self, storage_format, float_dtype="float64") -> None:
+        """
+        Description:
+            Method for converting all candlestick intervals of the database in place into another storage format (e.g. migrating csv databases to npy).
+            Every interval gets written into a temporary directory first, so an interrupted conversion never leaves a broken interval behind.
+        Arguments:
+            -storage_format[string, dict]:          The storage format the database should be converted to, either: "csv", "npy", "parquet" or "compressed"
+                                                    (or a storage entry with options e.g. {"format": "compressed", "codec": "zstd"}, see get_storage)
+            -float_dtype[string]:                   Dtype of the price/volume columns on disk, either: "float64" or "float32"
+        """
+        #create the new storage
+        storage = get_storage(storage_format=storage_format, float_dtype=float_dtype)
+
+        for candlestick_interval in self.dbid["candlestick_intervals"]:
+            #read in the interval with the old storage
+            data = self[candlestick_interval]
+
+            #write the interval with the new storage into a temporary directory
+            path = os.path.join(self.path, candlestick_interval)
+            tmp_path = f"{path}.tmp"
+            if os.path.isdir(tmp_path):
+                shutil.rmtree(tmp_path)
+            os.mkdir(tmp_path)
+            storage.write(tmp_path, candlestick_interval, data)
+
+            #keep the computed features (they get recomputed on access if the float_dtype changed)
+            if os.path.isdir(os.path.join(path, "features")):
+                shutil.copytree(os.path.join(path, "features"), os.path.join(tmp_path, "features"))
+
+            #swap the directories
+            old_path = f"{path}.old"
+            os.rename(path, old_path)
+            os.rename(tmp_path, path)
+            shutil.rmtree(old_path)
+
+        #save the storage format to the dbid
+        self.storage = storage
+        for candlestick_interval in self.dbid["candlestick_intervals"]:
+            self._invalidate(candlestick_interval)
+        self.dbid["storage"] = storage.to_dict()
+        self.dbid.dump()
+
+        print(f"DataBase has been succesfully converted to {storage.name}!")
+
+    def _invalidate(self, candlestick_interval) -> None:
+        """
+        Description:
+            Drops everything that got derived from the data of an interval (packed matrices, open_time index, feature hashes, cached reads), has to be called after every write
+        """
+        if self._packed_dir(candlestick_interval) is not None:
+            shutil.rmtree(self._packed_dir(candlestick_interval), ignore_errors=True)
+        self._open_time_indices.pop(candlestick_interval, None)
+        self._feature_keys_cache.pop(candlestick_interval, None)
+        if self.cache is not None:
+            self.cache.invalidate(candlestick_interval)
+
     def check_candlestick_interval(self, candlestick_interval) -> bool:
         """
         Description:
@@ -212,10 +683,11 @@ class DataBase():
             return False
 
     @classmethod
-    def create(cls, save_path: str, symbol: str, market_endpoint: str, date_span: tuple, candlestick_intervals: str, config_path: str = None):
+    def create(cls, save_path: str, symbol: str, market_endpoint: str, date_span: tuple, candlestick_intervals: str, config_path: str = None, storage_format: str = "npy", float_dtype: str = "float64", downloader=None):
         """
         Description:
-            This method creates a DataBase-Folder at a given location with the specified data.           
+            This method creates a DataBase-Folder at a given location with the specified data. The candlestick intervals get downloaded concurrently.
+            The location must not exist, except if it is an interrupted creation (with the same candlestick intervals), which gets resumed.
         Arguments:
             -save_path[string]:                     The location, where the folder gets created (Note: The name of the folder should be in the save_path e.g: "C:/.../desired_name")
             -symbol[string]:                        The Cryptocurrency you want to trade (Note: With accordance to the Binance API)
@@ -223,68 +695,147 @@ class DataBase():
             -date_span[tuple]:                      Tuple of datetime.date objects in the form: (startdate, enddate)
             -candlestick_intervals[list[string]]:   On what interval the candlestick data should be downloaded
             -config_path[string]:                   Path to the config file, if none is given, it is assumed that the config-file is in the same folder as the file this method gets called from
+            -storage_format[string, dict]:          How the klines get saved on disk, either: "csv", "npy", "parquet" or "compressed"
+                                                    (or a storage entry with options e.g. {"format": "compressed", "codec": "zstd"}, see get_storage)
+            -float_dtype[string]:                   Dtype of the price/volume columns on disk, either: "float64" or "float32"
+            -downloader[BulkDownloader]:            Downloader that should be used, if none is given a new one gets created
         Return:
             -DataBase[DataBase object]:             Returns the created DataBase object
         """
-       
-        #check if the specified directory already exists
-        if os.path.isdir(save_path):
-            raise Exception("Please choose a directory, that does not already exist")
-        
-        #create the directory
-        os.mkdir(save_path)
+        return cls._create(save_paths={symbol: save_path}, market_endpoint=market_endpoint, date_span=date_span, candlestick_intervals=candlestick_intervals,
+                           config_path=config_path, storage_format=storage_format, float_dtype=float_dtype, downloader=downloader)[symbol]
+
+    @classmethod
+    def bulk_create(cls, save_dir: str, symbols: list, market_endpoint: str, date_span: tuple, candlestick_intervals: list, config_path: str = None, storage_format: str = "npy", float_dtype: str = "float64", max_workers: int = 8, downloader=None) -> dict:
+        """
+        Description:
+            This method creates one DataBase-Folder per symbol (save_dir/<symbol>) and downloads all (symbol, candlestick_interval) pairs concurrently,
+            under the shared request weight budget of the exchange.
+        Arguments:
+            -save_dir[string]:                      The directory in which the DataBase-Folders get created
+            -symbols[list[string]]:                 The Cryptocurrencies you want to trade (Note: With accordance to the Binance API)
+            -market_endpoint[str]:                  From which market to get the data from, either: "spot" or "futures"
+            -date_span[tuple]:                      Tuple of datetime.date objects in the form: (startdate, enddate)
+            -candlestick_intervals[list[string]]:   On what interval the candlestick data should be downloaded
+            -config_path[string]:                   Path to the config file, if none is given, it is assumed that the config-file is in the same folder as the file this method gets called from
+            -storage_format[string, dict]:          How the klines get saved on disk, either: "csv", "npy", "parquet" or "compressed"
+                                                    (or a storage entry with options e.g. {"format": "compressed", "codec": "zstd"}, see get_storage)
+            -float_dtype[string]:                   Dtype of the price/volume columns on disk, either: "float64" or "float32"
+            -max_workers[int]:                      Number of concurrent downloads
+            -downloader[BulkDownloader]:            Downloader that should be used (e.g. with a StubClient), if none is given a new one gets created
+        Return:
+            -databases[dict]:                       Dictionary symbol -> created DataBase object
+        """
+        #create the save_dir
+        os.makedirs(save_dir, exist_ok=True)
+
+        #create the downloader
+        if downloader is None:
+            downloader = BulkDownloader(config_path=config_path, max_workers=max_workers)
+
+        return cls._create(save_paths={symbol: os.path.join(save_dir, symbol) for symbol in symbols}, market_endpoint=market_endpoint, date_span=date_span,
+                           candlestick_intervals=candlestick_intervals, config_path=config_path, storage_format=storage_format, float_dtype=float_dtype, downloader=downloader)
+
+    @classmethod
+    def _create(cls, save_paths: dict, market_endpoint: str, date_span: tuple, candlestick_intervals: list, config_path: str, storage_format: str, float_dtype: str, downloader) -> dict:
+        """
+        Description:
+            Helper method for creating the DataBase-Folders of create and bulk_create
+        Arguments:
+            -save_paths[dict]:                      Dictionary symbol -> location of its DataBase-Folder
+            -see create for the other arguments
+        Return:
+            -databases[dict]:                       Dictionary symbol -> created DataBase object
+        """
+        #create the storage
+        storage = get_storage(storage_format=storage_format, float_dtype=float_dtype)
+
+        #create the downloader
+        if downloader is None:
+            downloader = BulkDownloader(config_path=config_path, max_workers=len(candlestick_intervals))
+
+        #check if the specified directories already exist (only interrupted creations of this method get resumed)
+        for save_path in save_paths.values():
+            if os.path.exists(save_path) and not cls._is_interrupted_creation(save_path, candlestick_intervals):
+                raise Exception("Please choose a directory, that does not already exist")
+
+        #create the directories
+        created_paths = [save_path for save_path in save_paths.values() if not os.path.exists(save_path)]
+        for save_path in created_paths:
+            os.mkdir(save_path)
 
         #get the dates and format them
         startdate = date_span[0].strftime("%d %b, %Y")
         enddate = date_span[1].strftime("%d %b, %Y")
 
-        """
-        Download the data and save it to directory
-        """
         try:
-            for candlestick_interval in candlestick_intervals:
-                #download the data
-                data = cls._download_kline_interval(symbol=symbol, market_endpoint=market_endpoint, start_date=startdate, end_date=enddate, candlestick_interval=candlestick_interval, config_path=config_path)
-                #create the directory
-                os.mkdir(os.path.join(save_path, candlestick_interval))
-                #save the data to csv's
-                data.to_csv(path_or_buf=os.path.join(save_path, candlestick_interval, f"{candlestick_interval}.csv"), index_label="index")
-        
+            """
+            Stream the data to the directories
+            """
+            tasks = [(os.path.join(save_paths[symbol], candlestick_interval), symbol, market_endpoint, startdate, enddate, candlestick_interval)
+                     for symbol in save_paths for candlestick_interval in candlestick_intervals
+                     if not os.path.isdir(os.path.join(save_paths[symbol], candlestick_interval))]
+            for _ in downloader.ingest(tasks, storage=storage):
+                pass
+
+            print("======Finished downloading======")
+
+            """
+            Creating the dbids and saving them
+            """
+            for symbol, save_path in save_paths.items():
+                #get the symbol info
+                symbol_info = downloader.symbol_info(symbol=symbol, market_endpoint=market_endpoint)
+
+                #create the dbid
+                dbid = {
+                    "symbol": symbol,
+                    "base_asset": symbol_info["baseAsset"],
+                    "quote_asset": symbol_info["quoteAsset"],
+                    "market_endpoint": market_endpoint,
+                    "date_range": (startdate, enddate),
+                    "candlestick_intervals": [candlestick_interval for candlestick_interval in candlestick_intervals],
+                    "storage": storage.to_dict()
+                }
+
+                #save the dbid
+                with open(os.path.join(save_path, "dbid.json"), 'w') as fp:
+                    json.dump(dbid, fp,  indent=4)
+
         except Exception as e:
-            shutil.rmtree(save_path)
+            #keep the committed pages, so the creation can be resumed, the new directories without committed pages get removed
+            for save_path in created_paths:
+                if not cls._is_interrupted_creation(save_path, candlestick_intervals):
+                    shutil.rmtree(save_path)
+            print("Creating the DataBase got interrupted, call the same method again to resume the download")
             raise e
-        
-        print("======Finished downloading======")
-        
+
+        #index the gaps of the downloaded intervals
+        databases = {symbol: cls(path=save_path) for symbol, save_path in save_paths.items()}
+        for database in databases.values():
+            for candlestick_interval in database.dbid["candlestick_intervals"]:
+                database._index_segments(candlestick_interval)
+            database.dbid.dump()
+
+        return databases
+
+    @staticmethod
+    def _is_interrupted_creation(save_path, candlestick_intervals) -> bool:
         """
-        Creating the dbid and saving it
-        """
-        #create client
-        config = read_config(path=config_path)
-        client = Client(api_key=config["binance"]["key"], api_secret=config["binance"]["secret"])
-
-        #create the dbid
-        dbid = {
-            "symbol": symbol,
-            "base_asset": client.get_symbol_info(symbol=symbol)["baseAsset"],
-            "quote_asset": client.get_symbol_info(symbol=symbol)["quoteAsset"],
-            "market_endpoint": market_endpoint,
-            "date_range": (startdate, enddate),
-            "candlestick_intervals": [candlestick_interval for candlestick_interval in candlestick_intervals]
-        }
-
-        #save the dbid
-        with open(os.path.join(save_path, "dbid.json"), 'w') as fp:
-            json.dump(dbid, fp,  indent=4)
-        
-        return cls(path=save_path)
+        Description:
+            Returns whether save_path is an interrupted creation: a directory without dbid that only holds the requested intervals
+            and the staging of the downloader (<interval>.partial with a committed checkpoint) of at least one of them
+        """
+        if not os.path.isdir(save_path) or os.path.isfile(os.path.join(save_path, "dbid.json")):
+            return False
+        entries = os.listdir(save_path)
+        staged = [entry for entry in entries if entry.endswith(".partial") and os.path.isfile(os.path.join(save_path, entry, "checkpoint.json"))]
+        return len(staged) > 0 and all(entry in candlestick_intervals or entry in staged and entry[:-len(".partial")] in candlestick_intervals for entry in entries)
 
 if __name__ == "__main__":
     """
     Example for creating a database
     """
-    import datetime
-
     db = DataBase.create(
         save_path="/Users/fabio/Desktop/project-proteus/databases/test_futures",
         symbol="BTCUSDT",
@@ -1,28 +1,28 @@
 #standard libraries
-import atexit
 import json
 import os
 
+#package imports
+from project_proteus.utils import atomic_write
+
 class DbId():
     """
     Description:
         Class which can be used like a dictionary.
-        This Class is not threadsafe! The changes to the dictionary, only get written to disk when the instance goes out of scope!
-        To write changes to the harddrive use self.dump()
+        This Class is not threadsafe! The changes to the dictionary only get written to disk with self.dump(),
+        an instance never writes on its own (e.g. at exit), so an outdated instance can not overwrite the changes of another one
     Arguments:
         -path[string]:     Path of the database
+        -filename[string]: Name of the json file (e.g. the catalog of a MarketStore)
     """
 
-    def __init__(self, path):
+    def __init__(self, path, filename="dbid.json"):
         #save path of dbid
-        self.path = os.path.join(path, "dbid.json")
+        self.path = os.path.join(path, filename)
 
         #load in the dbid
         with open(self.path) as json_file:
             self.dbid = json.load(json_file)
-
-        #register the dump at the end of lifetime
-        atexit.register(self.dump)
         
     def __getitem__(self, key):
         return self.dbid[key]
@@ -31,9 +31,18 @@ class DbId():
         #change the dict in ram
         self.dbid[key] = item
 
+    def __contains__(self, key):
+        return key in self.dbid
+
+    def get(self, key, default=None):
+        return self.dbid.get(key, default)
+
+    def setdefault(self, key, default=None):
+        return self.dbid.setdefault(key, default)
+
     def dump(self):
-        #save changes to json file
-        with open(self.path, 'w') as fp:
+        #save changes
+        with atomic_write(self.path) as fp:
             json.dump(self.dbid, fp,  indent=4)
 
 if __name__ == "__main__":
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+#standard libraries imports
+import collections
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.utils.lazy_import import lazy_import
+from project_proteus.database.storage import NpyStorage
+from project_proteus.utils import read_config, interval_to_milliseconds, date_to_milliseconds, atomic_write
+
+pd = lazy_import("pandas")
+
+
+#request weight budget per minute of the endpoints (the limits of the exchange with some headroom)
+WEIGHT_PER_MINUTE = {
+    "spot": 5000,
+    "futures": 2000
+}
+
+#maximum number of klines per request
+KLINES_LIMIT = {
+    "spot": 1000,
+    "futures": 1500
+}
+
+#number of klines per chunk when a staged interval gets converted into another storage format
+FINALIZE_ROWS = 65536
+
+
+def kline_request_weight(market_endpoint, limit) -> int:
+    """
+    Description:
+        Returns the request weight of a klines request
+    """
+    if market_endpoint == "spot":
+        return 2
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def klines_to_dataframe(raw_data, after=None) -> pd.DataFrame:
+    """
+    Description:
+        Converts klines in the raw format of the Binance API into the kline dataframe of a DataBase and validates them (vectorized)
+    Arguments:
+        -raw_data[list]:                        The klines as returned by the Binance API
+        -after[int]:                            Open time in nanoseconds, klines that are not after it get dropped (e.g. the overlap with already saved klines)
+    Return:
+        -data[pd.DataFrame]:                    The klines with the columns: open_time, open, high, low, close, volume, close_time
+    """
+    #convert the columns
+    open_time = np.array([kline[0] for kline in raw_data], dtype=np.int64) * 1000000
+    close_time = (np.array([kline[6] for kline in raw_data], dtype=np.int64) + 1) * 1000000
+    values = np.array([kline[1:6] for kline in raw_data], dtype=np.float64).reshape(-1, 5)
+
+    #check for nan values
+    if not np.isfinite(values).all():
+        raise Exception("Nan values in data, please discard this object and try again")
+
+    #check the order
+    if (np.diff(open_time) <= 0).any() or (close_time <= open_time).any():
+        raise Exception("The klines are not in chronological order, please discard this object and try again")
+
+    #drop the overlap
+    if after is not None:
+        keep = open_time > after
+        open_time, close_time, values = open_time[keep], close_time[keep], values[keep]
+
+    return pd.DataFrame({
+        "open_time": open_time.view("datetime64[ns]"),
+        "open": values[:, 0],
+        "high": values[:, 1],
+        "low": values[:, 2],
+        "close": values[:, 3],
+        "volume": values[:, 4],
+        "close_time": close_time.view("datetime64[ns]")
+    }, copy=False)
+
+
+class RateLimiter():
+    """
+    Description:
+        Thread-safe sliding window limiter for the request weight of an endpoint:
+        the weight of all requests of the last 60 seconds never exceeds weight_per_minute, a request blocks until its weight fits.
+    Arguments:
+        -weight_per_minute[int]:    The request weight budget per minute
+    """
+
+    def __init__(self, weight_per_minute):
+        #save the params
+        self.weight_per_minute = weight_per_minute
+
+        #weights of the requests in the last 60 seconds
+        self.requests = collections.deque()
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight) -> None:
+        """
+        Description:
+            Blocks until the weight fits into the budget and books it
+        """
+        while True:
+            with self._lock:
+                #forget the requests that left the window
+                now = time.monotonic()
+                while self.requests and self.requests[0][0] <= now-60:
+                    self.used -= self.requests.popleft()[1]
+
+                #book the weight
+                if self.used + weight <= self.weight_per_minute or not self.requests:
+                    self.requests.append((now, weight))
+                    self.used += weight
+                    return
+
+                #time until the oldest request leaves the window
+                wait = self.requests[0][0] + 60 - now
+
+            time.sleep(wait)
+
+
+class BulkDownloader():
+    """
+    Description:
+        Downloads the klines of many (symbol, candlestick_interval) pairs concurrently.
+        All workers share one pooled client and one request weight budget per market endpoint.
+    Arguments:
+        -config_path[string]:           Path to the config file, if none is given, it is assumed that the config-file is in the same folder as the file this method gets called from
+        -max_workers[int]:              Number of concurrent downloads
+        -client_factory[callable]:      Function that creates the client of a market endpoint: client_factory(market_endpoint), if none is given a binance Client gets created
+                                        (e.g. lambda market_endpoint: StubClient() for downloads without network)
+        -weight_per_minute[dict]:       Request weight budget per minute of every market endpoint, defaults to WEIGHT_PER_MINUTE
+        -progress[bool]:                Whether the progress gets printed
+    """
+
+    def __init__(self, config_path=None, max_workers=8, client_factory=None, weight_per_minute=None, progress=True):
+        #save the params
+        self.config_path = config_path
+        self.max_workers = max_workers
+        self.client_factory = client_factory or self._binance_client
+        self.weight_per_minute = dict(WEIGHT_PER_MINUTE, **(weight_per_minute or {}))
+        self.progress = progress
+
+        #pooled clients and rate limiters of the endpoints
+        self.clients = {}
+        self.rate_limiters = {}
+        self._lock = threading.Lock()
+
+    def client(self, market_endpoint):
+        """
+        Description:
+            Returns the pooled client of a market endpoint (gets created on first use)
+        """
+        #check if market_endpoint is available
+        if market_endpoint not in ("spot", "futures"):
+            raise Exception(f"Your chosen market_endpoint: {market_endpoint} is not available")
+
+        with self._lock:
+            if market_endpoint not in self.clients:
+                self.clients[market_endpoint] = self.client_factory(market_endpoint)
+                self.rate_limiters[market_endpoint] = RateLimiter(self.weight_per_minute[market_endpoint])
+            return self.clients[market_endpoint]
+
+    def symbol_info(self, symbol, market_endpoint) -> dict:
+        """
+        Description:
+            Returns the symbol info (baseAsset, quoteAsset, ...) of a symbol
+        """
+        client = self.client(market_endpoint)
+        self.rate_limiters[market_endpoint].acquire(20)
+        info = client.get_symbol_info(symbol=symbol)
+        if info is None:
+            raise Exception(f"Your chosen symbol: {symbol} is not available")
+        return info
+
+    def iter_kline_pages(self, symbol, market_endpoint, start_date, end_date, candlestick_interval):
+        """
+        Description:
+            Walks through the klines with start_date <= open_time <= end_date page by page (every page is one request).
+        Arguments:
+            -symbol[string]:                        The Cryptocurrency you want to trade (Note: With accordance to the Binance API)
+            -market_endpoint[str]:                  From which market to get the data from, either: "spot" or "futures"
+            -start_date[string, int]:               The date of the start of your data (or milliseconds since epoch)
+            -end_date[string, int]:                 The date of the end of your data (or milliseconds since epoch)
+            -candlestick_interval[string]:          On what interval the candlestick data should be downloaded
+        Return:
+            -pages[generator]:                      Yields the pages in the raw format of the Binance API
+        """
+        #get the client
+        client = self.client(market_endpoint)
+        rate_limiter = self.rate_limiters[market_endpoint]
+        request = client.get_klines if market_endpoint == "spot" else client.futures_klines
+        limit = KLINES_LIMIT[market_endpoint]
+        weight = kline_request_weight(market_endpoint, limit)
+
+        #get the time range
+        start_time = start_date if type(start_date) == int else date_to_milliseconds(start_date)
+        end_time = end_date if type(end_date) == int else date_to_milliseconds(end_date)
+        interval_ms = interval_to_milliseconds(candlestick_interval)
+
+        while start_time <= end_time:
+            #download the page
+            rate_limiter.acquire(weight)
+            page = request(symbol=symbol, interval=candlestick_interval, startTime=start_time, endTime=end_time, limit=limit)
+            if len(page) == 0:
+                break
+
+            yield page
+
+            #move to the next page
+            start_time = page[-1][0] + interval_ms
+            if len(page) < limit:
+                break
+
+    def download_kline_interval(self, symbol, market_endpoint, start_date, end_date, candlestick_interval) -> pd.DataFrame:
+        """
+        Description:
+            Downloads all klines of one (symbol, candlestick_interval) pair, see iter_kline_pages for the arguments
+        Return:
+            -data[pd.DataFrame]:                    The klines with the columns: open_time, open, high, low, close, volume, close_time
+        """
+        raw_data = []
+        for page in self.iter_kline_pages(symbol=symbol, market_endpoint=market_endpoint, start_date=start_date, end_date=end_date, candlestick_interval=candlestick_interval):
+            raw_data.extend(page)
+
+        if len(raw_data) == 0:
+            raise Exception(f"There are no {candlestick_interval} klines of {symbol} in your chosen date range")
+
+        return klines_to_dataframe(raw_data)
+
+    def ingest_kline_interval(self, path, storage, symbol, market_endpoint, start_date, end_date, candlestick_interval) -> int:
+        """
+        Description:
+            Streams the klines of one (symbol, candlestick_interval) pair page by page to disk, so the memory stays bounded by one page.
+            The pages get appended to npy columns in <path>.partial and after every page a checkpoint gets committed.
+            If the ingestion gets interrupted, calling it again resumes after the last committed open_time.
+            When all pages are saved, the interval gets moved (or converted chunk by chunk into the chosen storage format) to path.
+        Arguments:
+            -path[string]:                          Path of the interval directory that gets created
+            -storage[Storage]:                      The storage format of the interval
+            -see iter_kline_pages for the other arguments
+        Return:
+            -rows[int]:                             Number of saved klines
+        """
+        #setup the staging directory
+        partial_path = f"{path}.partial"
+        checkpoint_path = os.path.join(partial_path, "checkpoint.json")
+        staging = NpyStorage(float_dtype=storage.float_dtype)
+        os.makedirs(partial_path, exist_ok=True)
+
+        #load the checkpoint of an interrupted ingestion
+        checkpoint = {"rows": 0, "last_open_time": None}
+        if os.path.isfile(checkpoint_path):
+            with open(checkpoint_path) as fp:
+                checkpoint = json.load(fp)
+
+        #resume after the last committed open_time
+        if checkpoint["last_open_time"] is not None:
+            start_date = checkpoint["last_open_time"] // 1000000 + interval_to_milliseconds(candlestick_interval)
+
+        for page in self.iter_kline_pages(symbol=symbol, market_endpoint=market_endpoint, start_date=start_date, end_date=end_date, candlestick_interval=candlestick_interval):
+            #convert and validate the page
+            data = klines_to_dataframe(page, after=checkpoint["last_open_time"])
+            if len(data) == 0:
+                continue
+
+            #append the page
+            staging.append(partial_path, candlestick_interval, data, start_row=checkpoint["rows"])
+
+            #commit the checkpoint
+            checkpoint = {"rows": checkpoint["rows"] + len(data), "last_open_time": int(data["open_time"].iloc[-1].value)}
+            with atomic_write(checkpoint_path) as fp:
+                json.dump(checkpoint, fp)
+
+        if checkpoint["rows"] == 0:
+            shutil.rmtree(partial_path)
+            raise Exception(f"There are no {candlestick_interval} klines of {symbol} in your chosen date range")
+
+        #move the interval into place (the checkpoint is kept until then, so an interrupted conversion gets resumed)
+        if storage.name == staging.name:
+            os.rename(partial_path, path)
+            os.remove(os.path.join(path, "checkpoint.json"))
+        else:
+            #convert the staged columns chunk by chunk, so the memory stays bounded whatever the storage format is
+            converted_path = os.path.join(partial_path, storage.name)
+            shutil.rmtree(converted_path, ignore_errors=True)
+            os.mkdir(converted_path)
+            rows = checkpoint["rows"]
+            chunks = (staging.read(partial_path, candlestick_interval, rows=slice(start, min(start+FINALIZE_ROWS, rows))) for start in range(0, rows, FINALIZE_ROWS))
+            storage.write_chunks(converted_path, candlestick_interval, chunks)
+            os.rename(converted_path, path)
+            shutil.rmtree(partial_path)
+
+        return checkpoint["rows"]
+
+    def ingest(self, tasks, storage):
+        """
+        Description:
+            Streams the klines of many (symbol, candlestick_interval) pairs concurrently to disk, see ingest_kline_interval
+        Arguments:
+            -tasks[list[tuple]]:                    List of (path, symbol, market_endpoint, start_date, end_date, candlestick_interval)
+            -storage[Storage]:                      The storage format of the intervals
+        Return:
+            -results[generator]:                    Yields (task, rows) in the order in which the ingestions finish
+        """
+        tasks = list(tasks)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.ingest_kline_interval, task[0], storage, *task[1:]): task for task in tasks}
+            try:
+                for finished, future in enumerate(as_completed(futures), start=1):
+                    task = futures[future]
+                    rows = future.result()
+                    if self.progress:
+                        print(f"Downloaded {task[5]} klines of {task[1]} from endpoint: {task[2]} ({finished}/{len(tasks)})")
+                    yield task, rows
+            finally:
+                #do not start the remaining ingestions if something failed
+                for future in futures:
+                    future.cancel()
+
+    def download(self, tasks):
+        """
+        Description:
+            Downloads the klines of many (symbol, candlestick_interval) pairs concurrently
+        Arguments:
+            -tasks[list[tuple]]:                    List of (symbol, market_endpoint, start_date, end_date, candlestick_interval)
+        Return:
+            -results[generator]:                    Yields (task, data) in the order in which the downloads finish
+        """
+        tasks = list(tasks)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.download_kline_interval, *task): task for task in tasks}
+            try:
+                for finished, future in enumerate(as_completed(futures), start=1):
+                    task = futures[future]
+                    data = future.result()
+                    if self.progress:
+                        print(f"Downloaded {task[4]} klines of {task[0]} from endpoint: {task[1]} ({finished}/{len(tasks)})")
+                    yield task, data
+            finally:
+                #do not start the remaining downloads if something failed
+                for future in futures:
+                    future.cancel()
+
+    def _binance_client(self, market_endpoint):
+        """
+        Description:
+            Creates a binance Client, its connection pool is big enough for all workers
+        """
+        from binance.client import Client
+        from requests.adapters import HTTPAdapter
+
+        #read in the config
+        config = read_config(path=self.config_path)
+
+        #create the client
+        client = Client(api_key=config["binance"]["key"], api_secret=config["binance"]["secret"])
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(self.max_workers, 10))
+        client.session.mount("https://", adapter)
+
+        return client
@@ -0,0 +1,168 @@
+#standard libraries imports
+import hashlib
+import json
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+
+#version of the kernels, bump it when a kernel changes so all stored features get recomputed
+FEATURE_VERSION = 1
+#number of rows at the end of an interval whose klines go into the hash of a feature (an update replaces the last, previously unclosed candle)
+FEATURE_DIGEST_ROWS = 64
+
+
+def _shift(values, periods=1) -> np.ndarray:
+    shifted = np.empty_like(values)
+    shifted[:periods] = np.nan
+    shifted[periods:] = values[:-periods]
+    return shifted
+
+def _rolling(values, window, reduction) -> np.ndarray:
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        result[window-1:] = reduction(np.lib.stride_tricks.sliding_window_view(values, window), axis=1)
+    return result
+
+def _wilder(values, window) -> np.ndarray:
+    #exponential moving average with alpha=1/window (Wilder's smoothing), the first window values are not defined
+    result = pd.Series(values).ewm(alpha=1/window, adjust=False, ignore_na=True).mean().to_numpy(copy=True)
+    result[:window] = np.nan
+    return result
+
+def _return(data):
+    return data["close"] / _shift(data["close"]) - 1
+
+def _log_return(data):
+    return np.log(data["close"] / _shift(data["close"]))
+
+def _sma(data, window):
+    return _rolling(data["close"], window, np.mean)
+
+def _ema(data, window):
+    result = pd.Series(data["close"]).ewm(span=window, adjust=False).mean().to_numpy(copy=True)
+    result[:window-1] = np.nan
+    return result
+
+def _volatility(data, window):
+    return _rolling(_log_return(data), window, lambda values, axis: np.std(values, axis=axis, ddof=1))
+
+def _rsi(data, window):
+    change = data["close"] - _shift(data["close"])
+    gain = _wilder(np.clip(change, 0, None), window)
+    loss = _wilder(np.clip(-change, 0, None), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + gain/loss)
+    return np.where(loss == 0, 100.0, rsi)
+
+def _atr(data, window):
+    previous_close = _shift(data["close"])
+    true_range = np.fmax(data["high"]-data["low"], np.fmax(np.abs(data["high"]-previous_close), np.abs(data["low"]-previous_close)))
+    return _wilder(true_range, window)
+
+
+#all feature kernels: name -> (kernel, needed kline columns, whether it takes a window, warmup rows(window))
+FEATURE_KERNELS = {
+    "return": (_return, ["close"], False, lambda window: 1),
+    "log_return": (_log_return, ["close"], False, lambda window: 1),
+    "sma": (_sma, ["close"], True, lambda window: window-1),
+    "ema": (_ema, ["close"], True, lambda window: window-1),
+    "volatility": (_volatility, ["close"], True, lambda window: window),
+    "rsi": (_rsi, ["close"], True, lambda window: window),
+    "atr": (_atr, ["high", "low", "close"], True, lambda window: window)
+}
+
+
+def parse_feature(name) -> tuple:
+    """
+    Description:
+        Splits a feature name into its kernel and window e.g. "rsi_14" -> ("rsi", 14), "log_return" -> ("log_return", None)
+    Return:
+        -feature[tuple]:                        (kernel name, window) or None if the name is not a feature
+    """
+    if name in FEATURE_KERNELS and not FEATURE_KERNELS[name][2]:
+        return name, None
+
+    kernel, _, window = name.rpartition("_")
+    if kernel in FEATURE_KERNELS and FEATURE_KERNELS[kernel][2] and window.isdigit() and int(window) > 0:
+        return kernel, int(window)
+
+    return None
+
+
+def is_feature(name) -> bool:
+    return parse_feature(name) is not None
+
+
+def feature_columns(name) -> list:
+    """
+    Description:
+        Returns the kline columns a feature gets computed from
+    """
+    return FEATURE_KERNELS[parse_feature(name)[0]][1]
+
+
+def feature_warmup(name) -> int:
+    """
+    Description:
+        Returns the number of rows at the start of an interval for which a feature is not defined (nan)
+    """
+    kernel, window = parse_feature(name)
+    return FEATURE_KERNELS[kernel][3](window)
+
+
+def feature_hash(name, open_time, dtype="float64", digest=None) -> str:
+    """
+    Description:
+        Hash of the feature spec and the data it gets computed from, a stored feature is up to date as long as its hash matches
+    Arguments:
+        -name[string]:                          The feature name
+        -open_time[np.ndarray]:                 The open_time column of the interval (int64 nanoseconds)
+        -dtype[string]:                         Dtype in which the feature gets saved
+        -digest[string]:                        Digest of the last klines the feature gets computed from (see kline_digest),
+                                                so a replaced candle changes the hash even if the rows and open_times stay the same
+    """
+    spec = [name, FEATURE_VERSION, dtype, len(open_time), int(open_time[0]) if len(open_time) else None, int(open_time[-1]) if len(open_time) else None, digest]
+    return hashlib.sha1(json.dumps(spec).encode()).hexdigest()[:16]
+
+
+def kline_digest(name, data) -> str:
+    """
+    Description:
+        Cheap digest of the klines at the end of an interval that a feature gets computed from
+    Arguments:
+        -name[string]:                          The feature name
+        -data[dict]:                            Kline columns -> values of the last FEATURE_DIGEST_ROWS rows (at least the columns of the feature)
+    """
+    digest = hashlib.sha1()
+    for column in feature_columns(name):
+        digest.update(np.ascontiguousarray(data[column], dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def compute_feature(name, data) -> np.ndarray:
+    """
+    Description:
+        Computes a feature with its vectorized kernel
+    Arguments:
+        -name[string]:                          The feature name e.g. "rsi_14"
+        -data[dict]:                            The needed kline columns as float64 arrays (see feature_columns)
+    Return:
+        -values[np.ndarray]:                    The feature in the shape (rows,), undefined rows are nan
+    """
+    #check if the feature is available
+    feature = parse_feature(name)
+    if feature is None:
+        raise Exception(f"The chosen feature: {name} is not available")
+
+    #compute the feature
+    kernel, window = feature
+    function = FEATURE_KERNELS[kernel][0]
+    data = {column: np.asarray(data[column], dtype=np.float64) for column in FEATURE_KERNELS[kernel][1]}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return function(data) if window is None else function(data, window)
@@ -0,0 +1,195 @@
+#standard libraries imports
+import zlib
+
+#external libraries imports
+import numpy as np
+
+
+class ZlibCompressor():
+    """
+    Description:
+        zlib compression (standard library, always available)
+    """
+
+    name = "zlib"
+    default_level = 6
+
+    def __init__(self, level=None):
+        self.level = self.default_level if level is None else level
+
+    def compress(self, data) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data) -> bytes:
+        return zlib.decompress(data)
+
+
+class Lz4Compressor():
+    """
+    Description:
+        lz4 frame compression, very fast decompression (needs the lz4 package)
+    """
+
+    name = "lz4"
+    default_level = 0
+
+    def __init__(self, level=None):
+        try:
+            import lz4.frame
+        except ImportError:
+            raise Exception("The lz4 codec needs the lz4 package, please install it with: pip install lz4")
+        self.lz4 = lz4.frame
+        self.level = self.default_level if level is None else level
+
+    def compress(self, data) -> bytes:
+        return self.lz4.compress(data, compression_level=self.level)
+
+    def decompress(self, data) -> bytes:
+        return self.lz4.decompress(data)
+
+
+class ZstdCompressor():
+    """
+    Description:
+        zstandard compression, better ratio than zlib at a higher speed (needs the zstandard package)
+    """
+
+    name = "zstd"
+    default_level = 3
+
+    def __init__(self, level=None):
+        try:
+            import zstandard
+        except ImportError:
+            raise Exception("The zstd codec needs the zstandard package, please install it with: pip install zstandard")
+        self.level = self.default_level if level is None else level
+        self.compressor = zstandard.ZstdCompressor(level=self.level)
+        self.decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data) -> bytes:
+        return self.compressor.compress(data)
+
+    def decompress(self, data) -> bytes:
+        return self.decompressor.decompress(data)
+
+
+#all available compressors
+COMPRESSORS = {
+    ZlibCompressor.name: ZlibCompressor,
+    Lz4Compressor.name: Lz4Compressor,
+    ZstdCompressor.name: ZstdCompressor
+}
+
+#available encodings of the float columns
+FLOAT_ENCODINGS = ["shuffle", "xor"]
+
+
+def get_compressor(codec="zlib", level=None):
+    """
+    Description:
+        Creates the compressor of a codec
+    Arguments:
+        -codec[string]:         The name of the codec, either: "zlib", "lz4" or "zstd"
+        -level[int]:            The compression level, if none is given the default level of the codec is used
+    """
+    if codec not in COMPRESSORS:
+        raise Exception(f"Your chosen codec: {codec} is not available, the available codecs are: {list(COMPRESSORS)}")
+    return COMPRESSORS[codec](level=level)
+
+
+"""
+Encodings: every block gets encoded on its own, so blocks can be decoded independently
+"""
+def shuffle(values) -> bytes:
+    """
+    Description:
+        Byte shuffle: groups the n-th byte of every value together (all sign/exponent bytes, then the mantissa bytes ...),
+        similar values then produce long runs the compressor can exploit
+    """
+    return np.ascontiguousarray(values).view(np.uint8).reshape(len(values), values.dtype.itemsize).T.tobytes()
+
+
+def unshuffle(data, dtype) -> np.ndarray:
+    """
+    Description:
+        Inverse of shuffle
+    """
+    dtype = np.dtype(dtype)
+    data = np.frombuffer(data, dtype=np.uint8)
+    return np.ascontiguousarray(data.reshape(dtype.itemsize, len(data) // dtype.itemsize).T).view(dtype).ravel()
+
+
+def encode_delta_of_delta(values) -> np.ndarray:
+    """
+    Description:
+        Delta-of-delta encoding of int64 timestamps: [first value, first delta, second differences...],
+        regular timestamps (e.g. open_time) become all zeros after the first two values
+    """
+    values = np.asarray(values, dtype=np.int64)
+    encoded = np.empty_like(values)
+    encoded[:1] = values[:1]
+    encoded[1:2] = np.diff(values[:2])
+    encoded[2:] = np.diff(values, n=2)
+    return encoded
+
+
+def decode_delta_of_delta(encoded) -> np.ndarray:
+    """
+    Description:
+        Inverse of encode_delta_of_delta (integer overflows wrap around in both directions, so the decoding is exact)
+    """
+    deltas = np.cumsum(encoded[1:])
+    values = np.empty_like(encoded)
+    values[:1] = encoded[:1]
+    values[1:] = encoded[0] + np.cumsum(deltas)
+    return values
+
+
+def encode_xor(values) -> np.ndarray:
+    """
+    Description:
+        XOR encoding of floats: every value gets XORed bitwise with its predecessor,
+        the equal sign/exponent/leading mantissa bits of consecutive prices become zeros
+    """
+    bits = np.ascontiguousarray(values).view(f"uint{values.dtype.itemsize*8}")
+    encoded = bits.copy()
+    encoded[1:] ^= bits[:-1]
+    return encoded
+
+
+def decode_xor(encoded, dtype) -> np.ndarray:
+    """
+    Description:
+        Inverse of encode_xor
+    """
+    return np.bitwise_xor.accumulate(encoded).view(dtype)
+
+
+def encode_block(values, encoding, compressor) -> bytes:
+    """
+    Description:
+        Encodes and compresses one block of a column
+    Arguments:
+        -values[np.ndarray]:        The values of the block (int64 for "delta_of_delta", float64/float32 otherwise)
+        -encoding[string]:          Either: "delta_of_delta", "shuffle" or "xor"
+        -compressor[object]:        The compressor (see get_compressor)
+    """
+    if encoding == "delta_of_delta":
+        values = encode_delta_of_delta(values)
+    elif encoding == "xor":
+        values = encode_xor(values)
+    elif encoding != "shuffle":
+        raise Exception(f"The encoding: {encoding} is not available")
+    return compressor.compress(shuffle(values))
+
+
+def decode_block(data, encoding, dtype, compressor) -> np.ndarray:
+    """
+    Description:
+        Decompresses and decodes one block of a column (inverse of encode_block)
+    """
+    if encoding == "delta_of_delta":
+        return decode_delta_of_delta(unshuffle(compressor.decompress(data), np.int64))
+    elif encoding == "xor":
+        return decode_xor(unshuffle(compressor.decompress(data), f"uint{np.dtype(dtype).itemsize*8}"), dtype)
+    return unshuffle(compressor.decompress(data), dtype)
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+#standard libraries imports
+import os
+import json
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.database import DbId
+from project_proteus.database.database import DataBase
+from project_proteus.database.storage import KLINE_COLUMNS, TIME_COLUMNS
+from project_proteus.database.features import is_feature
+from project_proteus.database.resample import INTERVAL_ORIGINS
+from project_proteus.utils import interval_to_milliseconds, get_instrumentation, atomic_write
+
+
+class MarketStore():
+    """
+    Description:
+        Multi-symbol store on top of single-symbol DataBases: the klines of all symbols are aligned to one canonical time axis per interval,
+        so a read returns one dense array in the shape (time, symbol, feature) together with a mask of the candles that exist.
+        Row k of the time axis of an interval is the candle with open_time = origin + k*interval (origin is the epoch, mondays for weeks),
+        every symbol saves its aligned features as <interval>/<symbol>.npy (rows, features) and its mask as <interval>/<symbol>.mask.npy,
+        starting at its own first row of the axis. Adding or updating a symbol therefore never rewrites the files of the other symbols.
+        The catalog (symbols x intervals, the used rows of every axis) is saved in catalog.json.
+    Arguments:
+        -path[string]:          Path of the MarketStore
+    """
+
+    def __init__(self, path):
+        #check if the path is a market store
+        if not os.path.isfile(os.path.join(path, "catalog.json")):
+            raise Exception("The path you chose is not a MarketStore")
+
+        #save the params
+        self.path = path
+
+        #setup the catalog
+        self.catalog = DbId(path=self.path, filename="catalog.json")
+
+        #setup the instrumentation
+        self.instrumentation = get_instrumentation()
+
+    @classmethod
+    def create(cls, path: str, candlestick_intervals: list, features: list = None, dtype: str = "float64", databases: list = None) -> MarketStore:
+        """
+        Description:
+            Creates an empty MarketStore-Folder (and adds the given databases)
+        Arguments:
+            -path[string]:                          Location of the MarketStore-Folder (must not exist)
+            -candlestick_intervals[list[string]]:   The intervals of the store, every added DataBase needs all of them (the irregular "1M" is not possible)
+            -features[list[string]]:                The features of every symbol, if none are given open, high, low, close and volume are used
+                                                    (computed features e.g. "rsi_14" get computed in the DataBases, see DataBase.add_features)
+            -dtype[string]:                         Dtype of the aligned features, either: "float64" or "float32"
+            -databases[list]:                       DataBases (or their paths) that get added
+        Return:
+            -store[MarketStore]:                    The created MarketStore
+        """
+        #check if the arguments are possible
+        if os.path.exists(path):
+            raise Exception("Please choose a directory, that does not already exist")
+        if dtype not in ("float64", "float32"):
+            raise Exception(f"Your chosen dtype: {dtype} is not available")
+        for candlestick_interval in candlestick_intervals:
+            interval_to_milliseconds(candlestick_interval)
+
+        #create the directories
+        os.makedirs(path)
+        for candlestick_interval in candlestick_intervals:
+            os.mkdir(os.path.join(path, candlestick_interval))
+
+        #save the catalog
+        catalog = {
+            "candlestick_intervals": list(candlestick_intervals),
+            "features": list(features or [feature for feature in KLINE_COLUMNS if feature not in TIME_COLUMNS]),
+            "dtype": dtype,
+            "axes": {candlestick_interval: {"origin": INTERVAL_ORIGINS.get(candlestick_interval[-1], 0), "start_row": None, "stop_row": None} for candlestick_interval in candlestick_intervals},
+            "symbols": {}
+        }
+        with atomic_write(os.path.join(path, "catalog.json")) as fp:
+            json.dump(catalog, fp, indent=4)
+
+        #add the databases
+        store = cls(path)
+        for database in databases or []:
+            store.add_symbol(database)
+
+        return store
+
+    """
+    Catalog
+    """
+    @property
+    def symbols(self) -> list:
+        return list(self.catalog["symbols"])
+
+    @property
+    def candlestick_intervals(self) -> list:
+        return list(self.catalog["candlestick_intervals"])
+
+    @property
+    def features(self) -> list:
+        return list(self.catalog["features"])
+
+    def symbol_path(self, candlestick_interval, symbol) -> str:
+        return os.path.join(self.path, candlestick_interval, f"{symbol}.npy")
+
+    def mask_path(self, candlestick_interval, symbol) -> str:
+        return os.path.join(self.path, candlestick_interval, f"{symbol}.mask.npy")
+
+    def _interval_ns(self, candlestick_interval) -> int:
+        return interval_to_milliseconds(candlestick_interval) * 1000000
+
+    def _origin_ns(self, candlestick_interval) -> int:
+        return self.catalog["axes"][candlestick_interval]["origin"] * 1000000
+
+    def time_to_row(self, candlestick_interval, time) -> int:
+        """
+        Description:
+            Returns the first row of the time axis whose open_time is >= time
+        """
+        nanoseconds = DataBase._to_nanoseconds(time)
+        return -(-(nanoseconds - self._origin_ns(candlestick_interval)) // self._interval_ns(candlestick_interval))
+
+    def time_axis(self, candlestick_interval, rows=None) -> np.ndarray:
+        """
+        Description:
+            Returns the open_times of the rows of the time axis (defaults to all rows that hold a candle of any symbol)
+        Arguments:
+            -candlestick_interval[string]:          The candlestick_interval of the axis
+            -rows[slice]:                           The rows of the axis
+        Return:
+            -open_time[np.ndarray]:                 The open_times as datetime64[ns] in the shape (rows,)
+        """
+        rows = self._axis_rows(candlestick_interval) if rows is None else rows
+        return (self._origin_ns(candlestick_interval) + np.arange(rows.start, rows.stop, dtype=np.int64) * self._interval_ns(candlestick_interval)).view("datetime64[ns]")
+
+    def _axis_rows(self, candlestick_interval, time_slice=None) -> slice:
+        """
+        Description:
+            Converts a time slice (start <= open_time < end) into the rows of the time axis, open ends are bounded by the rows that hold candles
+        """
+        axis = self.catalog["axes"][candlestick_interval]
+        start, stop = axis["start_row"] or 0, axis["stop_row"] or 0
+        if time_slice is not None:
+            if time_slice.step is not None:
+                raise Exception("A step is not possible in a time slice")
+            if time_slice.start is not None:
+                start = self.time_to_row(candlestick_interval, time_slice.start)
+            if time_slice.stop is not None:
+                stop = self.time_to_row(candlestick_interval, time_slice.stop)
+        return slice(start, max(start, stop))
+
+    def _update_axes(self) -> None:
+        #the axis of every interval spans the rows of all symbols
+        for candlestick_interval in self.candlestick_intervals:
+            entries = [info["intervals"][candlestick_interval] for info in self.catalog["symbols"].values()]
+            axis = self.catalog["axes"][candlestick_interval]
+            axis["start_row"] = min([entry["offset"] for entry in entries], default=None)
+            axis["stop_row"] = max([entry["offset"] + entry["rows"] for entry in entries], default=None)
+
+    """
+    Adding and removing symbols
+    """
+    def add_symbol(self, database, symbol=None) -> None:
+        """
+        Description:
+            Aligns the features of a DataBase to the time axes and saves them, only the files of this symbol get written.
+            Adding a symbol again (e.g. after DataBase.update) replaces its data.
+        Arguments:
+            -database[DataBase, string]:            The DataBase (or its path) of the symbol
+            -symbol[string]:                        The name of the symbol in the store, defaults to the symbol of the DataBase
+        """
+        #open the database
+        if not isinstance(database, DataBase):
+            database = DataBase(path=database)
+        symbol = symbol or database.dbid["symbol"]
+
+        #check if all intervals are available
+        for candlestick_interval in self.candlestick_intervals:
+            if not database.check_candlestick_interval(candlestick_interval):
+                raise Exception(f"The candlestick interval: {candlestick_interval} is not available in the DataBase of {symbol}")
+
+        intervals = {}
+        for candlestick_interval in self.candlestick_intervals:
+            with self.instrumentation.span("market_store.add_symbol", symbol=symbol, interval=candlestick_interval):
+                #computed features are computed once and stored in the database
+                computed_features = [feature for feature in self.features if is_feature(feature)]
+                if computed_features:
+                    database.add_features(candlestick_interval, computed_features)
+
+                #get the rows of the candles on the time axis
+                open_time = database[candlestick_interval, "open_time"]["open_time"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+                offset_ns = open_time - self._origin_ns(candlestick_interval)
+                if len(open_time) == 0:
+                    raise Exception(f"The DataBase of {symbol} has no candles in the candlestick interval: {candlestick_interval}")
+                if (offset_ns % self._interval_ns(candlestick_interval)).any():
+                    raise Exception(f"The candles of {symbol} in the candlestick interval: {candlestick_interval} are not aligned to the time axis")
+                rows = offset_ns // self._interval_ns(candlestick_interval)
+                offset, length = int(rows[0]), int(rows[-1] - rows[0] + 1)
+
+                #scatter the candles into the dense rows, missing candles stay NaN and get masked out
+                values = database[candlestick_interval, self.features].to_numpy(dtype=self.catalog["dtype"])
+                data = np.full((length, len(self.features)), np.nan, dtype=self.catalog["dtype"])
+                data[rows - offset] = values
+                mask = np.zeros(length, dtype=bool)
+                mask[rows - offset] = True
+
+                for path, array in ((self.symbol_path(candlestick_interval, symbol), data), (self.mask_path(candlestick_interval, symbol), mask)):
+                    with atomic_write(path, "wb") as fp:
+                        np.save(fp, array)
+
+                intervals[candlestick_interval] = {"offset": offset, "rows": length, "candles": int(len(rows))}
+
+        #save the symbol in the catalog
+        self.catalog["symbols"][symbol] = {"path": os.path.abspath(database.path), "intervals": intervals}
+        self._update_axes()
+        self.catalog.dump()
+
+    def update_symbol(self, symbol) -> None:
+        """
+        Description:
+            Reads the DataBase of a symbol again (e.g. after DataBase.update), only the files of this symbol get rewritten
+        """
+        self.add_symbol(self.catalog["symbols"][symbol]["path"], symbol=symbol)
+
+    def remove_symbol(self, symbol) -> None:
+        """
+        Description:
+            Removes a symbol from the store
+        """
+        if symbol not in self.catalog["symbols"]:
+            raise Exception(f"The symbol: {symbol} is not in the MarketStore")
+        del self.catalog["symbols"][symbol]
+        self._update_axes()
+        self.catalog.dump()
+        for candlestick_interval in self.candlestick_intervals:
+            for path in (self.symbol_path(candlestick_interval, symbol), self.mask_path(candlestick_interval, symbol)):
+                if os.path.isfile(path):
+                    os.remove(path)
+
+    """
+    Reading
+    """
+    def read(self, candlestick_interval, symbols=None, features=None, time_slice=None) -> tuple:
+        """
+        Description:
+            Reads the aligned features of multiple symbols into one contiguous array, only the rows of the time slice get read from the memory mapped files
+        Arguments:
+            -candlestick_interval[string]:          The candlestick_interval
+            -symbols[list[string]]:                 The symbols in the order of the symbol axis, defaults to all symbols of the store
+            -features[list[string]]:                The features in the order of the feature axis, defaults to all features of the store
+            -time_slice[slice]:                     Slice of datetimes with start <= open_time < end (the start or the end can be left open)
+        Return:
+            -open_time[np.ndarray]:                 The open_times of the rows as datetime64[ns] in the shape (time,)
+            -data[np.ndarray]:                      The features in the shape (time, symbol, feature), missing candles are NaN
+            -mask[np.ndarray]:                      Whether the candle of a symbol exists in the shape (time, symbol)
+        """
+        #check if the arguments are possible
+        if candlestick_interval not in self.catalog["axes"]:
+            raise Exception("Your chosen kline-interval is not available")
+        symbols = self.symbols if symbols is None else list(symbols)
+        for symbol in symbols:
+            if symbol not in self.catalog["symbols"]:
+                raise Exception(f"The symbol: {symbol} is not in the MarketStore")
+        features = self.features if features is None else list(features)
+        if any(feature not in self.features for feature in features):
+            raise Exception("One/multiple of your chosen feature/s is/are not available in this MarketStore")
+        columns = [self.features.index(feature) for feature in features]
+
+        #get the rows of the time axis
+        rows = self._axis_rows(candlestick_interval, time_slice)
+        length = rows.stop - rows.start
+
+        #gather the symbols into the dense array
+        with self.instrumentation.span("market_store.read", interval=candlestick_interval, symbols=len(symbols)):
+            data = np.full((length, len(symbols), len(features)), np.nan, dtype=self.catalog["dtype"])
+            mask = np.zeros((length, len(symbols)), dtype=bool)
+            for i, symbol in enumerate(symbols):
+                entry = self.catalog["symbols"][symbol]["intervals"][candlestick_interval]
+                start, stop = max(rows.start, entry["offset"]), min(rows.stop, entry["offset"] + entry["rows"])
+                if start >= stop:
+                    continue
+                values = np.load(self.symbol_path(candlestick_interval, symbol), mmap_mode="r")[start - entry["offset"]:stop - entry["offset"]]
+                data[start - rows.start:stop - rows.start, i] = values if columns == list(range(len(self.features))) else values[:, columns]
+                mask[start - rows.start:stop - rows.start, i] = np.load(self.mask_path(candlestick_interval, symbol), mmap_mode="r")[start - entry["offset"]:stop - entry["offset"]]
+
+        return self.time_axis(candlestick_interval, rows), data, mask
+
+    def read_tensors(self, candlestick_interval, symbols=None, features=None, time_slice=None, device="cpu") -> tuple:
+        """
+        Description:
+            Same as read, but returns the data and the mask as torch tensors on the device (on the cpu they share the memory of the arrays)
+        """
+        import torch
+        open_time, data, mask = self.read(candlestick_interval, symbols=symbols, features=features, time_slice=time_slice)
+        return open_time, torch.from_numpy(data).to(device), torch.from_numpy(mask).to(device)
+
+    def __repr__(self):
+        return f"MarketStore(path={self.path!r}, symbols={self.symbols}, candlestick_intervals={self.candlestick_intervals}, features={self.features})"
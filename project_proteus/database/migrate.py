@@ -0,0 +1,27 @@
+#standard libraries imports
+import argparse
+
+#package imports
+from project_proteus.database import DataBase
+
+
+def main(args=None):
+    """
+    Description:
+        Command for converting existing databases in place into another storage format, e.g.:
+        python -m project_proteus.database.migrate /path/to/database --format npy
+    """
+    #parse the arguments
+    parser = argparse.ArgumentParser(description="Convert DataBases in place into another storage format")
+    parser.add_argument("paths", nargs="+", help="Paths of the databases that should be converted")
+    parser.add_argument("--format", default="npy", choices=["csv", "npy", "parquet", "compressed"], help="The storage format the databases should be converted to")
+    parser.add_argument("--float-dtype", default="float64", choices=["float64", "float32"], help="Dtype of the price/volume columns on disk")
+    args = parser.parse_args(args)
+
+    #convert the databases
+    for path in args.paths:
+        db = DataBase(path=path)
+        db.convert_storage(storage_format=args.format, float_dtype=args.float_dtype)
+
+if __name__ == "__main__":
+    main()
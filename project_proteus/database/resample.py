@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.utils.lazy_import import lazy_import
+from project_proteus.utils import interval_to_milliseconds
+from project_proteus.database.storage import KLINE_COLUMNS
+
+pd = lazy_import("pandas")
+
+
+#start of the first candle of every interval unit (binance weeks start on monday, 1970-01-05)
+INTERVAL_ORIGINS = {
+    "w": 4*24*60*60*1000
+}
+
+
+def find_resample_source(candlestick_interval, candlestick_intervals) -> str:
+    """
+    Description:
+        Finds the interval from which candlestick_interval can be resampled: the coarsest interval that evenly divides it
+    Arguments:
+        -candlestick_interval[string]:          The interval that should be created
+        -candlestick_intervals[list[string]]:   The available intervals
+    Return:
+        -source[string]:                        The source interval or None if no interval is possible
+    """
+    try:
+        target_ms = interval_to_milliseconds(candlestick_interval)
+    except Exception:
+        return None
+
+    source, source_ms = None, 0
+    for interval in candlestick_intervals:
+        try:
+            interval_ms = interval_to_milliseconds(interval)
+        except Exception:
+            continue
+        if interval_ms < target_ms and target_ms % interval_ms == 0 and interval_ms > source_ms:
+            source, source_ms = interval, interval_ms
+
+    return source
+
+
+def resample_klines(data, source_interval, candlestick_interval) -> pd.DataFrame:
+    """
+    Description:
+        Builds the klines of a coarser interval out of the klines of a finer interval with vectorized group reductions:
+        first open, max high, min low, last close, summed volume. Incomplete candles at the start and the end get dropped,
+        candles with missing klines in between (exchange outages) are kept, like the exchange does.
+    Arguments:
+        -data[pd.DataFrame]:                    The klines of the source interval
+        -source_interval[string]:               The candlestick_interval of the data
+        -candlestick_interval[string]:          The candlestick_interval of the result
+    Return:
+        -data[pd.DataFrame]:                    The resampled klines
+    """
+    #get the lengths in nanoseconds
+    source_ns = interval_to_milliseconds(source_interval) * 1000000
+    target_ns = interval_to_milliseconds(candlestick_interval) * 1000000
+    origin_ns = INTERVAL_ORIGINS.get(candlestick_interval[-1], 0) * 1000000
+
+    #without klines there is no candle (the reductions need at least one kline)
+    if len(data) == 0:
+        return data[KLINE_COLUMNS].iloc[:0].reset_index(drop=True)
+
+    #assign every kline to its candle
+    open_time = data["open_time"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    bucket = (open_time - origin_ns) // target_ns
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bucket)]
+
+    #reduce the candles (the close_time is the open_time of the next candle, like klines_to_dataframe stores the downloaded klines)
+    resampled = pd.DataFrame({
+        "open_time": (origin_ns + bucket[starts]*target_ns).view("datetime64[ns]"),
+        "open": data["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(data["high"].to_numpy(), starts),
+        "low": np.minimum.reduceat(data["low"].to_numpy(), starts),
+        "close": data["close"].to_numpy()[ends-1],
+        "volume": np.add.reduceat(data["volume"].to_numpy(), starts),
+        "close_time": (origin_ns + (bucket[starts]+1)*target_ns).view("datetime64[ns]")
+    }, copy=False)
+
+    #drop the incomplete candles at the edges
+    complete = (ends-starts) == target_ns // source_ns
+    first = 0 if complete[0] else 1
+    last = len(complete) if complete[-1] else len(complete)-1
+
+    return resampled.iloc[first:max(first, last)].reset_index(drop=True)
@@ -0,0 +1,106 @@
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.utils import interval_to_milliseconds
+
+
+def find_segments(open_time, candlestick_interval, start_row=0) -> np.ndarray:
+    """
+    Description:
+        Finds the contiguous segments of an interval with vectorized diffs: a segment ends wherever two consecutive candles are not exactly one interval apart
+        (missing candles of exchange outages, duplicated or unsorted candles)
+    Arguments:
+        -open_time[np.ndarray]:                 The open_times of the candles as int64 nanoseconds
+        -candlestick_interval[string]:          The candlestick_interval of the candles
+        -start_row[int]:                        Row of the first candle of open_time in the interval (to scan only a tail of the interval)
+    Return:
+        -segments[np.ndarray]:                  The segments [[start_row, stop_row), ...] in the shape (segments, 2)
+    """
+    open_time = np.asarray(open_time, dtype=np.int64)
+    if len(open_time) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    #intervals without a fixed length (1M) can not be checked
+    try:
+        interval_ns = interval_to_milliseconds(candlestick_interval) * 1000000
+    except Exception:
+        return np.array([[start_row, start_row + len(open_time)]], dtype=np.int64)
+
+    #every diff that is not one interval breaks the segment
+    breaks = np.flatnonzero(np.diff(open_time) != interval_ns) + 1
+    bounds = np.concatenate([[0], breaks, [len(open_time)]]).astype(np.int64) + start_row
+
+    return np.stack([bounds[:-1], bounds[1:]], axis=1)
+
+
+def update_segments(segments, open_time, candlestick_interval, from_row) -> np.ndarray:
+    """
+    Description:
+        Updates the segments of an interval whose rows from from_row on changed (e.g. appended candles),
+        only the tail from the start of the first segment that can change gets scanned again
+    Arguments:
+        -segments[np.ndarray]:                  The old segments in the shape (segments, 2)
+        -open_time[np.ndarray]:                 All open_times of the interval as int64 nanoseconds (e.g. a memory map, only the tail gets read)
+        -candlestick_interval[string]:          The candlestick_interval of the candles
+        -from_row[int]:                         The first row that changed
+    Return:
+        -segments[np.ndarray]:                  The new segments in the shape (segments, 2)
+    """
+    #keep the segments whose rows and the diff to their next row did not change
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 2)
+    kept = segments[segments[:, 1] < from_row]
+    start_row = int(kept[-1, 1]) if len(kept) else 0
+
+    return np.concatenate([kept, find_segments(open_time[start_row:], candlestick_interval, start_row=start_row)])
+
+
+def segment_index(segments, open_time, candlestick_interval) -> dict:
+    """
+    Description:
+        Creates the entry of an interval for the segment index of the dbid, the statistics only read the open_times at the segment bounds
+    Arguments:
+        -segments[np.ndarray]:                  The segments in the shape (segments, 2)
+        -open_time[np.ndarray]:                 All open_times of the interval as int64 nanoseconds
+        -candlestick_interval[string]:          The candlestick_interval of the candles
+    Return:
+        -index[dict]:                           {"rows": rows, "segments": [[start_row, stop_row), ...], "missing_candles": candles missing in the gaps,
+                                                "irregular": breaks that are no gaps (duplicated, unsorted or misaligned candles)}
+    """
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 2)
+    missing_candles, irregular = 0, 0
+    if len(segments) > 1:
+        try:
+            interval_ns = interval_to_milliseconds(candlestick_interval) * 1000000
+        except Exception:
+            interval_ns = None
+        if interval_ns is not None:
+            gaps = np.asarray(open_time[segments[1:, 0]], dtype=np.int64) - np.asarray(open_time[segments[:-1, 1] - 1], dtype=np.int64)
+            regular = (gaps > interval_ns) & (gaps % interval_ns == 0)
+            missing_candles = int((gaps[regular] // interval_ns - 1).sum())
+            irregular = int((~regular).sum())
+
+    return {
+        "rows": int(len(open_time)),
+        "segments": segments.tolist(),
+        "missing_candles": missing_candles,
+        "irregular": irregular
+    }
+
+
+def segment_ranges(segments, low, high, before, after) -> np.ndarray:
+    """
+    Description:
+        Returns the ranges of the start indices whose rows [start-before, start+after] lie inside one segment (and inside [low, high])
+    Arguments:
+        -segments[np.ndarray]:                  The segments [[start_row, stop_row), ...]
+        -low[int]:                              The first possible start index
+        -high[int]:                             The last possible start index (inclusive)
+        -before[int]:                           Rows that are needed before the start index (e.g. window_length-1)
+        -after[int]:                            Rows that are needed after the start index (e.g. num_steps)
+    Return:
+        -ranges[np.ndarray]:                    The inclusive ranges [[low, high], ...] in the shape (ranges, 2), segments that are too short are left out
+    """
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 2)
+    ranges = np.stack([np.maximum(segments[:, 0] + before, low), np.minimum(segments[:, 1] - 1 - after, high)], axis=1)
+    return ranges[ranges[:, 0] <= ranges[:, 1]]
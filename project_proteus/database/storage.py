@@ -0,0 +1,485 @@
+from __future__ import annotations
+
+#standard libraries imports
+import io
+import json
+import os
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.utils.lazy_import import lazy_import
+from project_proteus.utils.instrumentation import INSTRUMENTATION
+from project_proteus.utils import atomic_write
+from project_proteus.database.kline_codecs import FLOAT_ENCODINGS, get_compressor, encode_block, decode_block
+
+pd = lazy_import("pandas")
+
+
+#columns of a kline interval in the order they get returned
+KLINE_COLUMNS = ["open_time", "open", "high", "low", "close", "volume", "close_time"]
+#columns that hold timestamps
+TIME_COLUMNS = ["open_time", "close_time"]
+#header readers/writers of the npy format versions
+NPY_HEADERS = {
+    (1, 0): (np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0),
+    (2, 0): (np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0)
+}
+
+
+class Storage():
+    """
+    Description:
+        Base class for the on-disk storage formats of a DataBase. Every candlestick_interval is saved in its own directory,
+        a storage object knows how to write a kline dataframe into such a directory and how to read (a subset of the) columns back.
+    Arguments:
+        -float_dtype[string]:   Dtype of the price/volume columns on disk (only used by the binary formats)
+    """
+
+    #name under which the format gets saved in the dbid
+    name = None
+
+    def __init__(self, float_dtype="float64"):
+        #check if float_dtype is possible
+        if float_dtype not in ("float64", "float32"):
+            raise Exception(f"Your chosen float_dtype: {float_dtype} is not available")
+
+        #save the params
+        self.float_dtype = float_dtype
+
+    def write(self, path, candlestick_interval, data) -> None:
+        raise NotImplementedError()
+
+    def read(self, path, candlestick_interval, columns=None, rows=None) -> pd.DataFrame:
+        raise NotImplementedError()
+
+    def append(self, path, candlestick_interval, data, start_row=None) -> None:
+        """
+        Description:
+            Appends klines to an interval (generic version: reads the whole interval and writes it again)
+        Arguments:
+            -path[string]:                  Path of the interval directory
+            -candlestick_interval[string]:  The candlestick_interval
+            -data[pd.DataFrame]:            The klines that get appended
+            -start_row[int]:                Row at which the klines get written, all rows after it get dropped (defaults to the end of the interval)
+        """
+        old = self.read(path, candlestick_interval)
+        if start_row is not None:
+            old = old.iloc[:start_row]
+        self.write(path, candlestick_interval, pd.concat([old, data[KLINE_COLUMNS]], ignore_index=True))
+
+    def write_chunks(self, path, candlestick_interval, chunks) -> None:
+        """
+        Description:
+            Writes an interval chunk by chunk (e.g. when a staged download gets converted), so only one chunk is in memory at a time
+            (generic version: writes the first chunk and appends the others, formats without an in-place append override it)
+        Arguments:
+            -path[string]:                  Path of the interval directory
+            -candlestick_interval[string]:  The candlestick_interval
+            -chunks[iterable]:              The klines as consecutive pd.DataFrames
+        """
+        for number, data in enumerate(chunks):
+            if number == 0:
+                self.write(path, candlestick_interval, data)
+            else:
+                self.append(path, candlestick_interval, data)
+
+    def memmap(self, path, column) -> np.ndarray:
+        raise Exception(f"Memory mapping is not available for the {self.name} storage format, please convert the DataBase to npy")
+
+    def to_dict(self) -> dict:
+        """
+        Description:
+            Returns the entry of this storage format for the dbid
+        """
+        return {"format": self.name, "float_dtype": self.float_dtype}
+
+
+class CsvStorage(Storage):
+    """
+    Description:
+        Legacy storage format: every interval is saved as <interval>/<interval>.csv
+    """
+
+    name = "csv"
+
+    def write(self, path, candlestick_interval, data) -> None:
+        data.to_csv(path_or_buf=os.path.join(path, f"{candlestick_interval}.csv"), index_label="index")
+
+    def append(self, path, candlestick_interval, data, start_row=None) -> None:
+        #rewrite the interval if rows have to be dropped
+        with open(os.path.join(path, f"{candlestick_interval}.csv")) as fp:
+            rows = sum(1 for _ in fp) - 1
+        if start_row is not None and start_row < rows:
+            return super().append(path, candlestick_interval, data, start_row=start_row)
+
+        #append the lines
+        data = data[KLINE_COLUMNS].set_axis(pd.RangeIndex(rows, rows+len(data)))
+        data.to_csv(path_or_buf=os.path.join(path, f"{candlestick_interval}.csv"), mode="a", header=False)
+
+    def read(self, path, candlestick_interval, columns=None, rows=None) -> pd.DataFrame:
+        #get path
+        csv_path = os.path.join(path, f"{candlestick_interval}.csv")
+
+        #only parse the lines of the chosen rows (the header is line 0)
+        skiprows, nrows = None, None
+        if rows is not None:
+            skiprows, nrows = range(1, rows.start+1), rows.stop-rows.start
+
+        #load data
+        with INSTRUMENTATION.span("storage.csv.parse"):
+            if columns is None:
+                data = pd.read_csv(filepath_or_buffer=csv_path, index_col="index", skiprows=skiprows, nrows=nrows)
+                data.index.name = None
+            else:
+                data = pd.read_csv(filepath_or_buffer=csv_path, usecols=columns, skiprows=skiprows, nrows=nrows)
+                if rows is not None:
+                    data.index = pd.RangeIndex(rows.start, rows.start+len(data))
+
+        #convert the date columns
+        with INSTRUMENTATION.span("storage.csv.to_datetime"):
+            for column in TIME_COLUMNS:
+                if column in data.columns:
+                    data[column] = pd.to_datetime(data[column]).astype("datetime64[ns]")
+
+        return data
+
+
+class NpyStorage(Storage):
+    """
+    Description:
+        Columnar storage format: every column is saved as <interval>/<column>.npy.
+        The timestamps are saved as int64 nanoseconds, the prices/volumes as float64 or float32.
+        Reading a subset of the columns only touches the files of these columns.
+    """
+
+    name = "npy"
+
+    def column_path(self, path, column) -> str:
+        return os.path.join(path, f"{column}.npy")
+
+    def write(self, path, candlestick_interval, data) -> None:
+        for column in KLINE_COLUMNS:
+            if column in TIME_COLUMNS:
+                values = data[column].to_numpy(dtype="datetime64[ns]").view(np.int64)
+            else:
+                values = data[column].to_numpy(dtype=self.float_dtype)
+            np.save(self.column_path(path, column), np.ascontiguousarray(values))
+
+    def read(self, path, candlestick_interval, columns=None, rows=None) -> pd.DataFrame:
+        #load the columns (only the pages of the chosen rows get read from disk)
+        data = {}
+        for column in (KLINE_COLUMNS if columns is None else columns):
+            if rows is None:
+                values = np.load(self.column_path(path, column))
+            else:
+                values = np.array(self.memmap(path, column)[rows])
+            if column in TIME_COLUMNS:
+                values = values.view("datetime64[ns]")
+            data[column] = values
+
+        #keep the row numbers of the interval as index
+        index = None if rows is None else pd.RangeIndex(rows.start, rows.start+len(data[next(iter(data))]))
+
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def append(self, path, candlestick_interval, data, start_row=None) -> None:
+        """
+        Description:
+            Appends klines to the column files in place, only the new rows and the headers get written.
+            Anything after start_row (e.g. a half written page of an interrupted download) gets overwritten.
+        """
+        for column in KLINE_COLUMNS:
+            #convert the column
+            if column in TIME_COLUMNS:
+                values = data[column].to_numpy(dtype="datetime64[ns]").view(np.int64)
+            else:
+                values = data[column].to_numpy(dtype=self.float_dtype)
+            values = np.ascontiguousarray(values)
+
+            #create the file if it does not exist yet
+            column_path = self.column_path(path, column)
+            if not os.path.isfile(column_path):
+                np.save(column_path, values)
+                continue
+
+            with open(column_path, "r+b") as fp:
+                #read the header
+                version = np.lib.format.read_magic(fp)
+                read_header, write_header = NPY_HEADERS[version]
+                shape, fortran_order, dtype = read_header(fp)
+                offset = fp.tell()
+                if dtype != values.dtype or len(shape) != 1:
+                    raise Exception(f"The data of column: {column} does not match the file")
+
+                #write the new rows
+                rows = shape[0] if start_row is None else min(start_row, shape[0])
+                fp.seek(offset + rows*dtype.itemsize)
+                fp.write(values.tobytes())
+                fp.truncate()
+
+                #write the new header (numpy pads the header, so it normally keeps its length)
+                header = io.BytesIO()
+                write_header(header, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (rows+len(values),)})
+                header = header.getvalue()
+                if len(header) == offset:
+                    fp.seek(0)
+                    fp.write(header)
+                    continue
+
+            #rewrite the whole file if the header grew (the old rows are read behind the old header, the new rows get appended to them)
+            old = np.fromfile(column_path, dtype=dtype, count=rows, offset=offset)
+            np.save(column_path, np.concatenate([old, values]))
+
+    def memmap(self, path, column) -> np.ndarray:
+        return np.load(self.column_path(path, column), mmap_mode="r")
+
+
+class ParquetStorage(Storage):
+    """
+    Description:
+        Columnar storage format: every interval is saved as <interval>/<interval>.parquet (needs pyarrow).
+        The timestamps are saved as timestamp[ns], the prices/volumes as float64 or float32.
+    """
+
+    name = "parquet"
+
+    #number of rows per row group
+    row_group_size = 65536
+
+    def write(self, path, candlestick_interval, data) -> None:
+        data = data[KLINE_COLUMNS].astype({column: self.float_dtype for column in KLINE_COLUMNS if column not in TIME_COLUMNS})
+        data.to_parquet(os.path.join(path, f"{candlestick_interval}.parquet"), engine="pyarrow", index=False, row_group_size=self.row_group_size)
+
+    def write_chunks(self, path, candlestick_interval, chunks) -> None:
+        #every chunk gets written as its own row groups (the generic append would read the whole file again)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for data in chunks:
+                data = data[KLINE_COLUMNS].astype({column: self.float_dtype for column in KLINE_COLUMNS if column not in TIME_COLUMNS})
+                table = pa.Table.from_pandas(data, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(os.path.join(path, f"{candlestick_interval}.parquet"), table.schema)
+                writer.write_table(table, row_group_size=self.row_group_size)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def read(self, path, candlestick_interval, columns=None, rows=None) -> pd.DataFrame:
+        #get path
+        parquet_path = os.path.join(path, f"{candlestick_interval}.parquet")
+
+        #read the whole file
+        if rows is None:
+            return pd.read_parquet(parquet_path, engine="pyarrow", columns=columns)
+
+        #only read the row groups that overlap with the chosen rows
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(parquet_path)
+        offsets = np.cumsum([0] + [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)])
+        first = max(int(np.searchsorted(offsets, rows.start, side="right"))-1, 0)
+        last = max(int(np.searchsorted(offsets, rows.stop, side="left")), first+1)
+        data = parquet_file.read_row_groups(list(range(first, min(last, parquet_file.num_row_groups))), columns=columns).to_pandas()
+
+        #cut out the chosen rows
+        data = data.iloc[rows.start-offsets[first]:rows.stop-offsets[first]]
+        data.index = pd.RangeIndex(rows.start, rows.start+len(data))
+
+        return data
+
+
+class CompressedStorage(Storage):
+    """
+    Description:
+        Compressed columnar storage format: every column is saved as <interval>/<column>.blk, a sequence of compressed blocks of block_rows rows.
+        The timestamps get delta-of-delta encoded (regular candles become all zeros), the prices/volumes get byte shuffled (or XOR encoded),
+        then every block gets compressed with the codec. The blocks decode independently, so a row slice only reads and decodes the blocks it overlaps.
+        The byte offsets of the blocks are saved in <interval>/blocks.json.
+    Arguments:
+        -float_dtype[string]:   Dtype of the price/volume columns on disk
+        -codec[string]:         The compression codec, either: "zlib", "lz4" (needs lz4) or "zstd" (needs zstandard)
+        -level[int]:            The compression level, if none is given the default level of the codec is used
+        -float_encoding[string]: Encoding of the price/volume columns, either: "shuffle" or "xor"
+        -block_rows[int]:       Number of rows per block
+    """
+
+    name = "compressed"
+
+    def __init__(self, float_dtype="float64", codec="zlib", level=None, float_encoding="shuffle", block_rows=65536):
+        super().__init__(float_dtype=float_dtype)
+
+        #check if float_encoding is possible
+        if float_encoding not in FLOAT_ENCODINGS:
+            raise Exception(f"Your chosen float_encoding: {float_encoding} is not available")
+
+        #save the params
+        self.codec = codec
+        self.level = level
+        self.float_encoding = float_encoding
+        self.block_rows = block_rows
+        self.compressor = get_compressor(codec, level=level)
+
+    def column_path(self, path, column) -> str:
+        return os.path.join(path, f"{column}.blk")
+
+    def encoding(self, column) -> tuple:
+        """
+        Description:
+            Returns the encoding and the dtype of a column on disk
+        """
+        if column in TIME_COLUMNS:
+            return "delta_of_delta", np.int64
+        return self.float_encoding, np.dtype(self.float_dtype)
+
+    def read_index(self, path) -> dict:
+        with open(os.path.join(path, "blocks.json")) as fp:
+            return json.load(fp)
+
+    def write_index(self, path, index) -> None:
+        with atomic_write(os.path.join(path, "blocks.json")) as fp:
+            json.dump(index, fp)
+
+    def _column_values(self, data, column) -> np.ndarray:
+        if column in TIME_COLUMNS:
+            return data[column].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        return data[column].to_numpy(dtype=self.float_dtype)
+
+    def _write_blocks(self, fp, values, column) -> list:
+        """
+        Description:
+            Encodes the values block by block into fp and returns the byte lengths of the blocks
+        """
+        encoding, _ = self.encoding(column)
+        lengths = []
+        for start in range(0, len(values), self.block_rows):
+            block = encode_block(values[start:start+self.block_rows], encoding, self.compressor)
+            fp.write(block)
+            lengths.append(len(block))
+        return lengths
+
+    def write(self, path, candlestick_interval, data) -> None:
+        index = {"rows": len(data), "block_rows": self.block_rows, "offsets": {}}
+        with INSTRUMENTATION.span("storage.compressed.encode"):
+            for column in KLINE_COLUMNS:
+                with open(self.column_path(path, column), "wb") as fp:
+                    lengths = self._write_blocks(fp, self._column_values(data, column), column)
+                index["offsets"][column] = np.cumsum([0] + lengths).tolist()
+        self.write_index(path, index)
+
+    def _read_column(self, path, column, index, rows) -> np.ndarray:
+        """
+        Description:
+            Reads the blocks of a column that overlap with rows (one read of the file) and decodes them
+        """
+        encoding, dtype = self.encoding(column)
+        block_rows, offsets = index["block_rows"], index["offsets"][column]
+        first, last = rows.start // block_rows, -(-rows.stop // block_rows)
+        if rows.stop <= rows.start:
+            return np.empty(0, dtype=dtype)
+
+        #read the bytes of the blocks at once
+        with open(self.column_path(path, column), "rb") as fp:
+            fp.seek(offsets[first])
+            buffer = fp.read(offsets[last] - offsets[first])
+
+        #decode the blocks
+        blocks = [decode_block(buffer[offsets[block]-offsets[first]:offsets[block+1]-offsets[first]], encoding, dtype, self.compressor) for block in range(first, last)]
+        values = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+        #cut out the chosen rows
+        return values[rows.start - first*block_rows:rows.stop - first*block_rows]
+
+    def read(self, path, candlestick_interval, columns=None, rows=None) -> pd.DataFrame:
+        #get the rows
+        index = self.read_index(path)
+        read_rows = slice(0, index["rows"]) if rows is None else slice(min(rows.start, index["rows"]), min(rows.stop, index["rows"]))
+
+        #decode the columns
+        data = {}
+        with INSTRUMENTATION.span("storage.compressed.decode"):
+            for column in (KLINE_COLUMNS if columns is None else columns):
+                if column not in index["offsets"]:
+                    raise FileNotFoundError(self.column_path(path, column))
+                values = self._read_column(path, column, index, read_rows)
+                if column in TIME_COLUMNS:
+                    values = values.view("datetime64[ns]")
+                data[column] = values
+
+        #keep the row numbers of the interval as index
+        index = None if rows is None else pd.RangeIndex(read_rows.start, read_rows.stop)
+
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def append(self, path, candlestick_interval, data, start_row=None) -> None:
+        """
+        Description:
+            Appends klines to the column files in place, only the block that holds start_row (it gets re-encoded) and the new blocks get written.
+            Anything after start_row gets overwritten.
+        """
+        #create the interval if it does not exist yet
+        if not os.path.isfile(os.path.join(path, "blocks.json")):
+            return self.write(path, candlestick_interval, data)
+
+        #get the first block that changes
+        index = self.read_index(path)
+        if index["block_rows"] != self.block_rows:
+            return super().append(path, candlestick_interval, data, start_row=start_row)
+        rows = index["rows"] if start_row is None else min(start_row, index["rows"])
+        first = rows // self.block_rows
+
+        with INSTRUMENTATION.span("storage.compressed.encode"):
+            for column in KLINE_COLUMNS:
+                #the kept rows of the first block get encoded again together with the new rows
+                kept = self._read_column(path, column, index, slice(first*self.block_rows, rows))
+                values = np.concatenate([kept, self._column_values(data, column)])
+
+                #overwrite the column file from the first block on
+                offsets = index["offsets"][column][:first+1]
+                with open(self.column_path(path, column), "r+b") as fp:
+                    fp.seek(offsets[-1])
+                    lengths = self._write_blocks(fp, values, column)
+                    fp.truncate()
+                index["offsets"][column] = offsets + (offsets[-1] + np.cumsum(lengths)).tolist()
+
+        index["rows"] = rows + len(data)
+        self.write_index(path, index)
+
+    def to_dict(self) -> dict:
+        return {"format": self.name, "float_dtype": self.float_dtype, "codec": self.codec, "level": self.level, "float_encoding": self.float_encoding, "block_rows": self.block_rows}
+
+
+#all available storage formats
+STORAGE_FORMATS = {
+    CsvStorage.name: CsvStorage,
+    NpyStorage.name: NpyStorage,
+    ParquetStorage.name: ParquetStorage,
+    CompressedStorage.name: CompressedStorage
+}
+
+
+def get_storage(storage_format="csv", float_dtype="float64") -> Storage:
+    """
+    Description:
+        Creates the storage object of a storage format
+    Arguments:
+        -storage_format[string, dict]:  Either the name of the format ("csv", "npy", "parquet" or "compressed") or the storage entry of a dbid,
+                                        the entry can hold the options of the format e.g. {"format": "compressed", "codec": "zstd", "float_encoding": "xor"}
+        -float_dtype[string]:           Dtype of the price/volume columns on disk, either "float64" or "float32"
+    Return:
+        -storage[Storage]:              The storage object
+    """
+    #unpack dbid entry
+    options = {}
+    if type(storage_format) == dict:
+        options = {key: value for key, value in storage_format.items() if key not in ("format", "float_dtype")}
+        float_dtype = storage_format.get("float_dtype", float_dtype)
+        storage_format = storage_format["format"]
+
+    #check if format is available
+    if storage_format not in STORAGE_FORMATS:
+        raise Exception(f"Your chosen storage_format: {storage_format} is not available")
+
+    return STORAGE_FORMATS[storage_format](float_dtype=float_dtype, **options)
@@ -0,0 +1,100 @@
+#standard libraries imports
+import threading
+import time
+import zlib
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.database.resample import INTERVAL_ORIGINS
+from project_proteus.utils import interval_to_milliseconds
+
+
+class StubClient():
+    """
+    Description:
+        Local stand-in for binance.client.Client that serves deterministic synthetic klines, so downloads can be tested and benchmarked without network.
+        The same (symbol, open_time) always gets the same candle, no matter how the requests are paged, and coarser candles aggregate the finer ones.
+    Arguments:
+        -latency[float]:        Seconds every request sleeps to imitate the network
+        -gaps[list[tuple]]:     List of (start, end) in milliseconds, candles with start <= open_time < end are missing (imitates exchange outages)
+        -listing_time[int]:     Milliseconds since epoch before which no candles exist
+    """
+
+    #known quote assets, used to split symbols into base and quote asset
+    quote_assets = ("USDT", "BUSD", "USDC", "BTC", "ETH", "BNB")
+
+    def __init__(self, latency=0.0, gaps=(), listing_time=0):
+        #save the params
+        self.latency = latency
+        self.gaps = list(gaps)
+        self.listing_time = listing_time
+
+        #count the requests
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def get_klines(self, symbol, interval, startTime=None, endTime=None, limit=500, **kwargs) -> list:
+        return self._klines(symbol=symbol, interval=interval, start_time=startTime, end_time=endTime, limit=limit)
+
+    def futures_klines(self, symbol, interval, startTime=None, endTime=None, limit=500, **kwargs) -> list:
+        return self._klines(symbol=symbol, interval=interval, start_time=startTime, end_time=endTime, limit=limit)
+
+    def get_symbol_info(self, symbol) -> dict:
+        for quote_asset in self.quote_assets:
+            if symbol.endswith(quote_asset) and len(symbol) > len(quote_asset):
+                return {"symbol": symbol, "baseAsset": symbol[:-len(quote_asset)], "quoteAsset": quote_asset}
+        return None
+
+    def _klines(self, symbol, interval, start_time, end_time, limit) -> list:
+        """
+        Description:
+            Returns the klines in the raw format of the Binance API with start_time <= open_time <= end_time
+        """
+        #imitate the network
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        #get the open times of the page
+        interval_ms = interval_to_milliseconds(interval)
+        origin = INTERVAL_ORIGINS.get(interval[-1], 0)
+        first = -(-(max(start_time or 0, self.listing_time) - origin) // interval_ms)
+        last = ((end_time if end_time is not None else int(time.time()*1000)) - origin) // interval_ms
+        open_time = origin + np.arange(first, last+1, dtype=np.int64) * interval_ms
+        for gap_start, gap_end in self.gaps:
+            open_time = open_time[(open_time < gap_start) | (open_time >= gap_end)]
+        open_time = open_time[:limit]
+
+        #create the candles out of a synthetic 1m path, so the candles of all intervals are consistent with each other
+        minutes = open_time[:, None] + np.arange(interval_ms // 60000, dtype=np.int64)[None, :] * 60000
+        path = self.price(symbol, minutes)
+        open_, close = self.price(symbol, open_time - 60000), path[:, -1]
+        high = np.maximum(path.max(axis=1), open_)
+        low = np.minimum(path.min(axis=1), open_)
+        volume = (1 + 100*self._noise(symbol, minutes, 1)).sum(axis=1)
+
+        return [
+            [int(t), f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}", int(t+interval_ms-1), f"{v*c:.8f}", 100, f"{v/2:.8f}", f"{v*c/2:.8f}", "0"]
+            for t, o, h, l, c, v in zip(open_time, open_, high, low, close, volume)
+        ]
+
+    @classmethod
+    def price(cls, symbol, time) -> np.ndarray:
+        """
+        Description:
+            Deterministic synthetic price of a symbol at the given times (milliseconds)
+        """
+        minutes = time / 60000
+        return 100*(1 + zlib.crc32(symbol.encode()) % 100) * np.exp(0.2*np.sin(minutes/5000) + 0.05*np.sin(minutes/97) + 0.002*cls._noise(symbol, time, 0))
+
+    @staticmethod
+    def _noise(symbol, time, channel) -> np.ndarray:
+        """
+        Description:
+            Deterministic pseudo random numbers in [0, 1) for every time
+        """
+        seed = zlib.crc32(symbol.encode()) % 1000 + channel*7919
+        return np.modf(np.abs(np.sin(time / 60000 * 12.9898 + seed)) * 43758.5453)[0]
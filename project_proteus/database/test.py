@@ -1,12 +1,16 @@
 from matplotlib import pyplot as plt
 
-from database import DataBase
+from project_proteus.database import MarketStore
 
 
-db_spot = DataBase("/Users/fabio/Desktop/project-proteus/databases/test")
-db_futures = DataBase("/Users/fabio/Desktop/project-proteus/databases/test2")
+#align both databases on one time axis (the spot and the futures database have the same symbol, so they get named)
+store = MarketStore.create("/Users/fabio/Desktop/project-proteus/databases/test_store", candlestick_intervals=["5m"], features=["close"])
+store.add_symbol("/Users/fabio/Desktop/project-proteus/databases/test", symbol="spot")
+store.add_symbol("/Users/fabio/Desktop/project-proteus/databases/test2", symbol="futures")
 
-plt.plot(db_spot["5m", "close"])
-plt.plot(db_futures["5m", "close"])
+open_time, data, mask = store.read("5m")
 
-plt.show()
\ No newline at end of file
+plt.plot(open_time, data[:, 0, 0])
+plt.plot(open_time, data[:, 1, 0])
+
+plt.show()
@@ -1,2 +1,9 @@
 from .base_config import BaseConfig
-from .base_env import BaseEnv
\ No newline at end of file
+
+from project_proteus.utils.lazy_import import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "BaseEnv": ".base_env",
+    "Renderer": ".renderer",
+    "PriceChart": ".renderer"
+})
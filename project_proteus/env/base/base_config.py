@@ -1,6 +1,23 @@
 
 class BaseConfig():
 
+    class instrumentation:
+        #collect counters, histograms and spans of the hot paths of this env in env.instrumentation (see project_proteus.utils.instrumentation),
+        #it can also be enabled for the whole process with the environment variable PROTEUS_INSTRUMENT=1 (this also records the storage spans)
+        enabled = False
+
+    class render:
+        #maximum number of frames per second the renderer draws if headless is set to false (the env sends the steps in between as one frame)
+        max_fps = 30
+        #number of frames that can wait for the renderer, further frames get dropped instead of slowing down the env
+        queue_size = 8
+        #number of the latest steps that are shown
+        max_points = 5000
+        #where the frames get drawn: "process" (own process, needed for a window) or "thread" (holds the GIL while drawing, not meant for training loops)
+        backend = "process"
+        #if a path is given every frame gets saved as image to it instead of shown in a window
+        save_path = None
+
     def __init__(self) -> None:
         """
         Base config on which all other configs get built on.
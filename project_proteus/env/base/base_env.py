@@ -3,6 +3,8 @@ import torch
 
 #package imports
 from project_proteus.env.base import BaseConfig
+from project_proteus.env.base.renderer import Renderer
+from project_proteus.utils import Instrumentation, get_instrumentation
 
 
 class BaseEnv():
@@ -22,6 +24,32 @@ class BaseEnv():
         else:
             self.device = device
 
+        #setup the instrumentation, the config only instruments this env (and its database) with an instrumentation of its own,
+        #so other envs of the process are not affected (unless the instrumentation of the process is enabled)
+        self.instrumentation = get_instrumentation()
+        if getattr(getattr(self.config, "instrumentation", None), "enabled", False) and not self.instrumentation.enabled:
+            self.instrumentation = Instrumentation(enabled=True)
+
+        #time the methods of every environment (they only get wrapped if the instrumentation is enabled, so it costs nothing when disabled)
+        for method in ("step", "reset", "render"):
+            self.instrument_method(self, method, f"env.{method}")
+
+        #the renderer gets created on the first render (only if headless is set to false)
+        self.renderer = None
+        self.render_countdown = 0
+
+    def instrument_method(self, obj, method, name):
+        """
+        Description:
+            Wraps a method of an object in a span of the instrumentation, if the instrumentation is enabled
+        Arguments:
+            -obj[object]:           The object whose method gets timed e.g. the portfolio
+            -method[str]:           The name of the method
+            -name[str]:             The name of the span e.g. "portfolio.process_action"
+        """
+        if self.instrumentation.enabled:
+            setattr(obj, method, self.instrumentation.wrap(getattr(obj, method), name))
+
     def step(self, actions):
         raise NotImplementedError()
 
@@ -30,8 +58,41 @@ class BaseEnv():
 
     def render(self):
         """
-        Renders to screen if headless is set to false
+        Description:
+            Renders to screen if headless is set to false. A step only counts down, every Renderer.check_every steps the frame clock gets checked
+            and if a frame is due the env hands the data of the steps since the last frame to the renderer (see render_frame),
+            which draws in its own process at a capped frame rate and drops frames instead of slowing down the env
+        """
+        if self.headless:
+            return
+        self.render_countdown -= 1
+        if self.render_countdown > 0:
+            return
+        self.render_countdown = Renderer.check_every
+        if self.get_renderer().frame_due():
+            self.render_frame()
+            self.renderer.send()
+
+    def get_renderer(self) -> Renderer:
+        """
+        Description:
+            Returns the renderer, it gets created on the first call (see create_renderer)
         """
-        pass
+        if self.renderer is None:
+            self.renderer = self.create_renderer()
+        return self.renderer
 
+    def create_renderer(self) -> Renderer:
+        raise NotImplementedError()
 
+    def render_frame(self):
+        raise NotImplementedError()
+
+    def close_renderer(self) -> None:
+        """
+        Description:
+            Draws the remaining frames and stops the renderer (if it was started), the next render starts a new one
+        """
+        if self.renderer is not None:
+            self.renderer.close()
+            self.renderer = None
@@ -0,0 +1,313 @@
+#standard lirabries import
+import os
+import queue
+import threading
+import time
+import warnings
+
+#external library imports
+import numpy as np
+
+
+class PriceChart():
+
+    def __init__(self, title="", initial_amount=1000, trading_fees=0.036, max_points=5000, save_path=None) -> None:
+        """
+        Description:
+            Chart of the render subsystem: the price with the trade markers and the total profit of the current episode.
+            The lines only get extended with the new points (the artists are created once), so a frame never replots the whole history.
+            A slice is a tuple (index of the first step, close prices, actions, quote_asset_amount, base_asset_amount before the first action),
+            the chart replays the portfolio on it (same rules as Portfolio.process_action), so the env does not have to take a snapshot on every step.
+        Arguments:
+            -title[string]:                 Title of the chart
+            -initial_amount[float]:         Initial amount of the quote asset
+            -trading_fees[float]:           Trading fees of the exchange in percent
+            -max_points[int]:               Number of the latest steps that get shown
+            -save_path[string]:             If given every frame gets saved as image to this path (e.g. without a display)
+        """
+        #matplotlib is only imported by the renderer thread or process
+        import matplotlib
+        if save_path is not None:
+            matplotlib.use("Agg")
+        from matplotlib import pyplot as plt
+        self.plt = plt
+
+        #save the arguments
+        self.initial_amount = initial_amount
+        self.trading_fees = trading_fees/100
+        self.max_points = max_points
+        self.save_path = save_path
+
+        #create the artists once
+        self.figure, (self.price_axis, self.profit_axis) = plt.subplots(2, 1, sharex=True, figsize=(10, 6), gridspec_kw={"height_ratios": [3, 1]})
+        self.figure.suptitle(title)
+        self.price_line, = self.price_axis.plot([], [], color="black", linewidth=1)
+        self.buy_markers, = self.price_axis.plot([], [], linestyle="", marker="^", color="green")
+        self.sell_markers, = self.price_axis.plot([], [], linestyle="", marker="v", color="red")
+        self.profit_line, = self.profit_axis.plot([], [], color="blue", linewidth=1)
+        self.price_axis.set_ylabel("price")
+        self.profit_axis.set_ylabel("total profit")
+        self.profit_axis.set_xlabel("index")
+        if save_path is None:
+            plt.show(block=False)
+
+        #the drawn points
+        self.points = {name: ([], []) for name in ("price", "buy", "sell", "profit")}
+        self.last_index = None
+
+        #the lines get drawn over the cached background of the axes (see draw)
+        for line in (self.price_line, self.buy_markers, self.sell_markers, self.profit_line):
+            line.set_animated(True)
+        self.backgrounds = None
+        self.x_limits = (0, 0)
+        self.y_limits = {"price": (0, 0), "profit": (0, 0)}
+
+    def update(self, slices) -> None:
+        """
+        Description:
+            Adds the slices to the chart (without drawing), a gap in the indices (new episode or dropped frames) breaks the lines
+        """
+        for first_index, prices, actions, quote_asset_amount, base_asset_amount in slices:
+            if len(actions) == 0:
+                continue
+
+            #break the lines at a gap, a new episode that starts before the shown steps starts a new chart
+            if self.last_index is not None and first_index != self.last_index + 1:
+                if first_index <= self.last_index:
+                    for x, y in self.points.values():
+                        x.clear()
+                        y.clear()
+                else:
+                    for name in ("price", "profit"):
+                        self.points[name][0].append(first_index - 0.5)
+                        self.points[name][1].append(np.nan)
+
+            #replay the portfolio (a buy only changes it without base asset, a sell only with base asset)
+            for index, price, action in zip(range(first_index, first_index + len(actions)), prices.tolist(), actions.tolist()):
+                if action == 0 and base_asset_amount == 0:
+                    base_asset_amount = (quote_asset_amount / price) * (1-self.trading_fees)
+                    quote_asset_amount = 0
+                    self.points["buy"][0].append(index)
+                    self.points["buy"][1].append(price)
+                elif action == 1 and base_asset_amount > 0:
+                    quote_asset_amount = (base_asset_amount * price) * (1-self.trading_fees)
+                    base_asset_amount = 0
+                    self.points["sell"][0].append(index)
+                    self.points["sell"][1].append(price)
+                self.points["price"][0].append(index)
+                self.points["price"][1].append(price)
+                self.points["profit"][0].append(index)
+                self.points["profit"][1].append(quote_asset_amount + base_asset_amount*price - self.initial_amount)
+            self.last_index = first_index + len(actions) - 1
+
+        #only keep the latest points
+        for x, y in self.points.values():
+            if len(x) > self.max_points:
+                del x[:len(x) - self.max_points]
+                del y[:len(y) - self.max_points]
+
+    def draw(self) -> None:
+        """
+        Description:
+            Draws one frame: only the lines get drawn over the cached background (blitting), the whole figure only gets drawn again
+            when the points leave the limits of the axes (the limits have headroom, so this happens rarely)
+        """
+        for line, name in ((self.price_line, "price"), (self.buy_markers, "buy"), (self.sell_markers, "sell"), (self.profit_line, "profit")):
+            line.set_data(*self.points[name])
+
+        canvas = self.figure.canvas
+        if self._update_limits() or self.backgrounds is None:
+            #draw the figure without the lines and cache the background of the axes
+            canvas.draw()
+            self.backgrounds = [canvas.copy_from_bbox(axis.bbox) for axis in (self.price_axis, self.profit_axis)]
+        for axis, background in zip((self.price_axis, self.profit_axis), self.backgrounds):
+            canvas.restore_region(background)
+            for line in axis.get_lines():
+                axis.draw_artist(line)
+            canvas.blit(axis.bbox)
+
+        if self.save_path is not None:
+            self.plt.imsave(self.save_path, np.asarray(canvas.buffer_rgba()))
+        else:
+            canvas.flush_events()
+
+    def _update_limits(self):
+        #returns whether the limits of an axis had to change
+        x = self.points["price"][0]
+        if not x:
+            return False
+        changed = False
+        #the headroom grows with the shown steps, so a growing episode only needs a few full draws
+        headroom = min(max((x[-1] - x[0]) // 4, 16), max(self.max_points // 4, 16))
+        if x[-1] > self.x_limits[1] or x[0] < self.x_limits[0]:
+            self.x_limits = (x[0], x[-1] + headroom)
+            self.price_axis.set_xlim(*self.x_limits)
+            changed = True
+        for axis, name in ((self.price_axis, "price"), (self.profit_axis, "profit")):
+            values = np.asarray(self.points[name][1])
+            low, high = np.nanmin(values), np.nanmax(values)
+            limits = self.y_limits[name]
+            if low < limits[0] or high > limits[1]:
+                margin = (high - low) * 0.1 or max(abs(high), 1.0) * 0.01
+                self.y_limits[name] = (low - margin, high + margin)
+                axis.set_ylim(*self.y_limits[name])
+                changed = True
+        return changed
+
+    def close(self) -> None:
+        self.plt.close(self.figure)
+
+
+class Renderer():
+
+    #number of steps between two checks of the frame clock (see BaseEnv.render)
+    check_every = 16
+
+    def __init__(self, chart=PriceChart, chart_options=None, max_fps=30, queue_size=8, backend="process", niceness=19) -> None:
+        """
+        Description:
+            Non-blocking render subsystem: the env hands the data of the steps since the last frame to push when a frame is due (see frame_due),
+            send puts everything that was pushed as one frame into a bounded queue. A separate process (or thread) draws the frames incrementally
+            at the capped frame rate. If the queue is full, the frame gets dropped (the chart shows a gap) instead of blocking the env.
+            The process/thread gets started with the first frame.
+        Arguments:
+            -chart[class]:                  Class of the chart that gets created in the renderer process (has to be picklable), see PriceChart
+            -chart_options[dict]:           Keyword arguments of the chart
+            -max_fps[float]:                Maximum number of frames per second
+            -queue_size[int]:               Number of frames the queue holds
+            -backend[string]:               Where the chart gets drawn, either: "process" (no GIL contention with the env, needed for interactive windows)
+                                            or "thread" (e.g. for charts that save their frames with save_path). The thread draws while holding the GIL,
+                                            so every frame stalls the env, it is not meant for training loops
+            -niceness[int]:                 How much the priority of the renderer process gets lowered (see os.nice), so it does not compete with the env for the cpu
+        """
+        #check if the backend is possible
+        if backend not in ("process", "thread"):
+            raise Exception(f"The chosen render backend: {backend} is not available")
+        if backend == "thread":
+            warnings.warn("The thread render backend draws while holding the GIL and slows down the env, use the process backend for training loops")
+
+        #save the arguments
+        self.chart = chart
+        self.chart_options = chart_options or {}
+        self.max_fps = max_fps
+        self.queue_size = queue_size
+        self.backend = backend
+        self.niceness = niceness
+
+        #setup the frames
+        self.frame_time = 1 / max_fps
+        self.pending = []
+        self.next_frame = 0
+        self.sent_frames = 0
+        self.dropped_frames = 0
+        self.queue = None
+        self.ready = None
+        self.worker = None
+
+    def push(self, item) -> None:
+        """
+        Description:
+            Adds an item (e.g. a slice of the episode) to the next frame
+        """
+        self.pending.append(item)
+
+    def frame_due(self) -> bool:
+        """
+        Description:
+            Returns whether the next frame is due (at most max_fps times per second)
+        """
+        now = time.perf_counter()
+        if now < self.next_frame:
+            return False
+        self.next_frame = now + self.frame_time
+        return True
+
+    def send(self) -> None:
+        """
+        Description:
+            Sends the pushed items as one frame, drops it if the renderer can not keep up (never blocks)
+        """
+        if not self.pending:
+            return
+
+        #start the renderer with the first frame
+        if self.worker is None:
+            self._start()
+
+        try:
+            self.queue.put_nowait(self.pending)
+            self.sent_frames += 1
+        except queue.Full:
+            self.dropped_frames += 1
+        self.pending = []
+
+    def _start(self):
+        if self.backend == "process":
+            import multiprocessing as mp
+            context = mp.get_context("spawn")
+            self.queue = context.Queue(maxsize=self.queue_size)
+            self.ready = context.Event()
+            self.worker = context.Process(target=_render_loop, args=(self.queue, self.ready, self.chart, self.chart_options, self.frame_time, self.niceness), name="renderer", daemon=True)
+        else:
+            self.queue = queue.Queue(maxsize=self.queue_size)
+            self.ready = threading.Event()
+            self.worker = threading.Thread(target=_render_loop, args=(self.queue, self.ready, self.chart, self.chart_options, self.frame_time), name="renderer", daemon=True)
+        self.worker.start()
+
+    def wait_ready(self, timeout=None) -> bool:
+        """
+        Description:
+            Waits until the renderer has started and created its chart (frames sent before get dropped once the queue is full)
+        Return:
+            -ready[bool]:                   Whether the renderer is ready, False if the timeout expired or it was not started yet
+        """
+        return self.worker is not None and self.ready.wait(timeout)
+
+    def close(self) -> None:
+        """
+        Description:
+            Sends the remaining items and stops the renderer after it has drawn them
+        """
+        self.send()
+        if self.worker is None:
+            return
+        try:
+            self.queue.put(None, timeout=10)
+        except queue.Full:
+            pass
+        self.worker.join(timeout=10)
+        self.worker = None
+
+
+def _render_loop(frames, ready, chart, chart_options, frame_time, niceness=0) -> None:
+    """
+    Description:
+        Main loop of the renderer: adds the frames to the chart and draws at most once per frame_time
+    """
+    #the renderer process runs with a lower priority, so on a busy cpu it drops frames instead of taking the time of the env
+    if niceness:
+        os.nice(niceness)
+
+    chart = chart(**chart_options)
+    ready.set()
+    dirty, next_frame = False, 0
+    while True:
+        #wait for a frame until the next draw is due, then add all frames that are waiting (None stops the renderer)
+        try:
+            frame = frames.get(timeout=max(next_frame - time.perf_counter(), 0) if dirty else None)
+            while frame is not None:
+                chart.update(frame)
+                dirty = True
+                frame = frames.get_nowait()
+            break
+        except queue.Empty:
+            pass
+
+        #draw the frame
+        if dirty and time.perf_counter() >= next_frame:
+            chart.draw()
+            dirty, next_frame = False, time.perf_counter() + frame_time
+
+    if dirty:
+        chart.draw()
+    chart.close()
@@ -1,2 +1,17 @@
 from .simple_config import SimpleConfig
-from .simple_env import SimpleEnv
\ No newline at end of file
+
+from project_proteus.utils.lazy_import import lazy_exports
+
+#the environments get imported on first access, so configs can be used without loading torch
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "SimpleEnv": ".simple_env",
+    "VectorSimpleEnv": ".vector_simple_env",
+    "backtest": ".backtest",
+    "BacktestResult": ".backtest",
+    "RolloutWorkerPool": ".rollout",
+    "RandomPolicy": ".rollout",
+    "EpisodeSampler": ".sampler",
+    "EpisodePrefetcher": ".sampler",
+    "TrajectoryRecorder": ".recorder",
+    "TrajectoryReader": ".recorder"
+})
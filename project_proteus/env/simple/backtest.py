@@ -0,0 +1,129 @@
+#external library imports
+import torch
+
+#package imports
+from project_proteus.env.simple import SimpleConfig
+
+
+#the actions of the SimpleEnv (see SimpleEnv.action_mapper)
+ACTION_MAPPER = {
+    "buy": 0,
+    "sell": 1,
+    "hold": 2
+}
+
+
+class BacktestResult():
+
+    def __init__(self, quote_asset_amount, base_asset_amount, equity, trades, initial_amount) -> None:
+        """
+        Description:
+            Result of a backtest, all tensors are in the shape (batch, time) unless stated otherwise
+        Arguments:
+            -quote_asset_amount[torch.Tensor]:  Amount of the quote asset after the action of every timestep
+            -base_asset_amount[torch.Tensor]:   Amount of the base asset after the action of every timestep
+            -equity[torch.Tensor]:              Value of the portfolio in quote asset after the action of every timestep
+            -trades[torch.Tensor]:              All trades that changed the portfolio in the shape (trades, 3) with the rows: [batch index, time index, action]
+            -initial_amount[float]:             The initial amount of the quote asset
+        """
+        #save the arguments
+        self.quote_asset_amount = quote_asset_amount
+        self.base_asset_amount = base_asset_amount
+        self.equity = equity
+        self.trades = trades
+        self.initial_amount = initial_amount
+
+    @property
+    def total_profit(self):
+        """
+        Returns total profits in quote asset at the last timestep in the shape (batch,)
+        """
+        return self.equity[:, -1] - self.initial_amount
+
+    @property
+    def num_trades(self):
+        """
+        Returns the number of trades of every action sequence in the shape (batch,)
+        """
+        return torch.bincount(self.trades[:, 0], minlength=self.equity.shape[0])
+
+
+def backtest(actions, prices, fees=SimpleConfig.portfolio.trading_fees, initial_amount=SimpleConfig.portfolio.initial_amount, exact=False) -> BacktestResult:
+    """
+    Description:
+        Backtests whole action sequences in one pass, following exactly the rules of Portfolio.process_action:
+        a buy only changes the portfolio while the trading status is "buy", a sell only while it is "sell" and hold never changes it.
+        The action of timestep t gets executed at prices[t] and the equity of timestep t gets valued at prices[t]
+        (to reproduce a SimpleEnv episode pass prices[index:index+num_steps+1] and append a hold to the actions).
+    Arguments:
+        -actions[torch.Tensor]:         Actions in the shape (time,) or (batch, time), see ACTION_MAPPER
+        -prices[torch.Tensor]:          Prices in the shape (time,) or (batch, time)
+        -fees[float]:                   Trading fees of the exchange in percent
+        -initial_amount[float]:         The initial amount of the quote asset
+        -exact[bool]:                   If true the assets are updated trade after trade (bit-identical to Portfolio, one iteration per trade),
+                                        otherwise with a cumulative product over all timesteps (identical up to floating point rounding)
+    Return:
+        -result[BacktestResult]:        The result in the shape (batch, time), a batch of 1 if actions are one dimensional
+    """
+    #bring actions and prices into the shape (batch, time)
+    actions = torch.as_tensor(actions, dtype=torch.long)
+    actions = actions.unsqueeze(0) if actions.dim() == 1 else actions
+    prices = torch.as_tensor(prices, dtype=torch.float64, device=actions.device)
+    prices = prices.unsqueeze(0) if prices.dim() == 1 else prices
+    prices = prices.expand(actions.shape)
+    batch_size, length = actions.shape
+
+    #check if actions are possible
+    if ((actions < 0) | (actions > 2)).any():
+        raise Exception("One/multiple of the chosen actions are not possible")
+
+    """
+    Trades
+    """
+    #a buy/sell changes the portfolio if the previous buy/sell was the opposite action (before the first one the status is "buy")
+    time = torch.arange(length, device=actions.device).expand(batch_size, length)
+    trading = actions != ACTION_MAPPER["hold"]
+    last = torch.cummax(torch.where(trading, time, -1), dim=1).values
+    previous = torch.cat([torch.full((batch_size, 1), -1, device=actions.device), last[:, :-1]], dim=1)
+    previous_action = torch.where(previous >= 0, torch.gather(actions, 1, previous.clamp(min=0)), ACTION_MAPPER["sell"])
+    trade = trading & (actions != previous_action)
+
+    #after an odd number of trades the portfolio holds the base asset
+    num_trades = torch.cumsum(trade, dim=1)
+    holds_base = (num_trades % 2) == 1
+
+    """
+    Assets
+    """
+    trading_fees = fees/100
+    if exact:
+        #get the prices of the trades in the shape (batch, max trades)
+        max_trades = int(num_trades[:, -1].max()) if length > 0 else 0
+        trade_time = torch.sort(torch.where(trade, time, length-1), dim=1).values[:, :max_trades]
+        trade_prices = torch.gather(prices, 1, trade_time)
+
+        #update the assets trade after trade, holding[:, k] is the amount held after k trades
+        holding = torch.empty((batch_size, max_trades+1), dtype=torch.float64, device=actions.device)
+        holding[:, 0] = initial_amount
+        for k in range(max_trades):
+            if k % 2 == 0:
+                holding[:, k+1] = (holding[:, k] / trade_prices[:, k]) * (1-trading_fees)
+            else:
+                holding[:, k+1] = (holding[:, k] * trade_prices[:, k]) * (1-trading_fees)
+        holding = torch.gather(holding, 1, num_trades)
+    else:
+        #every trade multiplies the held amount with a factor
+        factor = torch.where(trade & (actions == ACTION_MAPPER["buy"]), (1-trading_fees) / prices, torch.ones_like(prices))
+        factor = torch.where(trade & (actions == ACTION_MAPPER["sell"]), prices * (1-trading_fees), factor)
+        holding = initial_amount * torch.cumprod(factor, dim=1)
+
+    #split the holding into the assets
+    base_asset_amount = torch.where(holds_base, holding, 0.0)
+    quote_asset_amount = torch.where(holds_base, 0.0, holding)
+    equity = quote_asset_amount + base_asset_amount*prices
+
+    #list the trades
+    trade_index = torch.nonzero(trade)
+    trades = torch.cat([trade_index, actions[trade].unsqueeze(1)], dim=1)
+
+    return BacktestResult(quote_asset_amount=quote_asset_amount, base_asset_amount=base_asset_amount, equity=equity, trades=trades, initial_amount=initial_amount)
@@ -0,0 +1,251 @@
+#standard lirabries import
+import json
+import os
+import queue
+import threading
+
+#external library imports
+import numpy as np
+
+#package imports
+from project_proteus.utils import atomic_write
+
+
+#fixed schema of a recorded transition (packed, 70 bytes per transition)
+TRANSITION_DTYPE = np.dtype([
+    ("episode", np.int64),
+    ("start_index", np.int64),
+    ("step", np.int32),
+    ("index", np.int64),
+    ("action", np.int8),
+    ("price", np.float64),
+    ("quote_asset_amount", np.float64),
+    ("base_asset_amount", np.float64),
+    ("reward", np.float64),
+    ("total_profit", np.float64),
+    ("done", np.bool_)
+])
+#the schema as it gets saved in the meta.json of a recording
+TRANSITION_SCHEMA = [list(field) for field in TRANSITION_DTYPE.descr]
+
+
+class TrajectoryRecorder():
+
+    def __init__(self, path: str, capacity: int = 10000000, block_size: int = 65536, num_blocks: int = 4) -> None:
+        """
+        Description:
+            Records the transitions of SimpleEnv episodes (see SimpleEnv.attach_recorder) into a preallocated, memory mapped ring buffer of TRANSITION_DTYPE rows:
+            <path>/transitions.npy holds capacity rows, when it is full the oldest transitions get overwritten. <path>/meta.json holds the number of written rows.
+            The env writes into a staging block in ram, full blocks get written to the file by a background thread, so a step never waits for the disk
+            (unless all num_blocks blocks are waiting to be written). An existing recording gets continued.
+        Arguments:
+            -path[string]:                  Directory of the recording
+            -capacity[int]:                 Number of transitions the ring buffer holds
+            -block_size[int]:               Number of transitions that get written at once
+            -num_blocks[int]:               Number of staging blocks
+        """
+        #save the arguments (a block never wraps around the ring more than once)
+        self.path = path
+        self.block_size = min(block_size, capacity)
+
+        #open or create the ring buffer
+        os.makedirs(path, exist_ok=True)
+        transitions_path = os.path.join(path, "transitions.npy")
+        if os.path.isfile(os.path.join(path, "meta.json")):
+            with open(os.path.join(path, "meta.json")) as fp:
+                self.meta = json.load(fp)
+            if self.meta["capacity"] != capacity or self.meta["dtype"] != TRANSITION_SCHEMA:
+                raise Exception(f"The recording at {path} has another capacity or schema, please choose another path")
+            self.transitions = np.load(transitions_path, mmap_mode="r+")
+        else:
+            self.transitions = np.lib.format.open_memmap(transitions_path, mode="w+", dtype=TRANSITION_DTYPE, shape=(capacity,))
+            self.meta = {"capacity": capacity, "dtype": TRANSITION_SCHEMA, "written": 0, "episodes": 0}
+            self._dump_meta()
+        self.capacity = capacity
+
+        #setup the staging blocks
+        self.free_blocks = queue.Queue()
+        for _ in range(max(2, num_blocks)):
+            self.free_blocks.put(np.empty(self.block_size, dtype=TRANSITION_DTYPE))
+        self.block = self.free_blocks.get()
+        self.block_rows = 0
+
+        #number of rows and episodes that got recorded (including the staged ones)
+        self.rows = self.meta["written"]
+        self.episodes = self.meta["episodes"]
+
+        #start the background thread that writes the full blocks
+        self.full_blocks = queue.Queue()
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="trajectory-recorder", daemon=True)
+        self.thread.start()
+
+    def begin_episode(self, count=None):
+        """
+        Description:
+            Returns the id of a new episode (or the ids of count new episodes as array)
+        """
+        self.episodes += 1 if count is None else count
+        return self.episodes - 1 if count is None else np.arange(self.episodes - count, self.episodes)
+
+    def record(self, episode, start_index, step, index, action, price, quote_asset_amount, base_asset_amount, reward, total_profit, done) -> None:
+        """
+        Description:
+            Records one transition (called by SimpleEnv.step)
+        """
+        self.block[self.block_rows] = (episode, start_index, step, index, action, price, quote_asset_amount, base_asset_amount, reward, total_profit, done)
+        self.block_rows += 1
+        if self.block_rows == self.block_size:
+            self._submit()
+
+    def record_batch(self, **fields) -> None:
+        """
+        Description:
+            Records multiple transitions at once (called by VectorSimpleEnv.step), every field is an array or a scalar that gets broadcasted
+        """
+        length = max(np.size(values) for values in fields.values())
+        start = 0
+        while start < length:
+            rows = min(length - start, self.block_size - self.block_rows)
+            for name, values in fields.items():
+                values = np.asarray(values)
+                self.block[name][self.block_rows:self.block_rows+rows] = values if values.ndim == 0 else values[start:start+rows]
+            self.block_rows += rows
+            start += rows
+            if self.block_rows == self.block_size:
+                self._submit()
+
+    def flush(self) -> None:
+        """
+        Description:
+            Writes the staged transitions and waits until everything is on disk
+        """
+        if self.block_rows > 0:
+            self._submit()
+        self.full_blocks.join()
+        self._check_error()
+
+    def close(self) -> None:
+        """
+        Description:
+            Flushes the recorder and stops the background thread
+        """
+        if self.thread is None:
+            return
+        self.flush()
+        self.full_blocks.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def _submit(self):
+        #hand the block to the background thread and continue in a free one
+        self._check_error()
+        self.full_blocks.put((self.rows, self.block, self.block_rows, self.episodes))
+        self.rows += self.block_rows
+        self.block = self.free_blocks.get()
+        self.block_rows = 0
+
+    def _check_error(self):
+        if self.error is not None:
+            raise Exception("The trajectory recorder failed to write a block") from self.error
+
+    def _run(self):
+        while True:
+            item = self.full_blocks.get()
+            if item is None:
+                self.full_blocks.task_done()
+                return
+            try:
+                #write the block into the ring (it might wrap around the end of the file)
+                start, block, rows, episodes = item
+                position = start % self.capacity
+                first = min(rows, self.capacity - position)
+                self.transitions[position:position+first] = block[:first]
+                self.transitions[:rows-first] = block[first:rows]
+                self.transitions.flush()
+
+                #the transitions are on disk before the readers get to see them
+                self.meta["written"], self.meta["episodes"] = start + rows, episodes
+                self._dump_meta()
+            except BaseException as exception:
+                self.error = exception
+            finally:
+                self.free_blocks.put(block)
+                self.full_blocks.task_done()
+
+    def _dump_meta(self):
+        with atomic_write(os.path.join(self.path, "meta.json")) as fp:
+            json.dump(self.meta, fp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TrajectoryReader():
+
+    def __init__(self, path: str, seed=None) -> None:
+        """
+        Description:
+            Reads a recording of a TrajectoryRecorder without loading the file: the ring buffer is memory mapped read-only,
+            sampled minibatches only read the pages of the sampled transitions. The reader can be used while the recording is running.
+        Arguments:
+            -path[string]:                  Directory of the recording
+            -seed[int]:                     Seed of the random number generator of sample
+        """
+        #check if the path is a recording
+        if not os.path.isfile(os.path.join(path, "meta.json")):
+            raise Exception("The path you chose is not a recording of a TrajectoryRecorder")
+
+        #save the arguments
+        self.path = path
+        self.rng = np.random.default_rng(seed)
+
+        #map the ring buffer
+        self.transitions = np.load(os.path.join(path, "transitions.npy"), mmap_mode="r")
+        self.capacity = len(self.transitions)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Description:
+            Reads the number of written transitions again (to see the blocks that got written since)
+        """
+        with open(os.path.join(self.path, "meta.json")) as fp:
+            meta = json.load(fp)
+        self.written = meta["written"]
+        self.episodes = meta["episodes"]
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    def read(self, start=0, stop=None) -> np.ndarray:
+        """
+        Description:
+            Reads the available transitions [start, stop) in the order they were recorded (0 is the oldest transition that was not overwritten yet)
+        Return:
+            -transitions[np.ndarray]:       Structured array of TRANSITION_DTYPE rows
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        first = self.written - len(self)
+        positions = (np.arange(max(start, 0), max(start, stop)) + first) % self.capacity
+        return self.transitions[positions]
+
+    def sample(self, batch_size: int) -> np.ndarray:
+        """
+        Description:
+            Samples a minibatch of random transitions (uniformly from all available transitions)
+        Arguments:
+            -batch_size[int]:               Number of transitions
+        Return:
+            -transitions[np.ndarray]:       Structured array of TRANSITION_DTYPE rows in the shape (batch_size,)
+        """
+        if len(self) == 0:
+            raise Exception("The recording does not hold any transitions yet")
+
+        #sorted positions read the file in order, the minibatch gets shuffled afterwards
+        positions = np.sort((self.rng.integers(0, len(self), size=batch_size) + self.written - len(self)) % self.capacity)
+        batch = self.transitions[positions]
+        return batch[self.rng.permutation(batch_size)]
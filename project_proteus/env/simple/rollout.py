@@ -0,0 +1,162 @@
+#standard lirabries import
+import traceback
+
+#external library imports
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+#package imports
+from project_proteus.env.simple import SimpleConfig, SimpleEnv
+
+
+class RandomPolicy():
+    """
+    Description:
+        Policy that chooses uniformly random actions, the default policy of the RolloutWorkerPool.
+        A policy is any picklable callable: policy(observation, rng) -> action
+    """
+
+    def __call__(self, observation, rng) -> int:
+        return int(rng.integers(0, 3))
+
+
+class RolloutWorkerPool():
+
+    def __init__(self, config: SimpleConfig, num_workers: int, policy=None, seed=0, start_method="spawn") -> None:
+        """
+        Description:
+            Runs num_workers SimpleEnv workers in separate processes to collect episodes in parallel.
+            The market data is loaded once and lives in shared memory, all workers create their env on it without copying,
+            so the memory does not grow with the number of workers. Every worker has its own seeded random number generators.
+        Arguments:
+            -config[SimpleConfig]:          Config of the environments, see SimpleConfig for more info (has to be picklable, e.g. defined at module level)
+            -num_workers[int]:              Number of worker processes
+            -policy[callable]:              Picklable policy(observation, rng) -> action that the workers follow, defaults to RandomPolicy
+            -seed[int]:                     Base seed, worker i uses seed+i
+            -start_method[str]:             Start method of the worker processes, either: "spawn", "fork" or "forkserver"
+        """
+        #save the arguments
+        self.config = config
+        self.num_workers = num_workers
+        self.policy = policy or RandomPolicy()
+        self.seed = seed
+
+        #load the market data once into shared memory
+        env = SimpleEnv(config=config, headless=True, device="cpu")
+        self.shared_data = env.share_data()
+        self.num_steps = env.num_steps
+
+        #start the workers
+        context = mp.get_context(start_method)
+        self.connections = []
+        self.workers = []
+        for worker_id in range(num_workers):
+            parent_connection, child_connection = context.Pipe()
+            worker = context.Process(target=_worker, args=(child_connection, config, self.shared_data, self.policy, seed+worker_id), daemon=True)
+            worker.start()
+            child_connection.close()
+            self.connections.append(parent_connection)
+            self.workers.append(worker)
+
+    def collect(self, num_episodes: int) -> dict:
+        """
+        Description:
+            Collects num_episodes complete episodes, split evenly over all workers
+        Arguments:
+            -num_episodes[int]:             Number of episodes
+        Return:
+            -transitions[dict]:             Batched transitions, the arrays are in the shape (episodes,) or (episodes, num_steps):
+                                            "start_index", "index" (data index of every step), "actions", "rewards", "dones", "total_profit", "worker"
+        """
+        #send the jobs
+        jobs = [num_episodes // self.num_workers + (1 if worker_id < num_episodes % self.num_workers else 0) for worker_id in range(self.num_workers)]
+        for connection, episodes in zip(self.connections, jobs):
+            if episodes > 0:
+                connection.send(("collect", episodes))
+
+        #gather the results
+        results = []
+        for worker_id, (connection, episodes) in enumerate(zip(self.connections, jobs)):
+            if episodes == 0:
+                continue
+            status, result = connection.recv()
+            if status == "error":
+                raise Exception(f"Rollout worker {worker_id} failed:\n{result}")
+            result["worker"] = np.full(episodes, worker_id, dtype=np.int32)
+            results.append(result)
+
+        return {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+
+    def close(self) -> None:
+        """
+        Description:
+            Stops all workers
+        """
+        for connection in self.connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.connections, self.workers = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _worker(connection, config, shared_data, policy, seed) -> None:
+    """
+    Description:
+        Main loop of a rollout worker process
+    """
+    #the workers should not compete with each other for cores
+    torch.set_num_threads(1)
+
+    #create the env on the shared market data
+    env = SimpleEnv(config=config, headless=True, device="cpu", seed=seed, shared_data=shared_data)
+    rng = np.random.default_rng(seed)
+    num_steps = env.num_steps
+
+    while True:
+        command, argument = connection.recv()
+        if command == "close":
+            break
+
+        try:
+            #preallocate the transitions
+            num_episodes = argument
+            transitions = {
+                "start_index": np.empty(num_episodes, dtype=np.int64),
+                "index": np.empty((num_episodes, num_steps), dtype=np.int64),
+                "actions": np.empty((num_episodes, num_steps), dtype=np.int8),
+                "rewards": np.empty((num_episodes, num_steps), dtype=np.float64),
+                "dones": np.empty((num_episodes, num_steps), dtype=bool),
+                "total_profit": np.empty(num_episodes, dtype=np.float64)
+            }
+
+            #run the episodes
+            for episode in range(num_episodes):
+                observation = env.reset()
+                transitions["start_index"][episode] = env.index
+                for step in range(num_steps):
+                    action = policy(observation, rng)
+                    transitions["index"][episode, step] = env.index
+                    observation, reward, done = env.step(action)
+                    transitions["actions"][episode, step] = action
+                    transitions["rewards"][episode, step] = reward
+                    transitions["dones"][episode, step] = done
+                transitions["total_profit"][episode] = env.portfolio.total_profit
+
+            connection.send(("ok", transitions))
+
+        except Exception:
+            connection.send(("error", traceback.format_exc()))
+
+    connection.close()
@@ -0,0 +1,213 @@
+#standard lirabries import
+import queue
+import threading
+
+#external library imports
+import numpy as np
+
+
+#available modes of the EpisodeSampler
+SAMPLER_MODES = ["uniform", "stratified", "sequential"]
+
+
+class EpisodeSampler():
+
+    def __init__(self, ranges, mode="uniform", seed=None, num_strata=10, stride=1) -> None:
+        """
+        Description:
+            Samples the start indices of episodes with its own seeded random number generator, so every env (and every worker) is reproducible on its own.
+            The possible start indices are one or multiple ranges (e.g. the contiguous segments of the data without gaps), they get flattened into
+            positions 0 to total-1 with a cumulative length table, so every draw is a binary search.
+            The modes are:
+                -"uniform":         every possible start index is equally likely
+                -"stratified":      the positions get split into num_strata equally long time strata, every pass visits all strata once (in a random order),
+                                    so the episodes are spread evenly over the whole time range
+                -"sequential":      consecutive episodes stride positions apart starting at the first one, so a pass covers the data in order (wraps around at the end)
+        Arguments:
+            -ranges[tuple, list]:           The possible start indices as inclusive range (low, high) or list of inclusive ranges [(low, high), ...] in ascending order
+            -mode[str]:                     How the start indices get sampled, either: "uniform", "stratified" or "sequential"
+            -seed[int]:                     Seed of the random number generator
+            -num_strata[int]:               Number of time strata of the "stratified" mode
+            -stride[int]:                   Distance between consecutive start indices of the "sequential" mode (the episode length covers the data without overlap)
+        """
+        #check if the arguments are possible
+        if mode not in SAMPLER_MODES:
+            raise Exception(f"The chosen sampler mode: {mode} is not available, the available modes are: {SAMPLER_MODES}")
+        ranges = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+        ranges = ranges[ranges[:, 0] <= ranges[:, 1]]
+        if len(ranges) == 0:
+            raise Exception("There is no possible start index")
+
+        #save the arguments
+        self.ranges = ranges
+        self.mode = mode
+        self.stride = max(1, stride)
+
+        #cumulative length table: the positions [starts[k], ends[k]) are the start indices of range k
+        self.ends = np.cumsum(ranges[:, 1] - ranges[:, 0] + 1)
+        self.starts = self.ends - (ranges[:, 1] - ranges[:, 0] + 1)
+        self.total = int(self.ends[-1])
+        self.num_strata = max(1, min(num_strata, self.total))
+
+        #setup the random number generator
+        self.rng = np.random.default_rng(seed)
+
+        #boundaries of the time strata: stratum i holds the positions [bounds[i], bounds[i+1])
+        self.bounds = np.linspace(0, self.total, self.num_strata + 1).astype(np.int64)
+
+        #state of the passes
+        self.strata = np.empty(0, dtype=np.int64)
+        self.next_position = 0
+
+    def sample(self, size=None):
+        """
+        Description:
+            Samples the start indices of the next episodes
+        Arguments:
+            -size[int]:                     Number of start indices, if none is given a single int is returned
+        Return:
+            -start_indices[int, np.ndarray]: The start index or the start indices in the shape (size,)
+        """
+        if size is None:
+            return int(self.to_index(self._sample(1))[0])
+        return self.to_index(self._sample(size))
+
+    def to_index(self, positions) -> np.ndarray:
+        """
+        Description:
+            Maps flat positions to start indices with a binary search in the cumulative length table
+        """
+        ranges = np.searchsorted(self.ends, positions, side="right")
+        return self.ranges[ranges, 0] + positions - self.starts[ranges]
+
+    def _sample(self, size):
+        if self.mode == "uniform":
+            return self.rng.integers(0, self.total, size=size)
+
+        elif self.mode == "stratified":
+            #refill the strata of the pass with a new random order when they are used up
+            while len(self.strata) < size:
+                self.strata = np.concatenate([self.strata, self.rng.permutation(self.num_strata)])
+            strata, self.strata = self.strata[:size], self.strata[size:]
+            return self.rng.integers(self.bounds[strata], self.bounds[strata + 1])
+
+        else:
+            positions = np.empty(size, dtype=np.int64)
+            for i in range(size):
+                if self.next_position >= self.total:
+                    self.next_position = 0
+                positions[i] = self.next_position
+                self.next_position += self.stride
+            return positions
+
+
+class Episode():
+
+    __slots__ = ("start_index", "close", "close_offset", "interval_windows", "offsets")
+
+    def __init__(self, start_index, close, close_offset, interval_windows, offsets) -> None:
+        """
+        Description:
+            The contiguous data slices of one episode: the close prices and the observation windows of every interval
+        Arguments:
+            -start_index[int]:              The index at which the episode starts
+            -close[np.ndarray]:             The close prices of the rows [close_offset, start_index+num_steps]
+            -close_offset[int]:             The index of the first close price
+            -interval_windows[dict]:        candlestick_interval -> strided views of the observation windows of the slice (see SimpleEnv.interval_windows)
+            -offsets[dict]:                 candlestick_interval -> index of the first row of the slice
+        """
+        self.start_index = start_index
+        self.close = close
+        self.close_offset = close_offset
+        self.interval_windows = interval_windows
+        self.offsets = offsets
+
+
+def slice_episode(start_index, num_steps, window_length, interval_data, alignment, close) -> Episode:
+    """
+    Description:
+        Copies the data of the episode that starts at start_index into contiguous buffers (on the device of the data),
+        the rows of every interval are the ones the observations from start_index to start_index+num_steps can reach
+    Arguments:
+        -start_index[int]:              The index at which the episode starts
+        -num_steps[int]:                Number of steps of the episode
+        -window_length[int]:            Number of timesteps in every observation window
+        -interval_data[dict]:           candlestick_interval -> features in the shape (rows, features), the first interval is the one the env steps on
+        -alignment[dict]:               candlestick_interval -> alignment table of the other intervals (see SimpleEnv.alignment)
+        -close[np.ndarray]:             The close prices of the first interval
+    Return:
+        -episode[Episode]:              The data of the episode
+    """
+    end_index = start_index + num_steps
+    interval_windows, offsets = {}, {}
+    for candlestick_interval, data in interval_data.items():
+        if candlestick_interval in alignment:
+            first, last = int(alignment[candlestick_interval][start_index]), int(alignment[candlestick_interval][end_index])
+        else:
+            first, last = start_index, end_index
+        offsets[candlestick_interval] = first - window_length + 1
+        interval_windows[candlestick_interval] = data[offsets[candlestick_interval]:last + 1].clone().unfold(0, window_length, 1)
+
+    return Episode(start_index, close[start_index:end_index + 1].copy(), start_index, interval_windows, offsets)
+
+
+class EpisodePrefetcher():
+
+    def __init__(self, sampler: EpisodeSampler, slice_episode, num_prefetch: int) -> None:
+        """
+        Description:
+            Samples the next episodes and slices their data in a background thread, so that a reset only takes a ready episode out of the queue.
+            The thread is the only user of the sampler, so the start indices are the same as without prefetching.
+        Arguments:
+            -sampler[EpisodeSampler]:       Sampler of the start indices
+            -slice_episode[callable]:       slice_episode(start_index) -> Episode
+            -num_prefetch[int]:             Number of episodes that are kept ready
+        """
+        #save the arguments
+        self.sampler = sampler
+        self.slice_episode = slice_episode
+
+        #setup the queue of ready episodes
+        self.queue = queue.Queue(maxsize=max(1, num_prefetch))
+        self.stopped = threading.Event()
+
+        #start the background thread
+        self.thread = threading.Thread(target=self._run, name="episode-prefetcher", daemon=True)
+        self.thread.start()
+
+    def get(self) -> Episode:
+        """
+        Description:
+            Returns the next episode, waits if it is not ready yet
+        """
+        if self.stopped.is_set():
+            raise Exception("The episode prefetcher has been closed")
+        item = self.queue.get()
+        if isinstance(item, BaseException):
+            self.stopped.set()
+            raise Exception("The episode prefetcher failed") from item
+        return item
+
+    def close(self) -> None:
+        """
+        Description:
+            Stops the background thread
+        """
+        self.stopped.set()
+        self.thread.join(timeout=5)
+
+    def _run(self):
+        try:
+            while not self.stopped.is_set():
+                self._put(self.slice_episode(self.sampler.sample()))
+        except BaseException as exception:
+            self._put(exception)
+
+    def _put(self, item):
+        #wait for space in the queue, but stop waiting when the prefetcher gets closed
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
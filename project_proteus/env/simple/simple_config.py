@@ -7,7 +7,14 @@ class SimpleConfig(BaseConfig):
         #path to the database
         path = ""
         #which candlestick interval should be used in the environment
+        #a list of intervals (e.g. ["5m", "15m", "1h"]) returns the windows of all intervals, the env steps on the first one
         candlestick_interval = ""
+        #features of the observations, if none are given open, high, low, close and volume are used
+        #computed features (e.g. "log_return", "rsi_14", "atr_14", see DataBase.add_features) get computed once and stored in the database
+        features = None
+        #opt-in cache directory for the observation matrices of csv, parquet and compressed databases (uncompressed copies, see DataBase.memmap_matrix),
+        #if none is given their matrices are read into ram
+        packed_path = None
 
     class portfolio:
         #the initial amount of the quote asset
@@ -19,5 +26,20 @@ class SimpleConfig(BaseConfig):
     class env:
         #number of steps the agent can take in the environment before it gets reset
         num_steps = 10
-
-        window_length = 10
\ No newline at end of file
+        #number of timesteps in every observation window
+        window_length = 10
+        #normalization of the observation windows, either: None, "last" (divide by the last row) or "zscore" (per feature)
+        window_normalization = None
+        #dtype of the observations, either: "float64", "float32" or "bfloat16" (the portfolio always computes in float64)
+        dtype = "float64"
+        #stage the data in pinned memory before it gets copied to the device (only used if the device is not the cpu)
+        pin_memory = False
+        #how the start indices of the episodes get sampled, either: "uniform", "stratified" (every pass visits all time strata once)
+        #or "sequential" (consecutive episodes that cover the data in order)
+        sampler = "uniform"
+        #number of time strata of the "stratified" sampler
+        num_strata = 10
+        #number of episodes whose data gets sliced into contiguous buffers on the device in a background thread (0 disables prefetching)
+        prefetch = 0
+        #whether episodes can cross gaps of missing candles, by default they only start in contiguous segments that hold window_length + num_steps candles
+        allow_gaps = False
\ No newline at end of file
@@ -1,5 +1,9 @@
 #standard lirabries import
+import operator
 import random
+import warnings
+import weakref
+from functools import partial
 
 #external library imports
 import numpy as np
@@ -9,11 +13,24 @@ import torch
 from project_proteus.env.base import BaseEnv
 from project_proteus.env.simple import SimpleConfig
 from project_proteus.database import DataBase
+from project_proteus.database.storage import KLINE_COLUMNS, TIME_COLUMNS
+from project_proteus.database.features import is_feature, feature_warmup
+from project_proteus.database.segments import segment_ranges
+from project_proteus.env.simple.sampler import EpisodeSampler, EpisodePrefetcher, slice_episode
+from project_proteus.env.base.renderer import Renderer, PriceChart
+
+
+#available dtypes of the observations: name -> (torch dtype, dtype of the packed matrix on disk)
+OBSERVATION_DTYPES = {
+    "float64": (torch.float64, "float64"),
+    "float32": (torch.float32, "float32"),
+    "bfloat16": (torch.bfloat16, "float32")
+}
 
 
 class SimpleEnv(BaseEnv):
 
-    def __init__(self, config: SimpleConfig, headless=True, device=None) -> None:
+    def __init__(self, config: SimpleConfig, headless=True, device=None, seed=None, shared_data=None) -> None:
         """
         Description:
             Simple market environment with a discrete action space: on every step the agent can choose to either:
@@ -23,6 +40,8 @@ class SimpleEnv(BaseEnv):
             -config[SimpleConfig]:          Config file for this environment, see SimpleConfig for more info.
             -headless[bool]:                Whether the env should get rendered or not
             -device[str]:                   On which device the environment should run
+            -seed[int]:                     Seed of the episode sampler that chooses the episodes
+            -shared_data[dict]:             Market data of another env (see SimpleEnv.share_data), if given it gets used instead of reading the database
         """
         #run BaseEnv initialization
         super().__init__(config=config, headless=headless, device=device)
@@ -31,12 +50,58 @@ class SimpleEnv(BaseEnv):
         self.num_steps = self.config.env.num_steps
         #save window length
         self.window_length = self.config.env.window_length
+        #save normalization of the observation windows
+        self.window_normalization = getattr(self.config.env, "window_normalization", None)
+        #save the dtype of the observations (the portfolio always computes in float64)
+        self.dtype_name = getattr(self.config.env, "dtype", "float64")
+        if self.dtype_name not in OBSERVATION_DTYPES:
+            raise Exception(f"The chosen dtype: {self.dtype_name} is not available")
+        self.dtype = OBSERVATION_DTYPES[self.dtype_name][0]
+        #save whether the data gets staged in pinned memory before it is copied to the device
+        self.pin_memory = getattr(self.config.env, "pin_memory", False) and torch.device(self.device).type != "cpu"
         
         """
         DataBase setup
         """
         #parse database config
-        self._parse_database_config()
+        self._parse_database_config(shared_data=shared_data)
+
+        """
+        Episode sampler setup
+        """
+        #episodes only start where their windows and steps lie inside one contiguous segment (they never cross a gap of missing candles)
+        if getattr(self.config.env, "allow_gaps", False):
+            ranges = (self.first_index, self.data_length-self.num_steps-1)
+        else:
+            ranges = segment_ranges(self.segments, low=self.first_index, high=self.data_length-self.num_steps-1, before=self.window_length-1, after=self.num_steps)
+            if len(ranges) == 0:
+                raise Exception("There is no segment without gaps that is long enough for window_length + num_steps candles, set allow_gaps to sample across gaps")
+
+        #the sampler has its own seeded random number generator, so the episodes are reproducible per env
+        self.sampler = EpisodeSampler(
+            ranges=ranges,
+            mode=getattr(self.config.env, "sampler", "uniform"),
+            seed=seed,
+            num_strata=getattr(self.config.env, "num_strata", 10),
+            stride=self.num_steps
+        )
+        #the trajectory recorder (see attach_recorder)
+        self.recorder = None
+        self.episode_id = None
+
+        #number of episodes that get prefetched, the prefetcher thread gets started on the first random reset
+        self.num_prefetch = getattr(self.config.env, "prefetch", 0)
+        self.prefetcher = None
+
+        #the steps of the current episode from render_from on were not handed to the renderer yet (see render_frame)
+        self.render_from = None
+        self.render_portfolio = None
+
+        #the observations and prices of the current episode, without an episode slice they are read from the whole data
+        self.episode_windows = self.interval_windows
+        self.episode_offsets = None
+        self.episode_close = self.close
+        self.episode_close_offset = 0
 
         """
         Actions setup
@@ -52,24 +117,66 @@ class SimpleEnv(BaseEnv):
         Portfolio setup
         """
         self.portfolio = Portfolio(env=self)
+        self.instrument_method(self.portfolio, "process_action", "portfolio.process_action")
 
-    def reset(self):
+    def reset(self, start_index=None):
         """
-        Resets all the episode specific variables
+        Description:
+            Resets all the episode specific variables
+        Arguments:
+            -start_index[int]:              Index at which the episode should start, if none is given it gets chosen by the episode sampler
+        Return:
+            -observation[torch.Tensor]:     The observation window at the start of the episode
         """
+        #hand the steps of the last episode that were not rendered yet to the renderer, they get sent with the next frame
+        if self.render_from is not None and self.local_index > self.render_from:
+            self.render_frame(stop=self.local_index)
+
         #reset index variables
         self.local_index = 0
-        self.index = random.randint(self.window_length-1, self.data_length-self.num_steps-1)
-        
+        if start_index is None and self.num_prefetch > 0:
+            #take the next prefetched episode, its data slices are already contiguous copies on the device
+            if self.prefetcher is None:
+                self._start_prefetcher()
+            with self.instrumentation.span("env.reset.wait_episode"):
+                episode = self.prefetcher.get()
+            self.index = episode.start_index
+            self.episode_windows, self.episode_offsets = episode.interval_windows, episode.offsets
+            self.episode_close, self.episode_close_offset = episode.close, episode.close_offset
+        else:
+            if start_index is None:
+                self.index = self.sampler.sample()
+            elif start_index in range(self.first_index, self.data_length-self.num_steps):
+                self.index = start_index
+            else:
+                raise Exception(f"The chosen start_index: {start_index} is not possible")
+            self.episode_windows, self.episode_offsets = self.interval_windows, None
+            self.episode_close, self.episode_close_offset = self.close, 0
 
         #setup buffers
+        self.start_index = self.index
         self.action_buffer = np.zeros(shape=(self.config.env.num_steps))
         self.action_buffer[:] = None
+        if self.recorder is not None:
+            self.episode_id = self.recorder.begin_episode()
+
+        #reset the portfolio
+        self.portfolio.reset()
+        if not self.headless:
+            self.render_from, self.render_portfolio = 0, (self.portfolio.quote_asset_amount, self.portfolio.base_asset_amount)
+
+        return self.observation
 
     def step(self, action: int):
         """
         Description:
             Steps the simulation one timestep forward
+        Arguments:
+            -action[int]:                   The action that the agent has chosen to take
+        Return:
+            -observation[torch.Tensor]:     The observation window at the new timestep
+            -reward[float]:                 Change of the total profit (in quote asset) during this step
+            -done[bool]:                    Whether the episode has ended
         """
 
         #check if action is possible
@@ -79,6 +186,9 @@ class SimpleEnv(BaseEnv):
         #save action in action_buffer
         self.action_buffer[self.local_index] = action
 
+        #save profit before the action
+        profit = self.portfolio.total_profit
+
         #process action in portfolio
         self.portfolio.process_action(action)
 
@@ -89,48 +199,315 @@ class SimpleEnv(BaseEnv):
         self.index += 1
         self.local_index += 1
 
+        #calculate reward
+        reward = self.portfolio.total_profit - profit
+        done = self.local_index >= self.num_steps
+
+        #record the transition (the price and the index of the action, the portfolio and the profit after the step)
+        if self.recorder is not None:
+            self.recorder.record(self.episode_id, self.start_index, self.local_index-1, self.index-1, action, self.episode_close.item(self.index-1-self.episode_close_offset),
+                                 self.portfolio.quote_asset_amount, self.portfolio.base_asset_amount, reward, profit+reward, done)
+
+        return self.observation, reward, done
+
+    def get_windows(self, indices, normalization=None):
+        """
+        Description:
+            Gathers the observation windows that end at the given indices (the window of index i holds the rows i-window_length+1 to i).
+            With multiple candlestick_intervals the windows of the other intervals end at the latest candle that has closed at index i,
+            they get gathered with the precomputed alignment table (an integer gather, no time comparisons).
+        Arguments:
+            -indices[int, torch.Tensor]:    One index or a tensor of indices in the shape (N,)
+            -normalization[str]:            How every window gets normalized, either: None, "last" (divide by the last row) or "zscore" (per feature),
+                                            if none is given the normalization of the config is used
+        Return:
+            -windows[torch.Tensor, dict]:   The windows in the shape (window_length, features) or (N, window_length, features),
+                                            with multiple candlestick_intervals a dict candlestick_interval -> windows
+        """
+        return self._get_windows(indices, normalization, self.interval_windows, None)
+
+    def _get_windows(self, indices, normalization, interval_windows, offsets):
+        """
+        Description:
+            Gathers the observation windows from interval_windows, offsets holds the first row of every interval if they are the windows of an episode slice
+        """
+        #get the normalization
+        normalization = normalization or self.window_normalization
+
+        #gather the windows (a single window is a view, multiple windows get copied into one contiguous tensor)
+        #only an index array gives a copy that can be normalized in place, scalar indices (numpy ints, 0-dim tensors) give a view of the read-only store
+        gathered = isinstance(indices, (torch.Tensor, np.ndarray)) and indices.ndim >= 1
+        if not gathered:
+            indices = operator.index(indices)
+        offset = offsets[self.candlestick_interval] if offsets else 0
+        windows = self._normalize_windows(interval_windows[self.candlestick_interval][indices - self.window_length + 1 - offset].transpose(-1, -2), gathered, normalization)
+        if len(self.candlestick_intervals) == 1:
+            return windows
+
+        #gather the windows of the other intervals
+        observation = {self.candlestick_interval: windows}
+        for candlestick_interval in self.candlestick_intervals[1:]:
+            aligned = self.alignment_tensors[candlestick_interval][indices] if gathered else int(self.alignment[candlestick_interval][indices])
+            offset = offsets[candlestick_interval] if offsets else 0
+            windows = interval_windows[candlestick_interval][aligned - self.window_length + 1 - offset].transpose(-1, -2)
+            observation[candlestick_interval] = self._normalize_windows(windows, gathered, normalization)
+
+        return observation
+
+    @staticmethod
+    def _normalize_windows(windows, gathered, normalization):
+        """
+        Description:
+            Normalizes windows, gathered windows are normalized in place to avoid another allocation
+        """
+        if normalization is None:
+            return windows
+        elif normalization == "last":
+            last = windows[..., -1:, :]
+            return windows.div_(last.clone()) if gathered else windows / last
+        elif normalization == "zscore":
+            std, mean = torch.std_mean(windows, dim=-2, keepdim=True)
+            std = std.clamp_(min=1e-12)
+            return windows.sub_(mean).div_(std) if gathered else (windows - mean) / std
+        else:
+            raise Exception(f"The chosen normalization: {normalization} is not possible")
+
+    def share_data(self) -> dict:
+        """
+        Description:
+            Moves the market data of this env into shared memory, so other processes can create envs on it without copying (see shared_data of the constructor)
+        Return:
+            -shared_data[dict]:             The market data as shared cpu tensors
+        """
+        #copy the data once into shared memory
+        if not hasattr(self, "_shared_data"):
+            market_data = [("close_time", torch.from_numpy(self.close_time.view(np.int64))), ("segments", torch.from_numpy(self.segments))]
+            if self.close_column is None:
+                market_data += [("close", torch.from_numpy(self.close))]
+            market_data += [(f"data/{candlestick_interval}", data.cpu()) for candlestick_interval, data in self.interval_data.items()]
+            market_data += [(f"alignment/{candlestick_interval}", torch.from_numpy(alignment)) for candlestick_interval, alignment in self.alignment.items()]
+            self._shared_data = {}
+            for name, data in market_data:
+                self._shared_data[name] = torch.empty_like(data).share_memory_().copy_(data)
+
+        return self._shared_data
+
+    def attach_recorder(self, recorder) -> None:
+        """
+        Description:
+            Attaches a TrajectoryRecorder, every step of the following episodes gets recorded (None detaches the recorder)
+        Arguments:
+            -recorder[TrajectoryRecorder]:  The recorder
+        """
+        self.recorder = recorder
+        self.episode_id = None
+
+    def stop_prefetching(self) -> None:
+        """
+        Description:
+            Stops the background thread of the episode prefetcher (if it was started), the next random reset starts a new one
+        """
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+
+    def create_renderer(self) -> Renderer:
+        """
+        Description:
+            Creates the renderer of the env (see BaseConfig.render), it draws a PriceChart of the price with the trades and the total profit
+        """
+        render = getattr(self.config, "render", None)
+        chart_options = {
+            "title": f"{self.db.dbid.get('symbol', '')} {self.candlestick_interval}".strip(),
+            "initial_amount": self.config.portfolio.initial_amount,
+            "trading_fees": self.config.portfolio.trading_fees,
+            "max_points": getattr(render, "max_points", 5000),
+            "save_path": getattr(render, "save_path", None)
+        }
+        return Renderer(chart=PriceChart, chart_options=chart_options, max_fps=getattr(render, "max_fps", 30), queue_size=getattr(render, "queue_size", 8),
+                        backend=getattr(render, "backend", "process"))
+
+    def render_frame(self, stop=None) -> None:
+        """
+        Description:
+            Hands the steps of the episode from render_from to stop (exclusive) to the renderer as one slice (called by render when a frame is due):
+            (index of the first step, close prices, actions, quote_asset_amount and base_asset_amount before the first action), the chart replays the portfolio on it
+        Arguments:
+            -stop[int]:                     Local index after the last step, if none is given the step that is being rendered is the last one
+        """
+        stop = self.local_index + 1 if stop is None else stop
+        first = self.start_index + self.render_from
+        prices = self.episode_close[first-self.episode_close_offset:self.start_index+stop-self.episode_close_offset].copy()
+        self.get_renderer().push((first, prices, self.action_buffer[self.render_from:stop].astype(np.int8), *self.render_portfolio))
+        self.render_from = stop
+        self.render_portfolio = (self.portfolio.quote_asset_amount, self.portfolio.base_asset_amount)
+
+    def close_renderer(self) -> None:
+        """
+        Description:
+            Draws the steps that were not rendered yet and stops the renderer (if it was started), the next render starts a new one
+        """
+        if self.renderer is not None and self.render_from is not None and self.local_index > self.render_from:
+            self.render_frame(stop=self.local_index)
+        super().close_renderer()
+
     """
     Constructor helper methods
     """
-    def _parse_database_config(self):
+    def _parse_database_config(self, shared_data=None):
         """
         Parses the database config and checks if all settings are possible
         This method does:
             -creates database and saves it under self.db
-            -checks if candlestick_interval is available and raises an exception if its not available
-            -saves the close prices and the corresponding times
+            -checks if the candlestick_intervals are available and raises an exception if one is not available
+            -computes the missing computed features and maps the features read-only into self.interval_data
+            -maps the store of the first candlestick_interval (the one the env steps on): self.data (features) and self.close (float64 close prices) are views into it
+            -saves the corresponding close times and the contiguous segments of the first interval (see DataBase.segments)
+            -precomputes the alignment of the other intervals to the first one
+            -creates the views of all observation windows self.interval_windows (self.windows for the first interval)
         """
 
-        #save candlestick_interval
-        self.candlestick_interval = self.config.database.candlestick_interval
+        #save the candlestick_intervals, the env steps on the first one
+        candlestick_intervals = self.config.database.candlestick_interval
+        self.candlestick_intervals = [candlestick_intervals] if type(candlestick_intervals) == str else list(candlestick_intervals)
+        self.candlestick_interval = self.candlestick_intervals[0]
 
         #create database
-        self.db = DataBase(path=self.config.database.path)
+        with self.instrumentation.span("env.parse_database_config.open_database"):
+            self.db = DataBase(path=self.config.database.path, instrumentation=self.instrumentation, packed_path=getattr(self.config.database, "packed_path", None))
+
+            #check if the candlestick_intervals are available
+            for candlestick_interval in self.candlestick_intervals:
+                if not self.db.check_candlestick_interval(candlestick_interval):
+                    raise Exception(f"Your chosen candlestick interval: {candlestick_interval} is not available in the chosen database")
+
+        #save the features
+        self.features = list(getattr(self.config.database, "features", None) or [feature for feature in KLINE_COLUMNS if feature not in TIME_COLUMNS])
+
+        #computed features get computed once and stored in the database (up to date features are not recomputed)
+        with self.instrumentation.span("env.parse_database_config.compute_features"):
+            computed_features = [feature for feature in self.features if is_feature(feature)]
+            if computed_features and shared_data is None:
+                for candlestick_interval in self.candlestick_intervals:
+                    self.db.add_features(candlestick_interval, computed_features)
+
+        #number of rows at the start of every interval with undefined (warmup) values of the computed features
+        warmup = max([feature_warmup(feature) for feature in computed_features], default=0)
+
+        #columns of the store of the first interval: the features and the close prices (if they are not a feature),
+        #so the portfolio and the observations read from one typed store and no column is held twice.
+        #the portfolio always computes in float64, with another dtype the close prices are kept separately
+        self.store_columns = self.features + ([] if "close" in self.features or self.dtype != torch.float64 else ["close"])
+        self.close_column = self.store_columns.index("close") if self.dtype == torch.float64 else None
+
+        #use the market data of another env
+        if shared_data is not None:
+            self.close_time = shared_data["close_time"].numpy().view("datetime64[ns]")
+            self.segments = shared_data["segments"].numpy()
+            self.interval_data = {candlestick_interval: self._to_device(shared_data[f"data/{candlestick_interval}"]) for candlestick_interval in self.candlestick_intervals}
+            self.alignment = {candlestick_interval: shared_data[f"alignment/{candlestick_interval}"].numpy() for candlestick_interval in self.candlestick_intervals[1:]}
+            if self.close_column is None:
+                self.close = shared_data["close"].numpy()
+            else:
+                self.close = shared_data[f"data/{self.candlestick_interval}"].numpy()[:, self.close_column]
+
+        else:
+            #save the close times as contiguous int64 nanoseconds (viewed as datetime64)
+            with self.instrumentation.span("env.parse_database_config.read_close_time"):
+                self.close_time = self.db[self.candlestick_interval, "close_time"]["close_time"].to_numpy(dtype="datetime64[ns]")
+
+            #the gap index of the first interval, it gets computed at ingest time and is read from the dbid
+            self.segments = np.asarray(self.db.segments(self.candlestick_interval)["segments"], dtype=np.int64).reshape(-1, 2)
+
+            #map the data read-only from disk (all processes using this database share the same pages, see DataBase.memmap_matrix),
+            #float32 and bfloat16 observations are mapped from a float32 matrix, so on the cpu float32 needs no copy either
+            with self.instrumentation.span("env.parse_database_config.map_data"):
+                self.interval_data = {}
+                for candlestick_interval in self.candlestick_intervals:
+                    data = self.db.memmap_matrix(candlestick_interval, self.store_columns if candlestick_interval == self.candlestick_interval else self.features, dtype=OBSERVATION_DTYPES[self.dtype_name][1])
+                    if candlestick_interval == self.candlestick_interval:
+                        store = data
+                    with warnings.catch_warnings():
+                        #the tensor is never written to, so the warning about the non-writable memory map can be ignored
+                        warnings.simplefilter("ignore", UserWarning)
+                        data = torch.from_numpy(data)
+                    self.interval_data[candlestick_interval] = self._to_device(data)
+
+            #the close prices of the portfolio are a view into the store of the first interval
+            #(a plain ndarray view, indexing the np.memmap subclass goes through python and is several times slower)
+            with self.instrumentation.span("env.parse_database_config.read_close"):
+                if self.close_column is None:
+                    self.close = self.db[self.candlestick_interval, "close"]["close"].to_numpy(dtype=np.float64)
+                else:
+                    self.close = np.asarray(store)[:, self.close_column]
+
+            #align the other intervals: for every row of the first interval the index of the latest candle with close_time <= its close_time,
+            #so an observation never contains a candle that has not closed yet (no lookahead)
+            with self.instrumentation.span("env.parse_database_config.align_intervals"):
+                self.alignment = {}
+                for candlestick_interval in self.candlestick_intervals[1:]:
+                    close_time = self.db[candlestick_interval, "close_time"]["close_time"].to_numpy(dtype="datetime64[ns]")
+                    self.alignment[candlestick_interval] = np.searchsorted(close_time, self.close_time, side="right").astype(np.int64) - 1
+        self.alignment_tensors = {candlestick_interval: torch.from_numpy(alignment).to(self.device) for candlestick_interval, alignment in self.alignment.items()}
+
+        #the features of the observations are a view into the store of the first interval
+        self.data = self.interval_data[self.candlestick_interval][:, :len(self.features)]
+
+        #strided views of all observation windows in the shape (rows-window_length+1, features, window_length), nothing gets copied
+        self.interval_windows = {candlestick_interval: (self.data if candlestick_interval == self.candlestick_interval else data).unfold(0, self.window_length, 1)
+                                 for candlestick_interval, data in self.interval_data.items()}
+        self.windows = self.interval_windows[self.candlestick_interval]
 
-        #check if candlestick_interval is available
-        if not self.db.check_candlestick_interval(self.candlestick_interval):
-            raise Exception("Your chosen candlestick interval is not available in the chosen database")
+        #get data parameters
+        self.data_length = self.data.shape[0]
 
-        #save the close prices and corresponding times
-        self.time_close = self.db[self.candlestick_interval, ["close_time", "close"]].to_numpy()
+        #first index whose observation windows are complete in every interval and hold no undefined (warmup) values,
+        #the alignment tables are sorted, so the first possible index of every interval is a binary search
+        self.first_index = self.window_length-1 + warmup
+        for alignment in self.alignment.values():
+            self.first_index = max(self.first_index, int(np.searchsorted(alignment, self.window_length-1 + warmup, side="left")))
 
-        #read in the data
-        self.data = self.db[self.candlestick_interval].drop(["close_time", "open_time"], axis=1).to_numpy()
-        self.data = torch.tensor(self.data, dtype=torch.float64, device=self.device)
+    def _start_prefetcher(self):
+        """
+        Description:
+            Starts the background thread that samples the next episodes and copies their data slices into contiguous buffers on the device.
+            The thread only holds the data (not the env), so the env can still be garbage collected, which stops the thread.
+        """
+        interval_data = {candlestick_interval: (self.data if candlestick_interval == self.candlestick_interval else data) for candlestick_interval, data in self.interval_data.items()}
+        episode_slicer = partial(slice_episode, num_steps=self.num_steps, window_length=self.window_length, interval_data=interval_data, alignment=self.alignment, close=self.close)
+        self.prefetcher = EpisodePrefetcher(self.sampler, episode_slicer, num_prefetch=self.num_prefetch)
+        weakref.finalize(self, self.prefetcher.close)
 
-        #get data parameters
-        self.data_length = self.data.shape[0]
+    def _to_device(self, data):
+        """
+        Description:
+            Moves a cpu tensor to the device in the dtype of the observations (only copies if the device or the dtype differs),
+            with pin_memory the data gets staged in pinned memory first, so the copy to the device is asynchronous
+        """
+        if self.pin_memory:
+            data = data.pin_memory()
+        return data.to(device=self.device, dtype=self.dtype, non_blocking=self.pin_memory)
 
     """
     Getters and Setters
     """
+    @property
+    def observation(self):
+        """
+        Description:
+            Gets the window of the last window_length timesteps (up to and including the current one) in the shape (window_length, features).
+            Without normalization this is a view into self.data and nothing gets allocated.
+            With multiple candlestick_intervals it is a dict candlestick_interval -> window of the latest fully closed candles (see get_windows).
+        """
+        return self._get_windows(self.index, None, self.episode_windows, self.episode_offsets)
+
     @property
     def current_price(self):
         """
         Description:
-            Gets the current price at the moment.
+            Gets the current price at the moment (as python float, so the portfolio math does not box numpy scalars)
         """
-        return self.time_close[self.index, 1]
+        return self.episode_close.item(self.index - self.episode_close_offset)
 
     @property
     def current_time(self):
@@ -138,7 +515,7 @@ class SimpleEnv(BaseEnv):
         Description:
             Gets the current time.
         """
-        return self.time_close[self.index, 0]
+        return self.close_time[self.index]
 
 
 class Portfolio():
@@ -161,14 +538,22 @@ class Portfolio():
         #save initial quote asset amount
         self.inital_quote_asset_amount = self.env.config.portfolio.initial_amount
 
-        #setup initial portfolio
-        self.quote_asset_amount = self.inital_quote_asset_amount
-        self.base_asset_amount = 0
-
         #save trading fees
         self.trading_fees_percent = self.env.config.portfolio.trading_fees
         self.trading_fees = self.env.config.portfolio.trading_fees/100
 
+        #setup initial portfolio
+        self.reset()
+
+    def reset(self):
+        """
+        Description:
+            Resets the portfolio to the initial amount of the quote asset
+        """
+        #setup initial portfolio
+        self.quote_asset_amount = self.inital_quote_asset_amount
+        self.base_asset_amount = 0
+
         #setup trading status
         self.trading_status = "buy"
 
@@ -0,0 +1,230 @@
+#external library imports
+import numpy as np
+import torch
+
+#package imports
+from project_proteus.env.simple import SimpleConfig, SimpleEnv
+
+
+class VectorSimpleEnv(SimpleEnv):
+
+    def __init__(self, config: SimpleConfig, num_envs: int, headless=True, device=None, seed=None, shared_data=None) -> None:
+        """
+        Description:
+            Batched version of the SimpleEnv: holds num_envs independent episodes and steps all of them at once.
+            All episode variables (indices, portfolios, action buffers) are tensors on the chosen device and get updated without python branching.
+            Given the same start indices, the results are numerically identical to num_envs separate SimpleEnv instances.
+        Arguments:
+            -config[SimpleConfig]:          Config file for this environment, see SimpleConfig for more info.
+            -num_envs[int]:                 Number of episodes that get stepped in parallel
+            -headless[bool]:                Whether the env should get rendered or not
+            -device[str]:                   On which device the environment should run
+            -seed[int]:                     Seed of the episode sampler that chooses the episodes
+            -shared_data[dict]:             Market data of another env (see SimpleEnv.share_data), if given it gets used instead of reading the database
+        """
+        #save num_envs
+        self.num_envs = num_envs
+
+        #run SimpleEnv initialization
+        super().__init__(config=config, headless=headless, device=device, seed=seed, shared_data=shared_data)
+
+        #the close prices on the device as a view into the store (the portfolio always computes in float64),
+        #self.close stays the numpy array of SimpleEnv, so share_data and the episode slices work like in SimpleEnv
+        if self.close_column is None:
+            self.close_tensor = torch.from_numpy(self.close).to(self.device)
+        else:
+            self.close_tensor = self.interval_data[self.candlestick_interval][:, self.close_column]
+
+        """
+        Portfolio setup
+        """
+        self.portfolio = VectorPortfolio(env=self)
+        self.instrument_method(self.portfolio, "process_action", "portfolio.process_action")
+
+    def reset(self, start_indices=None):
+        """
+        Description:
+            Resets all the episode specific variables of all episodes
+        Arguments:
+            -start_indices[torch.Tensor]:   Indices at which the episodes should start in the shape (num_envs,), if none are given they get chosen randomly
+        Return:
+            -observation[torch.Tensor]:     The observation windows at the start of the episodes in the shape (num_envs, window_length, features)
+        """
+        #hand the steps of the first episode that were not rendered yet to the renderer, they get sent with the next frame
+        if self.render_from is not None and self.local_index > self.render_from:
+            self.render_frame(stop=self.local_index)
+
+        #reset index variables
+        self.local_index = 0
+        if start_indices is None:
+            #all episodes read from the data on the device, so the episode sampler is used without prefetching
+            self.index = torch.from_numpy(self.sampler.sample(self.num_envs)).to(self.device)
+        else:
+            self.index = torch.as_tensor(start_indices, dtype=torch.long, device=self.device).clone()
+            if self.index.shape != (self.num_envs,):
+                raise Exception(f"The start_indices need to be in the shape ({self.num_envs},)")
+            if ((self.index < self.first_index) | (self.index > self.data_length-self.num_steps-1)).any():
+                raise Exception("One/multiple of the chosen start_indices are not possible")
+
+        #setup buffers
+        self.start_index = self.index.clone()
+        self.action_buffer = torch.full((self.num_envs, self.num_steps), float("nan"), dtype=torch.float64, device=self.device)
+        if self.recorder is not None:
+            self.episode_id = self.recorder.begin_episode(self.num_envs)
+
+        #reset the portfolios
+        self.portfolio.reset()
+        if not self.headless:
+            self.render_from, self.render_portfolio = 0, (self.portfolio.quote_asset_amount[0].item(), self.portfolio.base_asset_amount[0].item())
+
+        return self.observation
+
+    def step(self, actions: torch.Tensor):
+        """
+        Description:
+            Steps all episodes one timestep forward
+        Arguments:
+            -actions[torch.Tensor]:         The actions that the agent has chosen to take in the shape (num_envs,)
+        Return:
+            -observation[torch.Tensor]:     The observation windows at the new timestep in the shape (num_envs, window_length, features)
+            -reward[torch.Tensor]:          Change of the total profits (in quote asset) during this step in the shape (num_envs,)
+            -done[torch.Tensor]:            Whether the episodes have ended in the shape (num_envs,)
+        """
+        #check if actions are possible
+        actions = torch.as_tensor(actions, dtype=torch.long, device=self.device)
+        if actions.shape != (self.num_envs,):
+            raise Exception(f"The actions need to be in the shape ({self.num_envs},)")
+        if ((actions < 0) | (actions > 2)).any():
+            raise Exception("One/multiple of the chosen actions are not possible")
+
+        #save actions in action_buffer
+        self.action_buffer[:, self.local_index] = actions
+
+        #save profits before the actions
+        profit = self.portfolio.total_profit
+
+        #process actions in portfolio
+        self.portfolio.process_action(actions)
+
+        #render the environment
+        self.render()
+
+        #update the indeces
+        self.index += 1
+        self.local_index += 1
+
+        #calculate rewards
+        total_profit = self.portfolio.total_profit
+        reward = total_profit - profit
+        done = torch.full((self.num_envs,), self.local_index >= self.num_steps, dtype=torch.bool, device=self.device)
+
+        #record the transitions of all episodes (the prices and the indices of the actions, the portfolios and the profits after the step)
+        if self.recorder is not None:
+            self.recorder.record_batch(episode=self.episode_id, start_index=self.start_index.cpu().numpy(), step=self.local_index-1, index=(self.index-1).cpu().numpy(),
+                                       action=actions.cpu().numpy(), price=self.close_tensor[self.index-1].cpu().numpy(), quote_asset_amount=self.portfolio.quote_asset_amount.cpu().numpy(),
+                                       base_asset_amount=self.portfolio.base_asset_amount.cpu().numpy(), reward=reward.cpu().numpy(), total_profit=total_profit.cpu().numpy(), done=done.cpu().numpy())
+
+        return self.observation, reward, done
+
+    def render_frame(self, stop=None) -> None:
+        """
+        Description:
+            Hands the steps of the first episode from render_from to stop (exclusive) to the renderer as one slice (see SimpleEnv.render_frame)
+        """
+        stop = self.local_index + 1 if stop is None else stop
+        start_index = int(self.start_index[0])
+        prices = self.close_tensor[start_index+self.render_from:start_index+stop].cpu().numpy().copy()
+        actions = self.action_buffer[0, self.render_from:stop].cpu().numpy().astype(np.int8)
+        self.get_renderer().push((start_index + self.render_from, prices, actions, *self.render_portfolio))
+        self.render_from = stop
+        self.render_portfolio = (self.portfolio.quote_asset_amount[0].item(), self.portfolio.base_asset_amount[0].item())
+
+    """
+    Getters and Setters
+    """
+    @property
+    def current_price(self):
+        """
+        Description:
+            Gets the current prices of all episodes.
+        """
+        return self.close_tensor[self.index]
+
+    @property
+    def current_time(self):
+        """
+        Description:
+            Gets the current times of all episodes.
+        """
+        return self.close_time[self.index.cpu().numpy()]
+
+
+class VectorPortfolio():
+
+    def __init__(self, env: VectorSimpleEnv) -> None:
+        """
+        Description:
+            Class for managing the portfolios of all episodes of a VectorSimpleEnv, follows exactly the rules of the Portfolio class
+        Arguments:
+            -env[VectorSimpleEnv]:          Environement that this portfolio is used in
+        """
+
+        #save arguments
+        self.env = env
+
+        #save asset infos
+        self.base_asset = self.env.db.dbid["base_asset"]
+        self.quote_asset = self.env.db.dbid["quote_asset"]
+
+        #save initial quote asset amount
+        self.inital_quote_asset_amount = self.env.config.portfolio.initial_amount
+
+        #save trading fees
+        self.trading_fees_percent = self.env.config.portfolio.trading_fees
+        self.trading_fees = self.env.config.portfolio.trading_fees/100
+
+        #setup initial portfolio
+        self.reset()
+
+    def reset(self):
+        """
+        Description:
+            Resets all portfolios to the initial amount of the quote asset
+        """
+        #setup initial portfolio
+        self.quote_asset_amount = torch.full((self.env.num_envs,), float(self.inital_quote_asset_amount), dtype=torch.float64, device=self.env.device)
+        self.base_asset_amount = torch.zeros((self.env.num_envs,), dtype=torch.float64, device=self.env.device)
+
+        #setup trading status, it holds the only action that changes the portfolio (action_mapper["buy"] or action_mapper["sell"])
+        self.trading_status = torch.full((self.env.num_envs,), self.env.action_mapper["buy"], dtype=torch.long, device=self.env.device)
+
+    def process_action(self, actions):
+        """
+        Description:
+            Imitates exchange and updates base and quote assets of all portfolios accordingly
+        Arguments:
+            -actions[torch.Tensor]:     The actions that the agent has chosen to take in the shape (num_envs,)
+        """
+        #get the portfolios in which a trade happens (hold never matches the trading status)
+        buy = (actions == self.trading_status) & (actions == self.env.action_mapper["buy"])
+        sell = (actions == self.trading_status) & (actions == self.env.action_mapper["sell"])
+
+        #update the assets
+        price = self.env.current_price
+        base_asset_amount = torch.where(buy, (self.quote_asset_amount / price) * (1-self.trading_fees), self.base_asset_amount)
+        quote_asset_amount = torch.where(sell, (self.base_asset_amount * price) * (1-self.trading_fees), self.quote_asset_amount)
+        self.base_asset_amount = torch.where(sell, 0.0, base_asset_amount)
+        self.quote_asset_amount = torch.where(buy, 0.0, quote_asset_amount)
+
+        #flip the trading status
+        self.trading_status = torch.where(buy | sell, self.env.action_mapper["buy"] + self.env.action_mapper["sell"] - self.trading_status, self.trading_status)
+
+    @property
+    def total_profit(self):
+        """
+        Returns total profits in quote asset
+        """
+
+        total_qa_amount = self.quote_asset_amount + self.base_asset_amount*self.env.current_price
+
+        return total_qa_amount - self.inital_quote_asset_amount
@@ -1 +1,4 @@
-from .read_config import read_config
\ No newline at end of file
+from .read_config import read_config
+from .time_utils import interval_to_milliseconds, date_to_milliseconds
+from .instrumentation import Instrumentation, get_instrumentation
+from .atomic_write import atomic_write
\ No newline at end of file
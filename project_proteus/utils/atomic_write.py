@@ -0,0 +1,27 @@
+#standard libraries imports
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode="w"):
+    """
+    Description:
+        Context manager for writing a file that other processes might read or map at the same time e.g. with atomic_write(path) as fp: json.dump(data, fp).
+        The data gets written to a temporary file next to path first, that replaces path only after the block succeeded. So a reader (or a crash)
+        never sees a half written file, and the temporary file is named after the process, so two processes writing the same file do not share it.
+    Arguments:
+        -path[string]:          Path of the file
+        -mode[string]:          Mode of the temporary file, either: "w" or "wb" (e.g. for np.save)
+    Return:
+        -fp[file]:              The opened temporary file
+    """
+    root, extension = os.path.splitext(path)
+    tmp_path = f"{root}.{os.getpid()}.tmp{extension}"
+    try:
+        with open(tmp_path, mode) as fp:
+            yield fp
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
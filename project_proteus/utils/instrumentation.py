@@ -0,0 +1,224 @@
+#standard libraries imports
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+
+#environment variable that enables the instrumentation of the process
+INSTRUMENTATION_ENV_VAR = "PROTEUS_INSTRUMENT"
+
+#the shared context manager of disabled spans
+_NULL_SPAN = nullcontext()
+
+
+class Histogram():
+    """
+    Description:
+        Histogram with logarithmic (power of 2) buckets, so it holds any number of observations in constant memory
+    """
+
+    def __init__(self):
+        self.buckets = [0] * 65
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value) -> None:
+        self.buckets[min(int(value).bit_length(), 64)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q) -> float:
+        """
+        Description:
+            Returns the upper bound of the bucket that holds the q-quantile (an estimate within a factor of 2)
+        """
+        rank, seen = q * self.count, 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(float(2**bucket - 1), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5) if self.count else None,
+            "p90": self.quantile(0.9) if self.count else None,
+            "p99": self.quantile(0.99) if self.count else None
+        }
+
+
+class Span():
+    """
+    Description:
+        Times a block: the duration gets observed in the histogram <name>.ns and saved as an event of the chrome trace
+    """
+
+    __slots__ = ("instrumentation", "name", "args", "start")
+
+    def __init__(self, instrumentation, name, args):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.record_span(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+
+class Instrumentation():
+    """
+    Description:
+        Lightweight instrumentation of the hot paths: counters, histograms and spans (timed blocks).
+        When it is disabled nothing gets recorded, the instrumented code only checks the enabled flag
+        (or gets the shared null context of span), the environments do not even wrap their methods.
+        The collected data can be exported as a snapshot dict or as a chrome trace (chrome://tracing, perfetto).
+    Arguments:
+        -enabled[bool]:         Whether the instrumentation records
+        -max_events[int]:       Maximum number of trace events that are kept (the counters and histograms are always complete)
+    """
+
+    def __init__(self, enabled=False, max_events=1000000):
+        #save the params
+        self.enabled = enabled
+        self.max_events = max_events
+
+        #setup the collected data
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """
+        Description:
+            Drops all collected data
+        """
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.events = []
+            self.dropped_events = 0
+            self.origin = time.perf_counter_ns()
+
+    def count(self, name, value=1) -> None:
+        """
+        Description:
+            Adds value to the counter name
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value) -> None:
+        """
+        Description:
+            Adds an observation to the histogram name
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].observe(value)
+
+    def span(self, name, **args):
+        """
+        Description:
+            Returns a context manager that times the block e.g. with instrumentation.span("database.read", interval="5m"): ...
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, args)
+
+    def record_span(self, name, start, duration, args=None) -> None:
+        """
+        Description:
+            Records a timed block (start and duration in nanoseconds of time.perf_counter_ns)
+        """
+        with self._lock:
+            histogram_name = f"{name}.ns"
+            if histogram_name not in self.histograms:
+                self.histograms[histogram_name] = Histogram()
+            self.histograms[histogram_name].observe(duration)
+
+            if len(self.events) < self.max_events:
+                self.events.append((name, start, duration, threading.get_ident(), args))
+            else:
+                self.dropped_events += 1
+
+    def wrap(self, function, name):
+        """
+        Description:
+            Returns function wrapped in a span, used to instrument methods of instances only when the instrumentation is enabled
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record_span(name, start, time.perf_counter_ns() - start)
+
+        return wrapper
+
+    def snapshot(self) -> dict:
+        """
+        Description:
+            Returns the collected data as dict: {"counters": {name: value}, "histograms": {name: {count, sum, mean, min, max, p50, p90, p99}}, "events": number of trace events}
+        """
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+                "events": len(self.events),
+                "dropped_events": self.dropped_events
+            }
+
+    def export_chrome_trace(self, path) -> None:
+        """
+        Description:
+            Writes the spans as chrome trace (JSON trace event format), open it in chrome://tracing or https://ui.perfetto.dev
+        """
+        with self._lock:
+            pid = os.getpid()
+            trace_events = [
+                {"name": name, "cat": name.split(".")[0], "ph": "X", "ts": (start - self.origin) / 1000, "dur": duration / 1000, "pid": pid, "tid": tid, "args": args or {}}
+                for name, start, duration, tid, args in self.events
+            ]
+            trace_events += [{"name": name, "ph": "C", "ts": (time.perf_counter_ns() - self.origin) / 1000, "pid": pid, "args": {"value": value}} for name, value in self.counters.items()]
+
+        with open(path, "w") as fp:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, fp)
+
+
+#the instrumentation of the process, enabled with the environment variable PROTEUS_INSTRUMENT=1 (the config of an environment only instruments that environment)
+INSTRUMENTATION = Instrumentation(enabled=os.environ.get(INSTRUMENTATION_ENV_VAR, "0").lower() not in ("", "0", "false", "no"))
+
+
+def get_instrumentation() -> Instrumentation:
+    """
+    Description:
+        Returns the instrumentation of the process
+    """
+    return INSTRUMENTATION
@@ -0,0 +1,65 @@
+#standard libraries imports
+import importlib
+import sys
+
+
+class LazyModule():
+    """
+    Description:
+        Stand-in for a module that gets imported on the first attribute access e.g. pd = lazy_import("pandas"),
+        so heavy dependencies are only loaded by the code paths that use them
+    Arguments:
+        -name[string]:          The name of the module
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        if self._module is None:
+            self.__dict__["_module"] = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}' ({'loaded' if self._module is not None else 'not loaded'})>"
+
+
+def lazy_import(name):
+    """
+    Description:
+        Returns the module if it is already imported, otherwise a LazyModule that imports it on first use
+    Arguments:
+        -name[string]:          The name of the module e.g. "pandas"
+    """
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def lazy_exports(package, exports):
+    """
+    Description:
+        Creates the module level __getattr__ and __dir__ of a package, whose exports get imported from their submodules on first access (PEP 562)
+    Arguments:
+        -package[string]:       The name of the package (__name__)
+        -exports[dict]:         Exported name -> relative name of the submodule that defines it e.g. {"DataBase": ".database"}
+    Return:
+        -functions[tuple]:      (__getattr__, __dir__) of the package
+    """
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(exports[name], package), name)
+        #cache the export in the package, so the next access does not go through __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,43 @@
+#package imports
+from project_proteus.utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+
+#length of the interval units in milliseconds
+INTERVAL_UNITS = {
+    "m": 60*1000,
+    "h": 60*60*1000,
+    "d": 24*60*60*1000,
+    "w": 7*24*60*60*1000
+}
+
+
+def interval_to_milliseconds(candlestick_interval) -> int:
+    """
+    Description:
+        Converts a candlestick_interval (e.g. "5m", "1h", "1d") into milliseconds
+    Arguments:
+        -candlestick_interval[string]:  The candlestick_interval in the notation of the Binance API (the irregular "1M" is not possible)
+    Return:
+        -milliseconds[int]:             The length of the interval
+    """
+    try:
+        return int(candlestick_interval[:-1]) * INTERVAL_UNITS[candlestick_interval[-1]]
+    except (KeyError, ValueError):
+        raise Exception(f"The chosen candlestick_interval: {candlestick_interval} is not possible")
+
+
+def date_to_milliseconds(date) -> int:
+    """
+    Description:
+        Converts a date (e.g. "01 Jan, 2022", datetime.date, pd.Timestamp) into milliseconds since epoch, naive dates are treated as UTC
+    Arguments:
+        -date[string, datetime]:        The date that should be converted
+    Return:
+        -milliseconds[int]:             The date in milliseconds
+    """
+    date = pd.Timestamp(date)
+    if date.tzinfo is None:
+        date = date.tz_localize("UTC")
+    return int(date.timestamp() * 1000)
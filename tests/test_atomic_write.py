@@ -0,0 +1,27 @@
+#standard libraries imports
+import json
+import os
+import unittest
+
+#package imports
+from project_proteus.utils import atomic_write
+from tests.utils import TemporaryDirectoryMixin
+
+
+class TestAtomicWrite(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_failed_write_keeps_the_old_file(self):
+        path = os.path.join(self.path, "meta.json")
+        with atomic_write(path) as fp:
+            json.dump({"rows": 1}, fp)
+        with self.assertRaises(ZeroDivisionError):
+            with atomic_write(path) as fp:
+                fp.write('{"rows": ')
+                1 / 0
+        with open(path) as fp:
+            self.assertEqual(json.load(fp), {"rows": 1})
+        self.assertEqual(os.listdir(self.path), ["meta.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
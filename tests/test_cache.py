@@ -0,0 +1,88 @@
+#standard libraries imports
+import datetime
+import os
+import unittest
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.database import DataBase, ReadCache, StubClient
+from project_proteus.database.downloader import BulkDownloader
+from benchmarks.synthetic import create_synthetic_database
+from tests.utils import TemporaryDirectoryMixin
+
+
+class TestReadCache(unittest.TestCase):
+
+    def test_lru_eviction_and_views(self):
+        cache = ReadCache(max_bytes=2*800)
+        cache.put("5m", "close", None, np.arange(100, dtype=np.float64))
+        cache.put("5m", "open", None, np.arange(100, dtype=np.float64))
+
+        #row ranges are served as read-only views of the whole column
+        values = cache.get("5m", "close", slice(10, 20))
+        np.testing.assert_array_equal(values, np.arange(10, 20))
+        self.assertFalse(values.flags.writeable)
+
+        #close got used last, so open gets evicted
+        cache.put("5m", "high", None, np.arange(100, dtype=np.float64))
+        self.assertIsNone(cache.get("5m", "open"))
+        self.assertIsNotNone(cache.get("5m", "close"))
+        self.assertEqual(cache.stats["evictions"], 1)
+        self.assertEqual(cache.stats["bytes"], 2*800)
+
+        #arrays larger than the budget are not cached
+        cache.put("5m", "volume", None, np.arange(1000, dtype=np.float64))
+        self.assertIsNone(cache.get("5m", "volume"))
+
+    def test_invalidate(self):
+        cache = ReadCache()
+        for candlestick_interval in ("5m", "1h"):
+            for column in ("open", "close"):
+                cache.put(candlestick_interval, column, None, np.zeros(10))
+        cache.invalidate("5m", column="close")
+        self.assertIsNone(cache.get("5m", "close"))
+        self.assertIsNotNone(cache.get("5m", "open"))
+        cache.invalidate("5m")
+        self.assertIsNone(cache.get("5m", "open"))
+        self.assertIsNotNone(cache.get("1h", "close"))
+        cache.invalidate()
+        self.assertEqual(cache.stats["entries"], 0)
+        self.assertEqual(cache.stats["bytes"], 0)
+
+
+class TestDataBaseCache(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_writes_invalidate_cached_reads(self):
+        #a cached DataBase gives the same data as an uncached one after every kind of write
+        client = StubClient()
+        downloader = BulkDownloader(client_factory=lambda market_endpoint: client, max_workers=1, progress=False)
+        save_path = os.path.join(self.path, "db")
+        DataBase.create(save_path=save_path, symbol="BTCUSDT", market_endpoint="futures", date_span=(datetime.date(2022, 1, 1), datetime.date(2022, 1, 2)),
+                        candlestick_intervals=["5m"], downloader=downloader)
+        db = DataBase(save_path, cache_bytes=64*1024**2)
+        db.add_features("5m", ["sma_20"])
+
+        def assert_uncached():
+            for index in ("5m", ("5m", ["close", "sma_20"]), ("5m", "close", slice(datetime.datetime(2022, 1, 1, 12), None))):
+                self.assertTrue(db[index].equals(DataBase(save_path)[index]), index)
+
+        assert_uncached()
+        db.update(end_date=datetime.date(2022, 1, 3), downloader=downloader)
+        assert_uncached()
+        db.convert_storage("compressed", float_dtype="float32")
+        assert_uncached()
+        self.assertGreater(db.cache.stats["hits"], 0)
+
+    def test_cached_reads_match_uncached_reads(self):
+        path = create_synthetic_database(os.path.join(self.path, "db"), rows=2000)
+        db = DataBase(path, cache_bytes=64*1024**2)
+        for _ in range(2):
+            self.assertTrue(db["5m"].equals(DataBase(path)["5m"]))
+            self.assertTrue(db["5m", ["volume", "close"]].equals(DataBase(path)["5m", ["volume", "close"]]))
+        self.assertEqual(db.cache.stats["misses"], len(db["5m"].columns))
+
+
+if __name__ == "__main__":
+    unittest.main()
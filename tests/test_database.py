@@ -0,0 +1,136 @@
+#standard libraries imports
+import datetime
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.database import DataBase, StubClient
+from project_proteus.database.downloader import BulkDownloader
+from benchmarks.synthetic import create_synthetic_database
+from tests.utils import TemporaryDirectoryMixin
+
+
+class TestDbId(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_outdated_instance_does_not_overwrite_at_exit(self):
+        #a DataBase that was opened before another one converted the storage must not write its outdated dbid back when the interpreter exits
+        path = create_synthetic_database(os.path.join(self.path, "db"), rows=1000, storage_format="csv")
+        script = textwrap.dedent(f"""
+            from project_proteus.database import DataBase
+            outdated = DataBase({path!r})
+            DataBase({path!r}).convert_storage("npy")
+        """)
+        subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, env={**os.environ, "PYTHONPATH": os.getcwd()})
+
+        db = DataBase(path)
+        self.assertEqual(db.dbid["storage"]["format"], "npy")
+        self.assertEqual(len(db["5m"]), 1000)
+
+
+class FailingClient(StubClient):
+    """
+    Description:
+        StubClient whose requests fail after fail_after requests (imitates a lost connection)
+    """
+
+    def __init__(self, fail_after):
+        super().__init__()
+        self.fail_after = fail_after
+
+    def _klines(self, *args, **kwargs) -> list:
+        if self.requests >= self.fail_after:
+            raise ConnectionError("lost the connection")
+        return super()._klines(*args, **kwargs)
+
+
+class TestCreate(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def create(self, save_path, client):
+        downloader = BulkDownloader(client_factory=lambda market_endpoint: client, max_workers=1, progress=False)
+        return DataBase.create(save_path=save_path, symbol="BTCUSDT", market_endpoint="futures", date_span=(datetime.date(2022, 1, 1), datetime.date(2022, 1, 4)),
+                               candlestick_intervals=["1m"], downloader=downloader)
+
+    def test_existing_directory_is_refused(self):
+        #directories that are not an interrupted creation never get written to
+        save_path = os.path.join(self.path, "existing")
+        os.mkdir(save_path)
+        with open(os.path.join(save_path, "notes.txt"), "w") as fp:
+            fp.write("notes")
+        with self.assertRaisesRegex(Exception, "does not already exist"):
+            self.create(save_path, StubClient())
+        self.assertEqual(os.listdir(save_path), ["notes.txt"])
+
+    def test_interrupted_creation_gets_resumed(self):
+        #the committed pages are kept and the next call resumes after them
+        save_path = os.path.join(self.path, "db")
+        with self.assertRaises(ConnectionError):
+            self.create(save_path, FailingClient(fail_after=2))
+        self.assertTrue(os.path.isfile(os.path.join(save_path, "1m.partial", "checkpoint.json")))
+
+        client = StubClient()
+        db = self.create(save_path, client)
+        self.assertEqual(len(db["1m"]), 4321)
+        self.assertEqual(client.requests, 1)
+        self.assertFalse(db["1m"]["open_time"].diff().iloc[1:].ne(datetime.timedelta(minutes=1)).any())
+
+    def test_failed_creation_without_pages_gets_removed(self):
+        #without a committed page there is nothing to resume, the directory gets removed like before the resumable downloads
+        save_path = os.path.join(self.path, "db")
+        with self.assertRaises(ConnectionError):
+            self.create(save_path, FailingClient(fail_after=0))
+        self.assertFalse(os.path.exists(save_path))
+
+
+class TestUpdate(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_update_matches_a_new_download(self):
+        #only the candles after the last saved one get downloaded, the updated interval equals a database created over the whole date_range
+        for storage_format in ("npy", "csv", "parquet", "compressed"):
+            with self.subTest(format=storage_format):
+                client = StubClient()
+                downloader = BulkDownloader(client_factory=lambda market_endpoint: client, max_workers=1, progress=False)
+                save_path = os.path.join(self.path, storage_format)
+                db = DataBase.create(save_path=save_path, symbol="BTCUSDT", market_endpoint="futures", date_span=(datetime.date(2022, 1, 1), datetime.date(2022, 1, 2)),
+                                     candlestick_intervals=["5m", "1h"], storage_format=storage_format, downloader=downloader)
+                requests = client.requests
+                db.update(end_date=datetime.date(2022, 1, 4), downloader=downloader)
+                #one page per interval, the history does not get downloaded again
+                self.assertEqual(client.requests - requests, 2)
+
+                expected = DataBase.create(save_path=f"{save_path}-expected", symbol="BTCUSDT", market_endpoint="futures", date_span=(datetime.date(2022, 1, 1), datetime.date(2022, 1, 4)),
+                                           candlestick_intervals=["5m", "1h"], storage_format=storage_format, downloader=downloader)
+                updated = DataBase(save_path)
+                self.assertEqual(updated.dbid["date_range"], expected.dbid["date_range"])
+                for candlestick_interval in ("5m", "1h"):
+                    self.assertTrue(updated[candlestick_interval].equals(expected[candlestick_interval]))
+                    self.assertEqual(updated.segments(candlestick_interval), expected.segments(candlestick_interval))
+
+
+class TestMemmapMatrix(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_packing_is_opt_in_for_non_npy_databases(self):
+        #a compressed database keeps its size (and can be read-only), it only gets packed into an explicit packed_path
+        features = ["open", "close", "volume"]
+        expected = DataBase(create_synthetic_database(os.path.join(self.path, "npy"), rows=1000)).memmap_matrix("5m", features)
+        path = create_synthetic_database(os.path.join(self.path, "compressed"), rows=1000, storage_format="compressed")
+        data = DataBase(path).memmap_matrix("5m", features)
+        np.testing.assert_array_equal(data, expected)
+        self.assertFalse(os.path.exists(os.path.join(path, "5m", "packed")))
+        self.assertFalse(data.flags.writeable)
+
+        packed_path = os.path.join(self.path, "packed")
+        data = DataBase(path, packed_path=packed_path).memmap_matrix("5m", features)
+        np.testing.assert_array_equal(data, expected)
+        self.assertIsInstance(data, np.memmap)
+        self.assertTrue(os.listdir(packed_path))
+        self.assertFalse(os.path.exists(os.path.join(path, "5m", "packed")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+#standard libraries imports
+import os
+import unittest
+from unittest import mock
+
+#package imports
+from project_proteus.database import StubClient
+from project_proteus.database import downloader as downloader_module
+from project_proteus.database.downloader import BulkDownloader
+from project_proteus.database.storage import get_storage
+from tests.utils import TemporaryDirectoryMixin
+
+
+class TestIngest(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_staged_interval_gets_converted_in_chunks(self):
+        #every format gets written chunk by chunk and holds the same klines as a download into memory
+        downloader = BulkDownloader(client_factory=lambda market_endpoint: StubClient(), progress=False)
+        expected = downloader.download_kline_interval("BTCUSDT", "futures", "1 Jan, 2022", "4 Jan, 2022", "1m")
+
+        for storage_format in ("npy", "csv", "parquet", "compressed"):
+            storage = get_storage(storage_format)
+            path = os.path.join(self.path, storage_format)
+            written = []
+            def write(self, path, candlestick_interval, data, write=type(storage).write):
+                written.append(len(data))
+                return write(self, path, candlestick_interval, data)
+            with mock.patch.object(downloader_module, "FINALIZE_ROWS", 1000), mock.patch.object(type(storage), "write", write):
+                rows = downloader.ingest_kline_interval(path, storage, "BTCUSDT", "futures", "1 Jan, 2022", "4 Jan, 2022", "1m")
+
+            self.assertEqual(rows, len(expected))
+            self.assertFalse(os.path.exists(f"{path}.partial"))
+            data = storage.read(path, "1m")
+            self.assertTrue(data.equals(expected), storage_format)
+            #the whole interval never gets written at once
+            self.assertLessEqual(max(written, default=0), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
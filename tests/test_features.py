@@ -0,0 +1,48 @@
+#standard libraries imports
+import os
+import unittest
+from unittest import mock
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.database import DataBase
+from project_proteus.database.features import compute_feature
+from benchmarks.synthetic import create_synthetic_database
+from tests.utils import TemporaryDirectoryMixin
+
+
+class TestFeatureStore(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_replaced_last_candle_recomputes_features(self):
+        #an update replaces the last (previously unclosed) candle without changing the rows or the last open_time
+        db = DataBase(create_synthetic_database(os.path.join(self.path, "db"), candlestick_intervals=["5m"], rows=1000))
+        db.add_features("5m", ["log_return"])
+        old = np.array(db.memmap("5m", "log_return"))
+
+        rows = len(db.memmap("5m", "open_time"))
+        last = db.storage.read(os.path.join(db.path, "5m"), "5m", rows=slice(rows-1, rows))
+        last["close"] *= 1.01
+        db.storage.append(os.path.join(db.path, "5m"), "5m", last, start_row=rows-1)
+        db._invalidate("5m")
+
+        new = np.array(db.memmap("5m", "log_return"))
+        expected = compute_feature("log_return", {"close": db.memmap("5m", "close")})
+        self.assertNotEqual(new[-1], old[-1])
+        np.testing.assert_allclose(new, expected)
+
+    def test_up_to_date_features_do_not_read_the_klines(self):
+        #the hashes are kept until the interval changes, so reading a feature again does not touch the klines
+        db = DataBase(create_synthetic_database(os.path.join(self.path, "db"), candlestick_intervals=["5m"], storage_format="compressed", rows=1000))
+        db.add_features("5m", ["log_return", "sma_20"])
+        db["5m", ["log_return"]]
+
+        with mock.patch.object(db.storage, "read", wraps=db.storage.read) as read:
+            data = db["5m", ["log_return", "sma_20"]]
+        self.assertEqual(read.call_count, 0)
+        self.assertEqual(len(data), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+#standard libraries imports
+import unittest
+
+#package imports
+from benchmarks.import_time import CHECKS, measure
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_statements_do_not_load_heavy_modules(self):
+        #every statement runs in a fresh interpreter, only the loaded modules get checked (the time budget depends on the machine)
+        for statement, (forbidden, _) in CHECKS.items():
+            with self.subTest(statement=statement):
+                self.assertEqual(measure(statement, forbidden, repeats=1)["loaded"], [])
+
+    def test_package_import_does_not_load_torch_pandas_binance(self):
+        self.assertEqual(measure("import project_proteus", ["torch", "pandas", "binance"], repeats=1)["loaded"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
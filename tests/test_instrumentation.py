@@ -0,0 +1,36 @@
+#standard libraries imports
+import unittest
+
+#package imports
+from project_proteus.env.simple import SimpleConfig, SimpleEnv
+from project_proteus.utils import get_instrumentation
+from tests.utils import synthetic_config, TemporaryDirectoryMixin
+
+
+@unittest.skipIf(get_instrumentation().enabled, "the instrumentation of the process is enabled")
+class TestInstrumentation(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_config_only_instruments_its_env(self):
+        #an env instrumented by its config must not enable the instrumentation of the other envs
+        config = synthetic_config(self.path, num_steps=10, window_length=10)
+        class InstrumentedConfig(config):
+            class instrumentation(SimpleConfig.instrumentation):
+                enabled = True
+
+        instrumented_env = SimpleEnv(config=InstrumentedConfig(), headless=True, device="cpu", seed=0)
+        env = SimpleEnv(config=config(), headless=True, device="cpu", seed=0)
+        for steps_env in (instrumented_env, env):
+            steps_env.reset()
+            for _ in range(5):
+                steps_env.step(2)
+
+        histograms = instrumented_env.instrumentation.snapshot()["histograms"]
+        self.assertEqual(histograms["env.step.ns"]["count"], 5)
+        self.assertIn("database.pack_matrix.ns", histograms)
+        self.assertFalse(get_instrumentation().enabled)
+        self.assertIs(env.instrumentation, get_instrumentation())
+        self.assertEqual(env.instrumentation.snapshot(), {"counters": {}, "histograms": {}, "events": 0, "dropped_events": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
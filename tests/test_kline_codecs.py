@@ -0,0 +1,71 @@
+#standard libraries imports
+import importlib.util
+import os
+import unittest
+
+#external libraries imports
+import numpy as np
+import pandas as pd
+
+#package imports
+from project_proteus.database.kline_codecs import COMPRESSORS, get_compressor, encode_block, decode_block
+from project_proteus.database.storage import KLINE_COLUMNS, get_storage
+from benchmarks.synthetic import synthetic_klines
+from tests.utils import TemporaryDirectoryMixin
+
+
+#the codecs whose package is installed
+AVAILABLE_CODECS = [codec for codec, module in (("zlib", "zlib"), ("lz4", "lz4"), ("zstd", "zstandard")) if importlib.util.find_spec(module) is not None]
+
+
+class TestCodecs(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.prices = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, 1000)))
+        #regular open_times with a gap, a duplicate and values that overflow the deltas
+        open_time = 1640995200000000000 + np.arange(1000, dtype=np.int64) * 300000000000
+        open_time[500:] += 3600000000000
+        open_time[700] = open_time[699]
+        self.times = {"open_time": open_time, "extremes": np.array([np.iinfo(np.int64).max, np.iinfo(np.int64).min, 0, -1, np.iinfo(np.int64).max], dtype=np.int64)}
+
+    def test_blocks_decode_exactly(self):
+        self.assertEqual(set(COMPRESSORS), {"zlib", "lz4", "zstd"})
+        for codec in AVAILABLE_CODECS:
+            compressor = get_compressor(codec)
+            for name, values in self.times.items():
+                with self.subTest(codec=codec, values=name):
+                    np.testing.assert_array_equal(decode_block(encode_block(values, "delta_of_delta", compressor), "delta_of_delta", np.int64, compressor), values)
+            for encoding in ("shuffle", "xor"):
+                for dtype in (np.float64, np.float32):
+                    with self.subTest(codec=codec, encoding=encoding, dtype=dtype):
+                        values = self.prices.astype(dtype)
+                        decoded = decode_block(encode_block(values, encoding, compressor), encoding, dtype, compressor)
+                        self.assertEqual(decoded.dtype, dtype)
+                        np.testing.assert_array_equal(decoded, values)
+
+    def test_unavailable_codec(self):
+        with self.assertRaisesRegex(Exception, "not available"):
+            get_compressor("snappy")
+
+
+class TestCompressedStorage(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_blocks_and_appends(self):
+        #small blocks, both float encodings and an append that starts in the middle of a block
+        klines = synthetic_klines(3000)
+        for codec in AVAILABLE_CODECS:
+            for float_encoding in ("shuffle", "xor"):
+                with self.subTest(codec=codec, float_encoding=float_encoding):
+                    storage = get_storage({"format": "compressed", "codec": codec, "float_encoding": float_encoding, "block_rows": 256})
+                    path = os.path.join(self.path, f"{codec}-{float_encoding}")
+                    os.mkdir(path)
+                    storage.write(path, "5m", klines.iloc[:1000])
+                    storage.append(path, "5m", klines.iloc[900:], start_row=900)
+                    pd.testing.assert_frame_equal(storage.read(path, "5m"), klines[KLINE_COLUMNS], check_exact=True)
+                    data = storage.read(path, "5m", columns=["close"], rows=slice(250, 520))
+                    pd.testing.assert_series_equal(data["close"], klines["close"].iloc[250:520])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+#standard libraries imports
+import datetime
+import os
+import unittest
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.database import DataBase, MarketStore
+from benchmarks.synthetic import create_synthetic_database
+from tests.utils import TemporaryDirectoryMixin
+
+
+class TestMarketStore(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.btc = DataBase(create_synthetic_database(os.path.join(self.path, "btc"), candlestick_intervals=["5m", "1h"], rows=2000))
+        #eth starts later and misses candles
+        self.eth = DataBase(create_synthetic_database(os.path.join(self.path, "eth"), candlestick_intervals=["5m", "1h"], rows=2000, symbol="ETHUSDT", seed=1))
+        path = os.path.join(self.eth.path, "5m")
+        data = self.eth["5m"]
+        self.eth.storage.write(path, "5m", data.drop(index=list(range(0, 300)) + list(range(1000, 1010))).reset_index(drop=True))
+        self.eth._invalidate("5m")
+
+    def test_read_aligns_the_symbols(self):
+        store = MarketStore.create(os.path.join(self.path, "store"), ["5m", "1h"], features=["close", "volume", "log_return"], databases=[self.btc, self.eth.path])
+        open_time, data, mask = store.read("5m")
+        self.assertEqual(store.symbols, ["BTCUSDT", "ETHUSDT"])
+        self.assertEqual(data.shape, (2000, 2, 3))
+        np.testing.assert_array_equal(open_time, self.btc["5m", "open_time"]["open_time"].to_numpy())
+
+        #every existing candle is at the row of its open_time, missing candles are NaN and masked out
+        for i, db in enumerate((self.btc, self.eth)):
+            expected = DataBase(db.path)["5m", ["open_time", "close", "volume", "log_return"]]
+            rows = np.searchsorted(open_time, expected["open_time"].to_numpy())
+            np.testing.assert_array_equal(data[rows, i], expected[["close", "volume", "log_return"]].to_numpy())
+            self.assertEqual(mask[:, i].sum(), len(expected))
+            self.assertTrue(np.isnan(data[~mask[:, i], i]).all())
+        self.assertEqual(mask[:, 1].sum(), 1690)
+
+        #time slices and subsets of the symbols and features read the same values
+        start, end = datetime.datetime(2022, 1, 4), datetime.datetime(2022, 1, 5)
+        sliced_time, sliced, sliced_mask = store.read("5m", symbols=["ETHUSDT"], features=["volume"], time_slice=slice(start, end))
+        rows = (open_time >= np.datetime64(start)) & (open_time < np.datetime64(end))
+        np.testing.assert_array_equal(sliced_time, open_time[rows])
+        np.testing.assert_array_equal(sliced, data[rows][:, [1]][:, :, [1]])
+        np.testing.assert_array_equal(sliced_mask, mask[rows][:, [1]])
+
+    def test_update_and_remove_symbol(self):
+        store = MarketStore.create(os.path.join(self.path, "store"), ["5m"], databases=[self.btc])
+        btc = store.read("5m")[1]
+
+        #adding a symbol does not rewrite the files of the others, the axis grows to cover both symbols
+        mtime = os.stat(store.symbol_path("5m", "BTCUSDT")).st_mtime_ns
+        store.add_symbol(self.eth)
+        self.assertEqual(os.stat(store.symbol_path("5m", "BTCUSDT")).st_mtime_ns, mtime)
+        np.testing.assert_array_equal(MarketStore(store.path).read("5m", symbols=["BTCUSDT"])[1], btc)
+
+        #an update of the database gets picked up by update_symbol
+        path = os.path.join(self.eth.path, "5m")
+        self.eth.storage.write(path, "5m", self.eth["5m"].iloc[:500])
+        self.eth._invalidate("5m")
+        store.update_symbol("ETHUSDT")
+        self.assertEqual(store.read("5m")[2][:, 1].sum(), 500)
+
+        store.remove_symbol("ETHUSDT")
+        self.assertEqual(store.symbols, ["BTCUSDT"])
+        self.assertFalse(os.path.exists(store.symbol_path("5m", "ETHUSDT")))
+        with self.assertRaisesRegex(Exception, "not in the MarketStore"):
+            store.read("5m", symbols=["ETHUSDT"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+#standard libraries imports
+import os
+import unittest
+
+#external libraries imports
+import numpy as np
+
+#package imports
+from project_proteus.env.simple import SimpleEnv, TrajectoryRecorder, TrajectoryReader
+from tests.utils import synthetic_config, TemporaryDirectoryMixin
+
+
+def transitions(start, stop):
+    #transitions whose fields are derived from their number
+    number = np.arange(start, stop)
+    return {"episode": number // 10, "start_index": 0, "step": number % 10, "index": number, "action": number % 3, "price": number * 0.5,
+            "quote_asset_amount": 1.0, "base_asset_amount": 0.0, "reward": -number * 0.25, "total_profit": 0.0, "done": number % 10 == 9}
+
+
+class TestTrajectoryRecorder(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_ring_wraps_around(self):
+        #blocks that do not divide the capacity wrap around the end of the file, the reader gives the newest capacity transitions in order
+        path = os.path.join(self.path, "recording")
+        with TrajectoryRecorder(path, capacity=100, block_size=32, num_blocks=2) as recorder:
+            recorder.record_batch(**transitions(0, 150))
+            for number in range(150, 251):
+                recorder.record(**{name: np.asarray(values).flat[0] for name, values in transitions(number, number+1).items()})
+        reader = TrajectoryReader(path, seed=0)
+        self.assertEqual((len(reader), reader.written), (100, 251))
+        np.testing.assert_array_equal(reader.read()["index"], np.arange(151, 251))
+        np.testing.assert_array_equal(reader.read(10, 20)["price"], np.arange(161, 171) * 0.5)
+        batch = reader.sample(64)
+        self.assertTrue(((batch["index"] >= 151) & (batch["index"] < 251)).all())
+        np.testing.assert_array_equal(batch["reward"], -batch["index"] * 0.25)
+
+    def test_recording_gets_continued(self):
+        path = os.path.join(self.path, "recording")
+        with TrajectoryRecorder(path, capacity=100, block_size=16) as recorder:
+            recorder.record_batch(**transitions(0, 70))
+        with TrajectoryRecorder(path, capacity=100, block_size=16) as recorder:
+            recorder.record_batch(**transitions(70, 130))
+        np.testing.assert_array_equal(TrajectoryReader(path).read()["index"], np.arange(30, 130))
+        with self.assertRaisesRegex(Exception, "another capacity"):
+            TrajectoryRecorder(path, capacity=50)
+
+    def test_env_steps_get_recorded(self):
+        config = synthetic_config(self.path, num_steps=20, window_length=10)
+        env = SimpleEnv(config=config(), headless=True, device="cpu", seed=0)
+        with TrajectoryRecorder(os.path.join(self.path, "recording"), capacity=30, block_size=8) as recorder:
+            env.attach_recorder(recorder)
+            rewards = []
+            for episode in range(2):
+                env.reset()
+                done = False
+                while not done:
+                    _, reward, done = env.step(episode + 1)
+                    rewards.append(reward)
+        recorded = TrajectoryReader(os.path.join(self.path, "recording")).read()
+        np.testing.assert_array_equal(recorded["reward"], rewards[-30:])
+        np.testing.assert_array_equal(recorded["episode"], [0]*10 + [1]*20)
+        self.assertEqual(recorded["done"].sum(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+#standard libraries imports
+import unittest
+
+#external libraries imports
+import pandas as pd
+
+#package imports
+from project_proteus.database import StubClient
+from project_proteus.database.downloader import BulkDownloader
+from project_proteus.database.resample import resample_klines
+from project_proteus.database.storage import KLINE_COLUMNS
+
+
+class TestResample(unittest.TestCase):
+
+    def setUp(self):
+        self.downloader = BulkDownloader(client_factory=lambda market_endpoint: StubClient(), progress=False)
+
+    def download(self, candlestick_interval, start_date="1 Jan, 2022", end_date="3 Jan, 2022"):
+        return self.downloader.download_kline_interval("BTCUSDT", "futures", start_date, end_date, candlestick_interval)
+
+    def test_resampled_klines_match_downloaded_klines(self):
+        #the stub serves consistent candles for all intervals, so resampling has to give the downloaded candles (including the close_time),
+        #up to the rounding of the stub to 8 decimals that adds up in the summed volumes
+        source = self.download("1m", end_date="2 Jan, 2022 23:59:00")
+        for candlestick_interval in ("15m", "1h", "4h"):
+            expected = self.download(candlestick_interval, end_date="2 Jan, 2022 23:59:00")
+            pd.testing.assert_frame_equal(resample_klines(source, "1m", candlestick_interval), expected, check_exact=False, rtol=0, atol=1e-6)
+
+    def test_incomplete_candles_at_the_edges_get_dropped(self):
+        source = self.download("1m", start_date="1 Jan, 2022 00:07:00", end_date="1 Jan, 2022 01:07:00")
+        data = resample_klines(source, "1m", "15m")
+        self.assertEqual(data["open_time"].dt.strftime("%H:%M").tolist(), ["00:15", "00:30", "00:45"])
+
+    def test_empty_klines(self):
+        data = resample_klines(self.download("1m").iloc[:0], "1m", "15m")
+        self.assertEqual(len(data), 0)
+        self.assertEqual(list(data.columns), KLINE_COLUMNS)
+
+
+if __name__ == "__main__":
+    unittest.main()
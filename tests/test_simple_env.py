@@ -0,0 +1,101 @@
+#standard libraries imports
+import unittest
+
+#external libraries imports
+import numpy as np
+import torch
+
+#package imports
+from project_proteus.env.simple import SimpleEnv, VectorSimpleEnv, backtest
+from tests.utils import synthetic_config, TemporaryDirectoryMixin
+
+
+class TestWindowIndices(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_scalar_indices_do_not_write_the_store(self):
+        #numpy ints and 0-dim tensors index a view of the read-only store, the normalization must not be done in place
+        for normalization in ("last", "zscore"):
+            config = synthetic_config(self.path, name=normalization, num_steps=10, window_length=10, window_normalization=normalization)
+            env = SimpleEnv(config=config(), headless=True, device="cpu", seed=0)
+            data = env.data.clone()
+            index = int(env.sampler.sample())
+            expected = env.get_windows(index)
+
+            for scalar in (np.int64(index), torch.tensor(index)):
+                torch.testing.assert_close(env.get_windows(scalar), expected)
+            torch.testing.assert_close(env.get_windows(torch.tensor([index]))[0], expected)
+            env.reset(start_index=env.sampler.sample(4)[0])
+            env.step(2)
+            torch.testing.assert_close(env.data, data)
+
+
+class TestVectorSimpleEnv(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_parity_with_simple_env(self):
+        #given the same start indices and actions, the batched episodes are bit-identical to separate SimpleEnv episodes
+        num_envs, num_steps = 8, 50
+        for dtype in ("float64", "float32"):
+            config = synthetic_config(self.path, name=dtype, num_steps=num_steps, window_length=10, dtype=dtype)
+            env = SimpleEnv(config=config(), headless=True, device="cpu", seed=0)
+            vector_env = VectorSimpleEnv(config=config(), num_envs=num_envs, headless=True, device="cpu", seed=0)
+            start_indices = torch.as_tensor(env.sampler.sample(num_envs))
+            actions = torch.randint(0, 3, (num_steps, num_envs), generator=torch.Generator().manual_seed(0))
+
+            observations, rewards, dones = [vector_env.reset(start_indices=start_indices)], [], []
+            for step in range(num_steps):
+                observation, reward, done = vector_env.step(actions[step])
+                observations.append(observation)
+                rewards.append(reward)
+                dones.append(done)
+
+            for episode in range(num_envs):
+                torch.testing.assert_close(env.reset(start_index=int(start_indices[episode])), observations[0][episode], rtol=0, atol=0)
+                for step in range(num_steps):
+                    observation, reward, done = env.step(int(actions[step, episode]))
+                    torch.testing.assert_close(observation, observations[step+1][episode], rtol=0, atol=0)
+                    self.assertEqual(reward, rewards[step][episode].item(), f"{dtype} episode {episode} step {step}")
+                    self.assertEqual(done, dones[step][episode].item())
+
+    def test_share_data(self):
+        #with float32 the close prices are kept outside of the store, share_data has to share them like SimpleEnv does
+        for dtype in ("float64", "float32"):
+            config = synthetic_config(self.path, name=dtype, num_steps=10, window_length=10, dtype=dtype)
+            env = VectorSimpleEnv(config=config(), num_envs=4, headless=True, device="cpu", seed=0)
+            shared_env = VectorSimpleEnv(config=config(), num_envs=4, headless=True, device="cpu", seed=0, shared_data=env.share_data())
+            np.testing.assert_array_equal(shared_env.close, env.close)
+
+            start_indices = torch.as_tensor(env.sampler.sample(4))
+            for vector_env in (env, shared_env):
+                vector_env.reset(start_indices=start_indices)
+            for actions in (torch.tensor([0, 1, 2, 0]), torch.tensor([1, 1, 0, 2])):
+                torch.testing.assert_close(shared_env.step(actions)[1], env.step(actions)[1])
+
+
+class TestBacktest(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def test_parity_with_stepped_episodes(self):
+        #the exact backtest is bit-identical to the Portfolio, the cumulative product only differs by floating point rounding
+        num_episodes, num_steps = 8, 200
+        env = SimpleEnv(config=synthetic_config(self.path, num_steps=num_steps, window_length=10)(), headless=True, device="cpu", seed=0)
+        start_indices = env.sampler.sample(num_episodes)
+        actions = torch.randint(0, 3, (num_episodes, num_steps), generator=torch.Generator().manual_seed(0))
+
+        profits = torch.empty((num_episodes, num_steps), dtype=torch.float64)
+        for episode, start_index in enumerate(start_indices.tolist()):
+            env.reset(start_index=start_index)
+            for step in range(num_steps):
+                env.step(int(actions[episode, step]))
+                profits[episode, step] = env.portfolio.total_profit
+
+        #the env values the portfolio after step t at the price of the next timestep, so the episode gets extended by a hold
+        prices = torch.stack([torch.from_numpy(env.close[start_index:start_index+num_steps+1]) for start_index in start_indices.tolist()])
+        extended = torch.cat([actions, torch.full((num_episodes, 1), 2)], dim=1)
+        for exact, tolerance in ((True, 0.0), (False, 1e-9)):
+            result = backtest(extended, prices, exact=exact)
+            stepped = result.quote_asset_amount[:, :-1] + result.base_asset_amount[:, :-1]*prices[:, 1:] - result.initial_amount
+            torch.testing.assert_close(stepped, profits, rtol=0, atol=tolerance, msg=f"exact={exact}")
+            torch.testing.assert_close(result.total_profit, profits[:, -1], rtol=0, atol=tolerance, msg=f"exact={exact}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+#standard libraries imports
+import os
+import unittest
+
+#external libraries imports
+import pandas as pd
+
+#package imports
+from project_proteus.database.storage import STORAGE_FORMATS, KLINE_COLUMNS, TIME_COLUMNS, get_storage
+from benchmarks.synthetic import synthetic_klines
+from tests.utils import TemporaryDirectoryMixin
+
+
+class TestStorageFormats(TemporaryDirectoryMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.klines = synthetic_klines(3000)
+
+    def interval_path(self, name):
+        path = os.path.join(self.path, name)
+        os.mkdir(path)
+        return path
+
+    def assert_klines_equal(self, data, expected, storage):
+        expected = expected[KLINE_COLUMNS].reset_index(drop=True)
+        if storage.name != "csv":
+            expected = expected.astype({column: storage.float_dtype for column in KLINE_COLUMNS if column not in TIME_COLUMNS})
+        #csv parses the printed floats with the fast parser of pandas, which can be off by one ulp
+        pd.testing.assert_frame_equal(data[KLINE_COLUMNS].reset_index(drop=True), expected, check_exact=storage.name != "csv", rtol=1e-15)
+
+    def test_round_trip(self):
+        #every format gives back the written klines, also for a subset of the columns and a slice of the rows
+        for name in STORAGE_FORMATS:
+            for float_dtype in ("float64", "float32"):
+                with self.subTest(format=name, float_dtype=float_dtype):
+                    storage = get_storage(name, float_dtype=float_dtype)
+                    path = self.interval_path(f"{name}-{float_dtype}")
+                    storage.write(path, "5m", self.klines)
+
+                    self.assert_klines_equal(storage.read(path, "5m"), self.klines, storage)
+                    data = storage.read(path, "5m", columns=["open_time", "close"], rows=slice(1000, 1500))
+                    self.assertEqual(list(data.index), list(range(1000, 1500)))
+                    pd.testing.assert_series_equal(data["open_time"], self.klines["open_time"].iloc[1000:1500], check_dtype=False)
+
+    def test_append(self):
+        #appending at the end and overwriting the tail (start_row) give the same klines as one write
+        for name in STORAGE_FORMATS:
+            with self.subTest(format=name):
+                storage = get_storage(name)
+                path = self.interval_path(name)
+                storage.write(path, "5m", self.klines.iloc[:1000])
+                storage.append(path, "5m", self.klines.iloc[1000:2000])
+                #a half written page gets overwritten
+                page = self.klines.iloc[2000:2100].copy()
+                page["close"] += 1
+                storage.append(path, "5m", page)
+                storage.append(path, "5m", self.klines.iloc[2000:], start_row=2000)
+                self.assert_klines_equal(storage.read(path, "5m"), self.klines, storage)
+
+
+if __name__ == "__main__":
+    unittest.main()
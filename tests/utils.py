@@ -0,0 +1,44 @@
+#standard libraries imports
+import os
+import tempfile
+
+#package imports
+from project_proteus.env.simple import SimpleConfig
+from benchmarks.synthetic import create_synthetic_database
+
+
+def synthetic_config(path, candlestick_intervals=("5m",), rows=5000, name="db", **env_options):
+    """
+    Description:
+        Creates a synthetic database in path and returns a SimpleConfig class on it
+    Arguments:
+        -path[string]:                  Directory of the database
+        -candlestick_intervals[tuple]:  The candlestick_intervals of the database, the env steps on the first one
+        -rows[int]:                     Number of candles of the finest interval
+        -name[string]:                  Name of the database directory in path
+        -env_options[dict]:             Options of SimpleConfig.env e.g. num_steps=10
+    Return:
+        -config[class]:                 A subclass of SimpleConfig
+    """
+    create_synthetic_database(os.path.join(path, name), candlestick_intervals=list(candlestick_intervals), rows=rows)
+
+    class Config(SimpleConfig):
+        class database(SimpleConfig.database):
+            pass
+        class env(SimpleConfig.env):
+            pass
+    Config.database.path = os.path.join(path, name)
+    Config.database.candlestick_interval = candlestick_intervals[0] if len(candlestick_intervals) == 1 else list(candlestick_intervals)
+    for name, value in env_options.items():
+        setattr(Config.env, name, value)
+    return Config
+
+
+class TemporaryDirectoryMixin():
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()